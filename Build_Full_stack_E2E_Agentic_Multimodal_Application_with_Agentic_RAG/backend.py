@@ -2,18 +2,47 @@ from expense_manager_agent.agent import root_agent as expense_manager_agent
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.adk.events import Event
-from fastapi import FastAPI, Body, Depends
-from typing import AsyncIterator
+from fastapi import (
+    FastAPI,
+    Body,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai import types
+from typing import AsyncIterator, List, Optional
 from types import SimpleNamespace
 import uvicorn
+import asyncio
+import base64
+import mimetypes
+import re
+from urllib.parse import urlencode
 from contextlib import asynccontextmanager
 from utils import (
     extract_attachment_ids_and_sanitize_response,
-    download_image_from_gcs,
+    load_image_from_gcs,
+    load_images_from_gcs,
     extract_thinking_process,
+    ResponseSectionSplitter,
+    format_user_message_to_adk_content_and_store_artifacts,
     format_user_request_to_adk_content_and_store_artifacts,
+    wait_for_artifact_uploads,
+    IMAGE_CACHE,
+)
+from schema import (
+    AttachmentReference,
+    ImageData,
+    ChatRequest,
+    ChatResponse,
+    ChatStreamEvent,
 )
-from schema import ImageData, ChatRequest, ChatResponse
 import logger
 from google.adk.artifacts import GcsArtifactService
 from settings import get_settings
@@ -21,6 +50,10 @@ from settings import get_settings
 SETTINGS = get_settings()
 APP_NAME = "expense_manager_app"
 
+# Image hash IDs are the first 12 hex digits of the image's SHA-256
+IMAGE_HASH_PATTERN = re.compile(r"[0-9a-f]{12}")
+ATTACHMENT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 
 # Application state to hold service contexts
 class AppContexts(SimpleNamespace):
@@ -64,33 +97,118 @@ async def get_app_contexts() -> AppContexts:
 app = FastAPI(title="Personal Expense Assistant API", lifespan=lifespan)
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest = Body(...),
-    app_context: AppContexts = Depends(get_app_contexts),
+async def ensure_session(app_context: AppContexts, user_id: str, session_id: str):
+    """Create the session if it doesn't exist"""
+    if not await app_context.session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    ):
+        await app_context.session_service.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+
+
+async def build_chat_response(
+    app_context: AppContexts,
+    user_id: str,
+    session_id: str,
+    final_response_text: str,
+    upload_tasks: dict[str, asyncio.Task],
+    inline_attachments: bool,
 ) -> ChatResponse:
-    """Process chat request and get response from the agent"""
+    """Build the chat response from the agent's final response text.
 
-    # Prepare the user's message in ADK format and store image artifacts
-    content = await format_user_request_to_adk_content_and_store_artifacts(
-        request=request,
-        app_name=APP_NAME,
+    Args:
+        app_context: The application contexts
+        user_id: The ID of the user
+        session_id: The ID of the session
+        final_response_text: The raw final response of the agent
+        upload_tasks: Background uploads of the message's images
+        inline_attachments: Whether to return attachments as base64 image data
+            instead of references to the attachments endpoint
+
+    Returns:
+        ChatResponse: The agent's response
+    """
+    # Attachments may reference this request's images, so wait for their uploads
+    failed_uploads = await wait_for_artifact_uploads(upload_tasks)
+
+    # Extract and process any attachments and thinking process in the response
+    sanitized_text, attachment_ids = extract_attachment_ids_and_sanitize_response(
+        final_response_text
+    )
+    sanitized_text, thinking_process = extract_thinking_process(sanitized_text)
+
+    # Load images from the cache or GCS, so only existing ones are referenced
+    images = await load_images_from_gcs(
         artifact_service=app_context.artifact_service,
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        image_hashes=attachment_ids,
     )
+    base64_attachments = []
+    attachment_references = []
+    for image_hash_id, image_data, mime_type in images:
+        if inline_attachments:
+            base64_attachments.append(
+                ImageData(
+                    serialized_image=base64.b64encode(image_data).decode("utf-8"),
+                    mime_type=mime_type,
+                )
+            )
+        else:
+            query = urlencode({"user_id": user_id, "session_id": session_id})
+            attachment_references.append(
+                AttachmentReference(
+                    image_hash=image_hash_id,
+                    mime_type=mime_type,
+                    url=f"/attachments/{image_hash_id}?{query}",
+                )
+            )
 
-    final_response_text = "Agent did not produce a final response."  # Default
+    logger.info(
+        "Processed response with attachments",
+        sanitized_response=sanitized_text,
+        thinking_process=thinking_process,
+        attachment_ids=attachment_ids,
+        failed_uploads=failed_uploads,
+        image_cache=IMAGE_CACHE.stats(),
+    )
 
-    # Use the session ID from the request or default if not provided
-    session_id = request.session_id
-    user_id = request.user_id
+    return ChatResponse(
+        response=sanitized_text,
+        thinking_process=thinking_process,
+        attachments=base64_attachments,
+        attachment_references=attachment_references,
+        failed_uploads=failed_uploads,
+    )
 
-    # Create session if it doesn't exist
-    if not await app_context.session_service.get_session(
-        app_name=APP_NAME, user_id=user_id, session_id=session_id
-    ):
-        await app_context.session_service.create_session(
-            app_name=APP_NAME, user_id=user_id, session_id=session_id
-        )
+
+async def process_chat_turn(
+    app_context: AppContexts,
+    user_id: str,
+    session_id: str,
+    content: types.Content,
+    upload_tasks: dict[str, asyncio.Task],
+    inline_attachments: bool,
+) -> ChatResponse:
+    """Run one agent turn and build the chat response.
+
+    Args:
+        app_context: The application contexts
+        user_id: The ID of the user
+        session_id: The ID of the session
+        content: The user's message in ADK format
+        upload_tasks: Background uploads of the message's images
+        inline_attachments: Whether to return attachments as base64 image data
+            instead of references to the attachments endpoint
+
+    Returns:
+        ChatResponse: The agent's response
+    """
+    final_response_text = "Agent did not produce a final response."  # Default
+
+    await ensure_session(app_context, user_id, session_id)
 
     try:
         # Process the message with the agent
@@ -115,48 +233,290 @@ async def chat(
             "Received final response from agent", raw_final_response=final_response_text
         )
 
-        # Extract and process any attachments and thinking process in the response
-        base64_attachments = []
-        sanitized_text, attachment_ids = extract_attachment_ids_and_sanitize_response(
-            final_response_text
+        return await build_chat_response(
+            app_context=app_context,
+            user_id=user_id,
+            session_id=session_id,
+            final_response_text=final_response_text,
+            upload_tasks=upload_tasks,
+            inline_attachments=inline_attachments,
+        )
+
+    except Exception as e:
+        logger.error("Error processing chat request", error_message=str(e))
+        return ChatResponse(
+            response="",
+            error=f"Error in generating response: {str(e)}",
+            failed_uploads=await wait_for_artifact_uploads(upload_tasks),
         )
-        sanitized_text, thinking_process = extract_thinking_process(sanitized_text)
-
-        # Download images from GCS and replace hash IDs with base64 data
-        for image_hash_id in attachment_ids:
-            # Download image data and get MIME type
-            result = await download_image_from_gcs(
-                artifact_service=app_context.artifact_service,
-                image_hash=image_hash_id,
-                app_name=APP_NAME,
+
+
+def format_sse(event: ChatStreamEvent) -> str:
+    """Format a chat stream event as a server-sent event"""
+    return f"event: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+
+async def stream_chat_turn(
+    app_context: AppContexts,
+    user_id: str,
+    session_id: str,
+    content: types.Content,
+    upload_tasks: dict[str, asyncio.Task],
+) -> AsyncIterator[str]:
+    """Run one agent turn, streaming its progress as server-sent events.
+
+    The model's output is streamed as "thinking" and "text" chunks while it is
+    generated, tool calls as "tool_call" and "tool_result" events. The last
+    event is always "final", with the same response /chat/multipart returns.
+
+    Args:
+        app_context: The application contexts
+        user_id: The ID of the user
+        session_id: The ID of the session
+        content: The user's message in ADK format
+        upload_tasks: Background uploads of the message's images
+
+    Yields:
+        str: Server-sent events
+    """
+    final_response_text = "Agent did not produce a final response."  # Default
+    splitter = ResponseSectionSplitter()
+
+    try:
+        await ensure_session(app_context, user_id, session_id)
+
+        events_iterator: AsyncIterator[Event] = (
+            app_context.expense_manager_agent_runner.run_async(
                 user_id=user_id,
                 session_id=session_id,
+                new_message=content,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
             )
-            if result:
-                base64_data, mime_type = result
-                base64_attachments.append(
-                    ImageData(serialized_image=base64_data, mime_type=mime_type)
+        )
+        async for event in events_iterator:
+            parts = event.content.parts if event.content and event.content.parts else []
+
+            # Partial events carry the chunks of the response being generated
+            if event.partial:
+                for part in parts:
+                    if not part.text:
+                        continue
+                    if part.thought:
+                        chunks = [(ResponseSectionSplitter.THINKING, part.text)]
+                    else:
+                        chunks = splitter.feed(part.text)
+                    for section, text in chunks:
+                        yield format_sse(ChatStreamEvent(type=section, text=text))
+                continue
+
+            function_calls = event.get_function_calls()
+            if function_calls:
+                # The model continues with a new response after the tools ran
+                for section, text in splitter.flush():
+                    yield format_sse(ChatStreamEvent(type=section, text=text))
+                splitter = ResponseSectionSplitter()
+            for function_call in function_calls:
+                yield format_sse(
+                    ChatStreamEvent(type="tool_call", tool_name=function_call.name)
                 )
+            for function_response in event.get_function_responses():
+                yield format_sse(
+                    ChatStreamEvent(
+                        type="tool_result", tool_name=function_response.name
+                    )
+                )
+
+            if event.is_final_response():
+                response_text = "".join(
+                    part.text for part in parts if part.text and not part.thought
+                )
+                if response_text:
+                    final_response_text = response_text
+                elif event.actions and event.actions.escalate:
+                    # Handle potential errors/escalations
+                    final_response_text = f"Agent escalated: {event.error_message or 'No specific message.'}"
+                break  # Stop processing events once the final response is found
+
+        for section, text in splitter.flush():
+            yield format_sse(ChatStreamEvent(type=section, text=text))
 
         logger.info(
-            "Processed response with attachments",
-            sanitized_response=sanitized_text,
-            thinking_process=thinking_process,
-            attachment_ids=attachment_ids,
+            "Received final response from agent", raw_final_response=final_response_text
         )
 
-        return ChatResponse(
-            response=sanitized_text,
-            thinking_process=thinking_process,
-            attachments=base64_attachments,
+        response = await build_chat_response(
+            app_context=app_context,
+            user_id=user_id,
+            session_id=session_id,
+            final_response_text=final_response_text,
+            upload_tasks=upload_tasks,
+            inline_attachments=False,
         )
 
     except Exception as e:
-        logger.error("Error processing chat request", error_message=str(e))
-        return ChatResponse(
-            response="", error=f"Error in generating response: {str(e)}"
+        logger.error("Error processing chat stream request", error_message=str(e))
+        response = ChatResponse(
+            response="",
+            error=f"Error in generating response: {str(e)}",
+            failed_uploads=await wait_for_artifact_uploads(upload_tasks),
         )
 
+    yield format_sse(ChatStreamEvent(type="final", response=response))
+
+
+async def read_uploaded_images(files: List[UploadFile]) -> list[tuple[bytes, str]]:
+    """Read uploaded image files as (image_bytes, mime_type) tuples"""
+    file_contents = await asyncio.gather(*(file.read() for file in files))
+
+    return [
+        (
+            file_content,
+            file.content_type
+            or mimetypes.guess_type(file.filename or "")[0]
+            or "application/octet-stream",
+        )
+        for file, file_content in zip(files, file_contents)
+    ]
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest = Body(...),
+    app_context: AppContexts = Depends(get_app_contexts),
+) -> ChatResponse:
+    """Process chat request and get response from the agent"""
+
+    # Prepare the user's message in ADK format; image artifacts upload in the background
+    content, upload_tasks = (
+        await format_user_request_to_adk_content_and_store_artifacts(
+            request=request,
+            app_name=APP_NAME,
+            artifact_service=app_context.artifact_service,
+        )
+    )
+
+    return await process_chat_turn(
+        app_context=app_context,
+        user_id=request.user_id,
+        session_id=request.session_id,
+        content=content,
+        upload_tasks=upload_tasks,
+        inline_attachments=True,
+    )
+
+
+@app.post("/chat/multipart", response_model=ChatResponse)
+async def chat_multipart(
+    text: str = Form(""),
+    files: List[UploadFile] = File([]),
+    session_id: str = Form("default_session"),
+    user_id: str = Form("default_user"),
+    app_context: AppContexts = Depends(get_app_contexts),
+) -> ChatResponse:
+    """Process a multipart chat request with raw image files.
+
+    Attachments are returned as references to the attachments endpoint
+    instead of base64 image data.
+    """
+    images = await read_uploaded_images(files)
+
+    # Prepare the user's message in ADK format; image artifacts upload in the background
+    content, upload_tasks = (
+        await format_user_message_to_adk_content_and_store_artifacts(
+            text=text,
+            images=images,
+            user_id=user_id,
+            session_id=session_id,
+            app_name=APP_NAME,
+            artifact_service=app_context.artifact_service,
+        )
+    )
+
+    return await process_chat_turn(
+        app_context=app_context,
+        user_id=user_id,
+        session_id=session_id,
+        content=content,
+        upload_tasks=upload_tasks,
+        inline_attachments=False,
+    )
+
+
+@app.post("/chat/stream")
+async def chat_stream(
+    text: str = Form(""),
+    files: List[UploadFile] = File([]),
+    session_id: str = Form("default_session"),
+    user_id: str = Form("default_user"),
+    app_context: AppContexts = Depends(get_app_contexts),
+) -> StreamingResponse:
+    """Process a multipart chat request, streaming the agent's progress.
+
+    Takes the same form fields as /chat/multipart and responds with
+    server-sent events, each carrying a ChatStreamEvent.
+    """
+    images = await read_uploaded_images(files)
+
+    # Prepare the user's message in ADK format; image artifacts upload in the background
+    content, upload_tasks = (
+        await format_user_message_to_adk_content_and_store_artifacts(
+            text=text,
+            images=images,
+            user_id=user_id,
+            session_id=session_id,
+            app_name=APP_NAME,
+            artifact_service=app_context.artifact_service,
+        )
+    )
+
+    return StreamingResponse(
+        stream_chat_turn(
+            app_context=app_context,
+            user_id=user_id,
+            session_id=session_id,
+            content=content,
+            upload_tasks=upload_tasks,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/attachments/{image_hash}")
+async def get_attachment(
+    image_hash: str,
+    user_id: str = "default_user",
+    session_id: str = "default_session",
+    if_none_match: Optional[str] = Header(None),
+    app_context: AppContexts = Depends(get_app_contexts),
+) -> Response:
+    """Serve an image artifact as raw bytes.
+
+    Image hash IDs are derived from the image content, so responses never
+    change and clients may cache them indefinitely.
+    """
+    if not IMAGE_HASH_PATTERN.fullmatch(image_hash):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    etag = f'"{image_hash}"'
+    cache_headers = {"Cache-Control": ATTACHMENT_CACHE_CONTROL, "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=cache_headers)
+
+    image = await load_image_from_gcs(
+        artifact_service=app_context.artifact_service,
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        image_hash=image_hash,
+    )
+    if not image:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    image_data, mime_type = image
+
+    return Response(content=image_data, media_type=mime_type, headers=cache_headers)
+
 
 # Only run the server if this file is executed directly
 if __name__ == "__main__":
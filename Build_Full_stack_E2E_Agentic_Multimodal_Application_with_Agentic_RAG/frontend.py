@@ -1,119 +1,188 @@
 import mimetypes
+import os
+import tempfile
+from contextlib import ExitStack
+from urllib.parse import urljoin
 import gradio as gr
 import requests
-import base64
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 from settings import get_settings
-from PIL import Image
-import io
-from schema import ImageData, ChatRequest, ChatResponse
+from schema import AttachmentReference, ChatResponse, ChatStreamEvent
 
 
 SETTINGS = get_settings()
 
+# Downloaded attachments, named by image hash ID
+ATTACHMENT_DIR = tempfile.mkdtemp(prefix="expense_attachments_")
 
-def encode_image_to_base64_and_get_mime_type(image_path: str) -> ImageData:
-    """Encode a file to base64 string and get MIME type.
 
-    Reads an image file and returns the base64-encoded image data and its MIME type.
+def download_attachment(reference: AttachmentReference) -> str:
+    """Download an attachment from the backend to a local file.
+
+    Attachments are addressed by the hash of their content, so a file that was
+    already downloaded is reused.
 
     Args:
-        image_path: Path to the image file to encode.
+        reference: Reference to the attachment on the backend.
 
     Returns:
-        ImageData object containing the base64 encoded image data and its MIME type.
+        Path of the downloaded image file.
     """
-    # Read the image file
-    with open(image_path, "rb") as file:
-        image_content = file.read()
-
-    # Get the mime type
-    mime_type = mimetypes.guess_type(image_path)[0]
+    extension = mimetypes.guess_extension(reference.mime_type) or ""
+    image_path = os.path.join(ATTACHMENT_DIR, f"{reference.image_hash}{extension}")
+    if os.path.exists(image_path):
+        return image_path
 
-    # Base64 encode the image
-    base64_data = base64.b64encode(image_content).decode("utf-8")
+    response = requests.get(urljoin(SETTINGS.BACKEND_URL, reference.url))
+    response.raise_for_status()
 
-    # Return as ImageData object
-    return ImageData(serialized_image=base64_data, mime_type=mime_type)
+    with open(image_path, "wb") as file:
+        file.write(response.content)
 
+    return image_path
 
-def decode_base64_to_image(base64_data: str) -> Image.Image:
-    """Decode a base64 string to PIL Image.
 
-    Converts a base64-encoded image string back to a PIL Image object
-    that can be displayed or processed further.
+def render_chat_messages(
+    thinking_process: str,
+    tool_progress: List[str],
+    response_text: str,
+    result: ChatResponse | None = None,
+) -> List[str | gr.ChatMessage | gr.Image]:
+    """Build the chat messages of a response received so far.
 
     Args:
-        base64_data: Base64 encoded string of the image.
+        thinking_process: Thinking process streamed so far.
+        tool_progress: One line per tool call or result.
+        response_text: Response text streamed so far.
+        result: The complete response, once received.
 
     Returns:
-        PIL Image object of the decoded image.
+        List containing the chat messages and any image attachments.
     """
-    # Decode the base64 string and convert to PIL Image
-    image_data = base64.b64decode(base64_data)
-    image_buffer = io.BytesIO(image_data)
-    image = Image.open(image_buffer)
+    chat_responses = []
+
+    if thinking_process:
+        chat_responses.append(
+            gr.ChatMessage(
+                role="assistant",
+                content=thinking_process,
+                metadata={"title": "🧠 Thinking Process"},
+            )
+        )
+
+    if tool_progress:
+        chat_responses.append(
+            gr.ChatMessage(
+                role="assistant",
+                content="\n".join(tool_progress),
+                metadata={"title": "🛠️ Tool Progress"},
+            )
+        )
 
-    return image
+    chat_responses.append(gr.ChatMessage(role="assistant", content=response_text))
+
+    if result and result.failed_uploads:
+        chat_responses.append(
+            gr.ChatMessage(
+                role="assistant",
+                content=f"Warning: {len(result.failed_uploads)} image(s) could not be saved "
+                "and will not be available later in this conversation.",
+            )
+        )
+
+    if result:
+        for reference in result.attachment_references:
+            chat_responses.append(gr.Image(download_attachment(reference)))
+
+    return chat_responses
 
 
 def get_response_from_llm_backend(
     message: Dict[str, Any],
     history: List[Dict[str, Any]],
-) -> List[str | gr.Image]:
-    """Send the message and history to the backend and get a response.
+) -> Iterator[List[str | gr.ChatMessage | gr.Image]]:
+    """Send the message and history to the backend and stream the response.
+
+    Images are uploaded and downloaded as raw bytes. The response is rendered
+    progressively from the server-sent events of the backend.
 
     Args:
         message: Dictionary containing the current message with 'text' and optional 'files' keys.
         history: List of previous message dictionaries in the conversation.
 
-    Returns:
-        List containing text response and any image attachments from the backend service.
+    Yields:
+        List containing the response so far and any image attachments from the backend service.
     """
-    # Extract files and convert to base64
-    image_data = []
-    if uploaded_files := message.get("files", []):
-        for file_path in uploaded_files:
-            image_data.append(encode_image_to_base64_and_get_mime_type(file_path))
-
-    # Prepare the request payload
-    payload = ChatRequest(
-        text=message["text"],
-        files=image_data,
-        session_id="default_session",
-        user_id="default_user",
-    )
+    # Prepare the multipart request payload
+    data = {
+        "text": message["text"],
+        "session_id": "default_session",
+        "user_id": "default_user",
+    }
+
+    thinking_process = ""
+    tool_progress = []
+    response_text = ""
 
     # Send request to backend
-    try:
-        response = requests.post(SETTINGS.BACKEND_URL, json=payload.model_dump())
-        response.raise_for_status()  # Raise exception for HTTP errors
-
-        result = ChatResponse(**response.json())
-        if result.error:
-            return [f"Error: {result.error}"]
-
-        chat_responses = []
-
-        if result.thinking_process:
-            chat_responses.append(
-                gr.ChatMessage(
-                    role="assistant",
-                    content=result.thinking_process,
-                    metadata={"title": "🧠 Thinking Process"},
+    with ExitStack() as stack:
+        files = [
+            (
+                "files",
+                (
+                    os.path.basename(file_path),
+                    stack.enter_context(open(file_path, "rb")),
+                    mimetypes.guess_type(file_path)[0] or "application/octet-stream",
+                ),
+            )
+            for file_path in message.get("files", [])
+        ]
+
+        try:
+            response = stack.enter_context(
+                requests.post(
+                    f"{SETTINGS.BACKEND_URL}/stream",
+                    data=data,
+                    files=files,
+                    stream=True,
                 )
             )
-
-        chat_responses.append(gr.ChatMessage(role="assistant", content=result.response))
-
-        if result.attachments:
-            for attachment in result.attachments:
-                image_data = attachment.serialized_image
-                chat_responses.append(gr.Image(decode_base64_to_image(image_data)))
-
-        return chat_responses
-    except requests.exceptions.RequestException as e:
-        return [f"Error connecting to backend service: {str(e)}"]
+            response.raise_for_status()  # Raise exception for HTTP errors
+
+            for line in response.iter_lines(decode_unicode=True):
+                # Each event's JSON payload is on a single data line
+                if not line or not line.startswith("data:"):
+                    continue
+
+                event = ChatStreamEvent.model_validate_json(line[len("data:") :])
+                if event.type == "thinking":
+                    thinking_process += event.text
+                elif event.type == "text":
+                    response_text += event.text
+                elif event.type == "tool_call":
+                    tool_progress.append(f"Calling `{event.tool_name}`...")
+                elif event.type == "tool_result":
+                    tool_progress.append(f"`{event.tool_name}` finished")
+                elif event.type == "final":
+                    result = event.response
+                    if result.error:
+                        yield [f"Error: {result.error}"]
+                        return
+
+                    # The final response replaces the streamed text
+                    yield render_chat_messages(
+                        result.thinking_process or thinking_process,
+                        tool_progress,
+                        result.response,
+                        result,
+                    )
+                    return
+
+                yield render_chat_messages(
+                    thinking_process, tool_progress, response_text
+                )
+        except requests.exceptions.RequestException as e:
+            yield [f"Error connecting to backend service: {str(e)}"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class ImageCache:
+    """In-process LRU cache of image bytes with a byte budget.
+
+    Entries are keyed by user ID, session ID and image hash ID, matching the
+    scope of the session artifacts, so a session only gets images that were
+    uploaded or downloaded for it. The least recently used images
+    are evicted once the cached bytes exceed the budget; an image larger than
+    the whole budget is not cached.
+
+    Attributes:
+        max_bytes: Maximum total size of the cached images in bytes.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups not found in the cache.
+        evictions: Number of images evicted to stay within the budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str, str], tuple[bytes, str]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: str, session_id: str, image_hash: str
+    ) -> tuple[bytes, str] | None:
+        """Get a cached image and mark it as recently used.
+
+        Args:
+            user_id: The ID of the user
+            session_id: The ID of the session
+            image_hash: The hash identifier of the image
+
+        Returns:
+            tuple[bytes, str] | None: The image bytes and MIME type, or None on a miss
+        """
+        key = (user_id, session_id, image_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        user_id: str,
+        session_id: str,
+        image_hash: str,
+        data: bytes,
+        mime_type: str,
+    ):
+        """Cache an image, evicting the least recently used ones if needed.
+
+        Args:
+            user_id: The ID of the user
+            session_id: The ID of the session
+            image_hash: The hash identifier of the image
+            data: The image bytes
+            mime_type: MIME type of the image
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        key = (user_id, session_id, image_hash)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+
+            self._entries[key] = (data, mime_type)
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, (evicted_data, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted_data)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Get the cache metrics.
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions, entry count and cached bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
@@ -15,7 +15,7 @@ limitations under the License.
 """
 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 
 class ImageData(BaseModel):
@@ -46,6 +46,20 @@ class ChatRequest(BaseModel):
     user_id: str = "default_user"
 
 
+class AttachmentReference(BaseModel):
+    """Model for a reference to an image served by the attachments endpoint.
+
+    Attributes:
+        image_hash: Hash identifier of the image.
+        mime_type: MIME type of the image.
+        url: Path of the image on the backend, relative to its root.
+    """
+
+    image_hash: str
+    mime_type: str
+    url: str
+
+
 class ChatResponse(BaseModel):
     """Model for a chat response.
 
@@ -53,10 +67,34 @@ class ChatResponse(BaseModel):
         response: The text response from the model.
         thinking_process: Optional thinking process of the model.
         attachments: List of image data to be displayed to the user.
+        attachment_references: References to the images to be displayed to the
+            user, fetched separately as raw bytes.
         error: Optional error message if something went wrong.
+        failed_uploads: Hash IDs of uploaded images that could not be stored.
     """
 
     response: str
     thinking_process: str = ""
     attachments: List[ImageData] = []
+    attachment_references: List[AttachmentReference] = []
     error: Optional[str] = None
+    failed_uploads: List[str] = []
+
+
+class ChatStreamEvent(BaseModel):
+    """Model for an event of a streamed chat response.
+
+    Attributes:
+        type: Kind of event. "thinking" and "text" carry the next chunk of the
+            thinking process or of the response text, "tool_call" and
+            "tool_result" report tool progress, and "final" carries the
+            complete response and ends the stream.
+        text: Text chunk of "thinking" and "text" events.
+        tool_name: Name of the tool of "tool_call" and "tool_result" events.
+        response: The complete chat response of the "final" event.
+    """
+
+    type: Literal["thinking", "text", "tool_call", "tool_result", "final"]
+    text: str = ""
+    tool_name: str = ""
+    response: Optional[ChatResponse] = None
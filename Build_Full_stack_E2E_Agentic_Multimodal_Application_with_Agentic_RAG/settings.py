@@ -36,6 +36,8 @@ class Settings(BaseSettings):
         BACKEND_URL: URL for the backend service API endpoint.
         STORAGE_BUCKET_NAME: Name of the Google Cloud Storage bucket for storing receipts.
         DB_COLLECTION_NAME: Name of the Firestore collection for storing receipts.
+        ARTIFACT_UPLOAD_CONCURRENCY: Maximum number of image artifacts uploaded at once.
+        IMAGE_CACHE_MAX_BYTES: Byte budget of the in-process image cache.
     """
 
     GCLOUD_LOCATION: str
@@ -43,6 +45,8 @@ class Settings(BaseSettings):
     STORAGE_BUCKET_NAME: str
     BACKEND_URL: str = "http://localhost:8081/chat"
     DB_COLLECTION_NAME: str = "personal-expense-assistant-receipts"
+    ARTIFACT_UPLOAD_CONCURRENCY: int = 4
+    IMAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
 
     model_config = SettingsConfigDict(
         yaml_file="settings.yaml", yaml_file_encoding="utf-8"
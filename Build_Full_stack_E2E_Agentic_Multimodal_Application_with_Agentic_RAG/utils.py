@@ -16,6 +16,7 @@ limitations under the License.
 
 from google.cloud import storage
 from settings import get_settings
+import asyncio
 import base64
 import re
 from schema import ChatRequest, ImageData
@@ -23,6 +24,7 @@ from google.genai import types
 import hashlib
 import json
 from google.adk.artifacts import GcsArtifactService
+from image_cache import ImageCache
 import logger
 
 
@@ -32,6 +34,98 @@ GCS_BUCKET_CLIENT = storage.Client(project=SETTINGS.GCLOUD_PROJECT_ID).get_bucke
     SETTINGS.STORAGE_BUCKET_NAME
 )
 
+# Bounds concurrent artifact uploads across all requests
+ARTIFACT_UPLOAD_SEMAPHORE = asyncio.Semaphore(SETTINGS.ARTIFACT_UPLOAD_CONCURRENCY)
+
+# Keeps references to in-flight upload tasks so they finish even if the request is cancelled
+_PENDING_UPLOADS: set[asyncio.Task] = set()
+
+# Recently uploaded and downloaded images, so repeat attachments skip GCS
+IMAGE_CACHE = ImageCache(SETTINGS.IMAGE_CACHE_MAX_BYTES)
+
+
+def hash_image(image_byte: bytes) -> str:
+    """
+    Compute the hash ID of an image.
+
+    CPU-bound for large images, so callers run it in a worker thread.
+
+    Args:
+        image_byte: The image bytes
+
+    Returns:
+        str: The image hash ID
+    """
+    return hashlib.sha256(image_byte).hexdigest()[:12]
+
+
+def decode_and_hash_image(serialized_image: str) -> tuple[str, bytes]:
+    """
+    Decode a base64 image and compute its hash ID.
+
+    CPU-bound for large images, so callers run it in a worker thread.
+
+    Args:
+        serialized_image: Base64 encoded image content
+
+    Returns:
+        tuple[str, bytes]: A tuple containing the image hash ID and the image bytes
+    """
+    image_byte = base64.b64decode(serialized_image)
+
+    return hash_image(image_byte), image_byte
+
+
+async def upload_image_artifact(
+    artifact_service: GcsArtifactService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    image_hash_id: str,
+    image_byte: bytes,
+    mime_type: str,
+) -> str:
+    """
+    Upload an image as an artifact unless it is already stored.
+
+    At most SETTINGS.ARTIFACT_UPLOAD_CONCURRENCY uploads run at the same time.
+
+    Args:
+        artifact_service: The artifact service to use for storing artifacts
+        app_name: The name of the application
+        user_id: The ID of the user
+        session_id: The ID of the session
+        image_hash_id: The hash identifier of the image
+        image_byte: The image bytes
+        mime_type: MIME type of the image
+
+    Returns:
+        str: The image hash ID
+    """
+    async with ARTIFACT_UPLOAD_SEMAPHORE:
+        artifact_versions = await artifact_service.list_versions(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            filename=image_hash_id,
+        )
+        if artifact_versions:
+            logger.info(f"Image {image_hash_id} already exists in GCS, skipping upload")
+        else:
+            await artifact_service.save_artifact(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=image_hash_id,
+                artifact=types.Part(
+                    inline_data=types.Blob(mime_type=mime_type, data=image_byte)
+                ),
+            )
+
+    IMAGE_CACHE.put(user_id, session_id, image_hash_id, image_byte, mime_type)
+
+    return image_hash_id
+
 
 async def store_uploaded_image_as_artifact(
     artifact_service: GcsArtifactService,
@@ -54,46 +148,32 @@ async def store_uploaded_image_as_artifact(
         tuple[str, bytes]: A tuple containing the image hash ID and the image byte
     """
 
-    # Decode the base64 image data and use it to generate a hash id
-    image_byte = base64.b64decode(image_data.serialized_image)
-    hasher = hashlib.sha256(image_byte)
-    image_hash_id = hasher.hexdigest()[:12]
-
-    artifact_versions = await artifact_service.list_versions(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        filename=image_hash_id,
+    image_hash_id, image_byte = await asyncio.to_thread(
+        decode_and_hash_image, image_data.serialized_image
     )
-    if artifact_versions:
-        logger.info(f"Image {image_hash_id} already exists in GCS, skipping upload")
-
-        return image_hash_id, image_byte
-
-    await artifact_service.save_artifact(
+    await upload_image_artifact(
+        artifact_service=artifact_service,
         app_name=app_name,
         user_id=user_id,
         session_id=session_id,
-        filename=image_hash_id,
-        artifact=types.Part(
-            inline_data=types.Blob(mime_type=image_data.mime_type, data=image_byte)
-        ),
+        image_hash_id=image_hash_id,
+        image_byte=image_byte,
+        mime_type=image_data.mime_type,
     )
 
     return image_hash_id, image_byte
 
 
-async def download_image_from_gcs(
+async def load_image_from_gcs(
     artifact_service: GcsArtifactService,
     app_name: str,
     user_id: str,
     session_id: str,
     image_hash: str,
-) -> tuple[str, str] | None:
+) -> tuple[bytes, str] | None:
     """
-    Downloads an image artifact from Google Cloud Storage and
-    returns it as base64 encoded string with its MIME type.
-    Uses local caching to avoid redundant downloads.
+    Loads an image artifact from Google Cloud Storage as raw bytes with its
+    MIME type. Uses the in-process image cache to avoid redundant downloads.
 
     Args:
         artifact_service: The artifact service to use for downloading artifacts
@@ -103,8 +183,14 @@ async def download_image_from_gcs(
         image_hash: The hash identifier of the image to download
 
     Returns:
-        tuple[str, str] | None: A tuple containing (base64_encoded_data, mime_type), or None if download fails
+        tuple[bytes, str] | None: A tuple containing (image_bytes, mime_type), or None if download fails
     """
+    cached = IMAGE_CACHE.get(user_id, session_id, image_hash)
+    if cached:
+        logger.info(f"Image {image_hash} served from cache")
+
+        return cached
+
     try:
         artifact = await artifact_service.load_artifact(
             app_name=app_name,
@@ -121,46 +207,150 @@ async def download_image_from_gcs(
         mime_type = artifact.inline_data.mime_type
 
         logger.info(f"Downloaded image {image_hash} with type {mime_type}")
+        IMAGE_CACHE.put(user_id, session_id, image_hash, image_data, mime_type)
 
-        return base64.b64encode(image_data).decode("utf-8"), mime_type
+        return image_data, mime_type
     except Exception as e:
         logger.error(f"Error downloading image from GCS: {e}")
         return None
 
 
-async def format_user_request_to_adk_content_and_store_artifacts(
-    request: ChatRequest, app_name: str, artifact_service: GcsArtifactService
-) -> types.Content:
-    """Format a user request into ADK Content format.
+async def download_image_from_gcs(
+    artifact_service: GcsArtifactService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    image_hash: str,
+) -> tuple[str, str] | None:
+    """
+    Downloads an image artifact from Google Cloud Storage and
+    returns it as base64 encoded string with its MIME type.
+    Uses the in-process image cache to avoid redundant downloads.
 
     Args:
-        request: The chat request object containing text and optional files
+        artifact_service: The artifact service to use for downloading artifacts
+        app_name: The name of the application
+        user_id: The ID of the user
+        session_id: The ID of the session
+        image_hash: The hash identifier of the image to download
+
+    Returns:
+        tuple[str, str] | None: A tuple containing (base64_encoded_data, mime_type), or None if download fails
+    """
+    image = await load_image_from_gcs(
+        artifact_service=artifact_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        image_hash=image_hash,
+    )
+    if not image:
+        return None
+
+    image_data, mime_type = image
+
+    return base64.b64encode(image_data).decode("utf-8"), mime_type
+
+
+async def load_images_from_gcs(
+    artifact_service: GcsArtifactService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    image_hashes: list[str],
+) -> list[tuple[str, bytes, str]]:
+    """
+    Loads several image artifacts concurrently, serving cached ones
+    without a round trip to Google Cloud Storage.
+
+    Args:
+        artifact_service: The artifact service to use for downloading artifacts
+        app_name: The name of the application
+        user_id: The ID of the user
+        session_id: The ID of the session
+        image_hashes: The hash identifiers of the images to download
+
+    Returns:
+        list[tuple[str, bytes, str]]: (image_hash, image_bytes, mime_type) of each
+            image that could be downloaded, in the order of image_hashes
+    """
+    results = await asyncio.gather(
+        *(
+            load_image_from_gcs(
+                artifact_service=artifact_service,
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                image_hash=image_hash,
+            )
+            for image_hash in image_hashes
+        )
+    )
+
+    return [
+        (image_hash, *result)
+        for image_hash, result in zip(image_hashes, results)
+        if result
+    ]
+
+
+async def format_user_message_to_adk_content_and_store_artifacts(
+    text: str,
+    images: list[tuple[bytes, str]],
+    user_id: str,
+    session_id: str,
+    app_name: str,
+    artifact_service: GcsArtifactService,
+) -> tuple[types.Content, dict[str, asyncio.Task]]:
+    """Format a user message with raw image bytes into ADK Content format and
+    start storing its images.
+
+    Images are hashed concurrently in worker threads. Their uploads run in the
+    background, so the agent can start as soon as the content is built; use
+    wait_for_artifact_uploads before loading any of the artifacts.
+
+    Args:
+        text: The text content of the message
+        images: (image_bytes, mime_type) of each attached image
+        user_id: The ID of the user
+        session_id: The ID of the session
         app_name: The name of the application
         artifact_service: The artifact service to use for storing artifacts
 
     Returns:
-        types.Content: The formatted content for ADK
+        tuple[types.Content, dict[str, asyncio.Task]]: The formatted content for ADK
+            and the upload task of each image, keyed by image hash ID
     """
     # Create a list to hold parts
     parts = []
+    upload_tasks = {}
 
-    # Handle image files if present
-    for data in request.files:
-        # Process the image and add string placeholder
+    image_hash_ids = await asyncio.gather(
+        *(asyncio.to_thread(hash_image, image_byte) for image_byte, _ in images)
+    )
 
-        image_hash_id, image_byte = await store_uploaded_image_as_artifact(
-            artifact_service=artifact_service,
-            app_name=app_name,
-            user_id=request.user_id,
-            session_id=request.session_id,
-            image_data=data,
-        )
+    # Handle image files if present
+    for (image_byte, mime_type), image_hash_id in zip(images, image_hash_ids):
+        # Start the upload; the same image attached twice is uploaded once
+        if image_hash_id not in upload_tasks:
+            task = asyncio.create_task(
+                upload_image_artifact(
+                    artifact_service=artifact_service,
+                    app_name=app_name,
+                    user_id=user_id,
+                    session_id=session_id,
+                    image_hash_id=image_hash_id,
+                    image_byte=image_byte,
+                    mime_type=mime_type,
+                )
+            )
+            _PENDING_UPLOADS.add(task)
+            task.add_done_callback(_PENDING_UPLOADS.discard)
+            upload_tasks[image_hash_id] = task
 
         # Add inline data part
         parts.append(
-            types.Part(
-                inline_data=types.Blob(mime_type=data.mime_type, data=image_byte)
-            )
+            types.Part(inline_data=types.Blob(mime_type=mime_type, data=image_byte))
         )
 
         # Add image placeholder identifier
@@ -168,13 +358,71 @@ async def format_user_request_to_adk_content_and_store_artifacts(
         parts.append(types.Part(text=placeholder))
 
     # Handle if user didn't specify text input
-    if not request.text:
-        request.text = " "
-
-    parts.append(types.Part(text=request.text))
+    parts.append(types.Part(text=text or " "))
 
     # Create and return the Content object
-    return types.Content(role="user", parts=parts)
+    return types.Content(role="user", parts=parts), upload_tasks
+
+
+async def format_user_request_to_adk_content_and_store_artifacts(
+    request: ChatRequest, app_name: str, artifact_service: GcsArtifactService
+) -> tuple[types.Content, dict[str, asyncio.Task]]:
+    """Format a user request into ADK Content format and start storing its images.
+
+    Images are decoded concurrently in worker threads, then handled by
+    format_user_message_to_adk_content_and_store_artifacts.
+
+    Args:
+        request: The chat request object containing text and optional files
+        app_name: The name of the application
+        artifact_service: The artifact service to use for storing artifacts
+
+    Returns:
+        tuple[types.Content, dict[str, asyncio.Task]]: The formatted content for ADK
+            and the upload task of each image, keyed by image hash ID
+    """
+    image_bytes = await asyncio.gather(
+        *(
+            asyncio.to_thread(base64.b64decode, data.serialized_image)
+            for data in request.files
+        )
+    )
+
+    return await format_user_message_to_adk_content_and_store_artifacts(
+        text=request.text,
+        images=[
+            (image_byte, data.mime_type)
+            for image_byte, data in zip(image_bytes, request.files)
+        ],
+        user_id=request.user_id,
+        session_id=request.session_id,
+        app_name=app_name,
+        artifact_service=artifact_service,
+    )
+
+
+async def wait_for_artifact_uploads(upload_tasks: dict[str, asyncio.Task]) -> list[str]:
+    """Wait for background image uploads to finish.
+
+    Args:
+        upload_tasks: Upload tasks keyed by image hash ID
+
+    Returns:
+        list[str]: Hash IDs of the images that failed to upload
+    """
+    results = await asyncio.gather(*upload_tasks.values(), return_exceptions=True)
+
+    failed_uploads = []
+    for image_hash_id, result in zip(upload_tasks, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                "Failed to upload image artifact",
+                image_hash_id=image_hash_id,
+                error_message=str(result),
+            )
+            failed_uploads.append(image_hash_id)
+
+    return failed_uploads
 
 
 def sanitize_image_id(image_id: str) -> str:
@@ -291,3 +539,65 @@ def extract_thinking_process(response_text: str) -> tuple[str, str]:
         ).strip()
 
     return sanitized_text, thinking_process
+
+
+class ResponseSectionSplitter:
+    """Split streamed response text into thinking process and response chunks.
+
+    Incremental counterpart of extract_thinking_process. Text is released a
+    line at a time so section headings are never split across chunks. The
+    heading lines themselves are dropped, and so is everything after the
+    ATTACHMENTS heading or the JSON attachments block, which is only
+    resolved once the full response is known.
+    """
+
+    THINKING = "thinking"
+    TEXT = "text"
+    HIDDEN = "hidden"
+
+    def __init__(self):
+        self._buffer = ""
+        self._section = self.TEXT
+
+    def _split_lines(self, lines: list[str]) -> list[tuple[str, str]]:
+        chunks = []
+        for line in lines:
+            if re.match(r"#\s*THINKING PROCESS", line):
+                self._section = self.THINKING
+            elif re.match(r"#\s*FINAL RESPONSE", line):
+                self._section = self.TEXT
+            elif re.match(r"#\s*ATTACHMENTS|```json", line):
+                self._section = self.HIDDEN
+            elif self._section != self.HIDDEN:
+                if chunks and chunks[-1][0] == self._section:
+                    chunks[-1] = (self._section, chunks[-1][1] + line)
+                else:
+                    chunks.append((self._section, line))
+
+        return chunks
+
+    def feed(self, text: str) -> list[tuple[str, str]]:
+        """Add streamed text and get the chunks of the lines it completed.
+
+        Args:
+            text: The next piece of the streamed response text
+
+        Returns:
+            list[tuple[str, str]]: (section, text) chunks, where section is
+                "thinking" or "text"
+        """
+        self._buffer += text
+        complete, newline, self._buffer = self._buffer.rpartition("\n")
+
+        return self._split_lines((complete + newline).splitlines(keepends=True))
+
+    def flush(self) -> list[tuple[str, str]]:
+        """Get the chunks of the remaining incomplete line.
+
+        Returns:
+            list[tuple[str, str]]: (section, text) chunks, where section is
+                "thinking" or "text"
+        """
+        buffer, self._buffer = self._buffer, ""
+
+        return self._split_lines([buffer] if buffer else [])
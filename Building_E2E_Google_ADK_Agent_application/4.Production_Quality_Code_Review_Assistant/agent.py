@@ -7,38 +7,71 @@ Python code and provides detailed feedback through a multi-stage pipeline.
 
 from google.adk.agents import Agent
 from .config import config
+from .deadlines import with_deadline
+from .token_usage import record_model_usage
 from google.adk.agents import Agent, SequentialAgent
-from code_review_assistant.sub_agents.review_pipeline.code_analyzer import code_analyzer_agent
-from code_review_assistant.sub_agents.review_pipeline.style_checker import style_checker_agent
-from code_review_assistant.sub_agents.review_pipeline.test_runner import test_runner_agent
-from code_review_assistant.sub_agents.review_pipeline.feedback_synthesizer import feedback_synthesizer_agent
+from code_review_assistant.sub_agents.review_pipeline.code_analyzer import code_analyzer_agent, analysis_timeout_fallback
+from code_review_assistant.sub_agents.review_pipeline.style_checker import style_checker_agent, style_timeout_fallback
+from code_review_assistant.sub_agents.review_pipeline.test_runner import test_runner_agent, test_timeout_fallback
+from code_review_assistant.sub_agents.review_pipeline.feedback_synthesizer import (
+    feedback_synthesizer_agent,
+    feedback_timeout_fallback,
+    create_feedback_synthesizer,
+    project_feedback_instruction_provider,
+)
+from code_review_assistant.sub_agents.review_pipeline.project_analyzer import (
+    project_analyzer_agent,
+    project_timeout_fallback,
+)
 from google.adk.agents import LoopAgent  # Add this to the existing Agent, SequentialAgent line
-from code_review_assistant.sub_agents.fix_pipeline.code_fixer import code_fixer_agent
-from code_review_assistant.sub_agents.fix_pipeline.fix_test_runner import fix_test_runner_agent
+from code_review_assistant.sub_agents.fix_pipeline.code_fixer import code_fixer_agent, fixer_timeout_fallback
+from code_review_assistant.sub_agents.fix_pipeline.fix_test_runner import (
+    fix_test_runner_agent,
+    fix_full_suite_runner_agent,
+    fix_test_timeout_fallback,
+    full_suite_timeout_fallback,
+)
 from code_review_assistant.sub_agents.fix_pipeline.fix_validator import fix_validator_agent
 from code_review_assistant.sub_agents.fix_pipeline.fix_synthesizer import fix_synthesizer_agent
 
-# Create sequential pipeline
+# Create sequential pipeline; every stage has a deadline and a degraded-mode fallback
 code_review_pipeline = SequentialAgent(
     name="CodeReviewPipeline",
     description="Complete code review pipeline with analysis, testing, and feedback",
     sub_agents=[
-        code_analyzer_agent,
-        style_checker_agent,
-        test_runner_agent,
-        feedback_synthesizer_agent
+        with_deadline(code_analyzer_agent, config.analysis_stage_timeout_seconds, analysis_timeout_fallback),
+        with_deadline(style_checker_agent, config.analysis_stage_timeout_seconds, style_timeout_fallback),
+        with_deadline(test_runner_agent, config.test_stage_timeout_seconds, test_timeout_fallback),
+        with_deadline(feedback_synthesizer_agent, config.feedback_stage_timeout_seconds, feedback_timeout_fallback)
+    ]
+)
+
+# Multi-file projects: deterministic whole-project analysis, LLM feedback on the modules with issues
+project_review_pipeline = SequentialAgent(
+    name="ProjectReviewPipeline",
+    description="Reviews a multi-file project submitted as a zip file or directory",
+    sub_agents=[
+        with_deadline(project_analyzer_agent, config.project_analysis_timeout_seconds, project_timeout_fallback),
+        with_deadline(create_feedback_synthesizer("ProjectFeedbackSynthesizer",
+                                                instruction=project_feedback_instruction_provider),
+                      config.feedback_stage_timeout_seconds, feedback_timeout_fallback)
     ]
 )
 
-# Create the fix attempt loop (retries up to 3 times)
+# Create the fix attempt loop (retries up to max_fix_attempts times, stopping early on success or plateau)
 fix_attempt_loop = LoopAgent(
     name="FixAttemptLoop",
     sub_agents=[
-        code_fixer_agent,      # Step 1: Generate fixes
-        fix_test_runner_agent, # Step 2: Validate with tests
-        fix_validator_agent    # Step 3: Check success & possibly exit
+        # Step 1: Generate fixes
+        with_deadline(code_fixer_agent, config.fix_stage_timeout_seconds, fixer_timeout_fallback),
+        # Step 2: Validate with impacted tests
+        with_deadline(fix_test_runner_agent, config.test_stage_timeout_seconds, fix_test_timeout_fallback),
+        # Step 3: Full suite before declaring success
+        with_deadline(fix_full_suite_runner_agent, config.test_stage_timeout_seconds,
+                      full_suite_timeout_fallback),
+        fix_validator_agent    # Step 4: Check success & possibly exit
     ],
-    max_iterations=3  # Try up to 3 times
+    max_iterations=config.max_fix_attempts
 )
 
 # Wrap loop with synthesizer for final report
@@ -46,7 +79,7 @@ code_fix_pipeline = SequentialAgent(
     name="CodeFixPipeline",
     description="Automated code fixing pipeline with iterative validation",
     sub_agents=[
-        fix_attempt_loop,      # Try to fix (1-3 times)
+        fix_attempt_loop,      # Try to fix (1 to max_fix_attempts times)
         fix_synthesizer_agent  # Present final results (always runs once)
     ]
 )
@@ -64,6 +97,11 @@ When a user provides Python code for review:
 2. The pipeline will handle all analysis and feedback
 3. Return ONLY the final feedback from the pipeline - do not add any commentary
 
+When a user submits a multi-file project (an attached zip file, the name of an uploaded .zip artifact, or a project directory path):
+1. Delegate to ProjectReviewPipeline - do not paste file contents into CodeReviewPipeline
+2. Return ONLY the final feedback from the pipeline
+3. Do not offer automated fixes for project reviews
+
 After completing a review, if significant issues were identified:
 - If style score < 100 OR tests are failing OR critical issues exist:
   * Add at the end: "\n\n💡 I can fix these issues for you. Would you like me to do that?"
@@ -77,6 +115,7 @@ When a user asks what you can do or general questions:
 - Do NOT trigger the pipeline for non-code messages
 
 The pipelines handle everything for code review and fixing - just pass through their final output.""",
-    sub_agents=[code_review_pipeline, code_fix_pipeline],
+    sub_agents=[code_review_pipeline, project_review_pipeline, code_fix_pipeline],
+    after_model_callback=record_model_usage,
     output_key="assistant_response"
 )
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Resource-bounded structural analysis for the Code Review Assistant.
+
+ast.parse on deeply nested or multi-megabyte submissions can take seconds of
+CPU and a lot of memory, and it holds the GIL, so a thread does not keep the
+server responsive. Submissions are classified by size and shape first:
+
+- inline: small submissions are parsed in the server process
+- pool: medium ones in a shared pool of worker processes
+- isolated: large or suspicious ones (very long lines, deep nesting) in a
+  fresh subprocess with memory, CPU and wall-clock limits
+- too_large: longer than analysis_max_chars, never parsed
+
+Submissions that are too large, or exceed the isolated subprocess limits,
+get a structured "too large" result with partial metrics instead.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from . import code_structure
+from .code_structure import analyze_source, partial_metrics
+from .config import config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TIER_INLINE = "inline"
+TIER_POOL = "pool"
+TIER_ISOLATED = "isolated"
+TIER_TOO_LARGE = "too_large"
+
+_WORKER_SCRIPT = str(Path(code_structure.__file__).resolve())
+_NON_BRACKET_RE = re.compile(r"[^()\[\]{}]+")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _bracket_depth(code: str) -> int:
+    depth = deepest = 0
+    for char in _NON_BRACKET_RE.sub('', code):
+        if char in '([{':
+            depth += 1
+            deepest = max(deepest, depth)
+        else:
+            depth = max(depth - 1, 0)
+    return deepest
+
+
+def _indent_depth(lines) -> int:
+    """Deepest indentation in levels of four columns; a tab counts as one level."""
+    deepest = 0
+    for line in lines:
+        indent = line[:len(line) - len(line.lstrip(' \t'))]
+        deepest = max(deepest, indent.count('\t') + indent.count(' ') // 4)
+    return deepest
+
+
+def classify_submission(code: str) -> Tuple[str, Optional[str]]:
+    """
+    Chooses the analysis tier of a submission.
+
+    Returns:
+        (tier, reason) where reason explains isolated and too_large tiers
+    """
+    size = len(code)
+    if size > config.analysis_max_chars:
+        return TIER_TOO_LARGE, f"{size} characters exceeds the limit of {config.analysis_max_chars}"
+    if size > config.analysis_pool_max_chars:
+        return TIER_ISOLATED, f"{size} characters"
+
+    lines = code.splitlines()
+    longest = max(map(len, lines), default=0)
+    if longest > config.analysis_max_line_chars:
+        return TIER_ISOLATED, f"a line of {longest} characters"
+
+    depth = max(_bracket_depth(code), _indent_depth(lines))
+    if depth > config.analysis_max_nesting:
+        return TIER_ISOLATED, f"nesting depth {depth}"
+
+    if size > config.analysis_inline_max_chars:
+        return TIER_POOL, None
+    return TIER_INLINE, None
+
+
+def worker_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Return the multiprocessing context for worker pools.
+
+    Workers are started with forkserver (or spawn where it is unavailable),
+    never forked from the server process with its event loop and threads.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=config.analysis_pool_workers,
+                                        mp_context=worker_mp_context())
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _analyze_in_pool(code: str) -> Dict[str, Any]:
+    pool = _get_pool()
+    try:
+        analysis = await asyncio.get_running_loop().run_in_executor(pool, analyze_source, code)
+    except BrokenProcessPool:
+        # A worker died, e.g. killed by the OOM killer; start a fresh pool next time
+        _reset_pool(pool)
+        return {'status': 'too_large', 'reason': "the analysis worker process died"}
+    return {'status': 'success', 'analysis': analysis}
+
+
+async def _analyze_isolated(code: str) -> Dict[str, Any]:
+    timeout = config.analysis_isolated_timeout_seconds
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-I', _WORKER_SCRIPT,
+        str(config.analysis_isolated_memory_mb), str(max(1, math.ceil(timeout))),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(code.encode('utf-8', errors='replace')), timeout
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return {'status': 'too_large', 'reason': f"analysis exceeded {timeout:.0f}s"}
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+
+    if process.returncode != 0:
+        # Killed by the CPU limit, or crashed on the memory limit
+        logger.warning(f"Isolated analysis exited with {process.returncode}: "
+                       f"{stderr.decode(errors='replace')[-500:]}")
+        return {'status': 'too_large', 'reason': f"analysis exceeded the "
+                                                  f"{config.analysis_isolated_memory_mb}MB or CPU limit"}
+
+    result = json.loads(stdout)
+    if result['status'] == 'syntax_error':
+        error = SyntaxError(result['message'])
+        error.lineno = result['line']
+        error.offset = result['offset']
+        raise error
+    return result
+
+
+async def analyze_submission(code: str) -> Dict[str, Any]:
+    """
+    Analyzes the structure of a submission in the tier matching its size and shape.
+
+    Args:
+        code: Python source to analyze
+
+    Returns:
+        {'status': 'success', 'tier', 'analysis'} or
+        {'status': 'too_large', 'tier', 'reason', 'partial_metrics'}
+
+    Raises:
+        SyntaxError: If the code does not parse
+    """
+    start_time = time.perf_counter()
+    tier, reason = classify_submission(code)
+
+    if tier == TIER_INLINE:
+        result = {'status': 'success', 'analysis': analyze_source(code)}
+    elif tier == TIER_POOL:
+        result = await _analyze_in_pool(code)
+    elif tier == TIER_ISOLATED:
+        logger.info(f"Analyzing submission in an isolated subprocess ({reason})")
+        result = await _analyze_isolated(code)
+    else:
+        result = {'status': 'too_large', 'reason': reason}
+
+    result['tier'] = tier
+    if result['status'] == 'too_large':
+        result['partial_metrics'] = await asyncio.to_thread(partial_metrics, code)
+        logger.warning(f"Submission too large for full analysis ({tier} tier): {result['reason']}")
+
+    logger.debug(f"Analyzed submission in the {tier} tier in {time.perf_counter() - start_time:.3f}s")
+    return result
+
+
+# Module exports
+__all__ = [
+    'TIER_INLINE',
+    'TIER_POOL',
+    'TIER_ISOLATED',
+    'TIER_TOO_LARGE',
+    'classify_submission',
+    'analyze_submission',
+    'worker_mp_context',
+]
@@ -0,0 +1,227 @@
+"""
+Deterministic auto-fix for mechanical PEP 8 issues.
+
+Fixes whitespace (E2xx, W2xx) and blank line (E3xx, W3xx) violations reported
+by pycodestyle directly in code, so the LLM fixer only has to deal with real
+bugs and naming. A fix is only kept if the code still parses to an identical
+AST, so the pass can never change behaviour.
+"""
+
+import ast
+import io
+import logging
+import re
+import tokenize
+from collections import Counter
+from typing import Dict, Any, List, Set, Tuple
+
+import pycodestyle
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Must match the options used by tools._perform_style_check
+STYLE_OPTIONS = {'max_line_length': 100, 'ignore': ['E501', 'W503']}
+
+MAX_PASSES = 10
+
+_BLANK_LINES_RE = re.compile(r"expected (\d+) blank lines?.*?, found (\d+)")
+
+# Edits that delete the whitespace run at the reported column
+_DELETE_WHITESPACE = {'E201', 'E202', 'E203', 'E211', 'E251'}
+# Edits that collapse the whitespace run at the reported column to one space
+_COLLAPSE_WHITESPACE = {'E221', 'E222', 'E223', 'E224', 'E241', 'E242',
+                        'E271', 'E272', 'E273', 'E274'}
+# Edits that insert a single space at the reported column
+_INSERT_SPACE = {'E225', 'E226', 'E227', 'E228', 'E252', 'E275'}
+# Whole-line edits that add or remove blank lines
+_BLANK_LINE_CODES = {'E301', 'E302', 'E303', 'E304', 'E305', 'E306', 'W391'}
+
+
+class _CollectingReport(pycodestyle.BaseReport):
+    """pycodestyle report that keeps (line, column, code, text) for every issue."""
+
+    def init_file(self, filename, lines, expected, line_offset):
+        super().init_file(filename, lines, expected, line_offset)
+        self.issues = []
+
+    def error(self, line_number, offset, text, check):
+        code = super().error(line_number, offset, text, check)
+        if code:
+            self.issues.append((line_number, offset, code, text))
+        return code
+
+
+def _collect_issues(lines: List[str]) -> List[Tuple[int, int, str, str]]:
+    style_guide = pycodestyle.StyleGuide(quiet=True, **STYLE_OPTIONS)
+    report = style_guide.init_report(_CollectingReport)
+    checker = pycodestyle.Checker(lines=lines, options=style_guide.options, report=report)
+    checker.check_all()
+    return report.issues
+
+
+def _string_interior_lines(code: str) -> Set[int]:
+    """Return 1-based line numbers that lie inside multi-line string literals."""
+    interior = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.start[0] != token.end[0] and token.type in (
+                    tokenize.STRING, getattr(tokenize, 'FSTRING_MIDDLE', tokenize.STRING)):
+                interior.update(range(token.start[0], token.end[0]))
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return interior
+
+
+def _whitespace_run(line: str, col: int) -> Tuple[int, int]:
+    """Find the whitespace run at col, or the one right after or before it."""
+    for start in (col, col + 1, col - 1):
+        if 0 <= start < len(line) and line[start] in ' \t':
+            while start > 0 and line[start - 1] in ' \t':
+                start -= 1
+            end = start
+            while end < len(line) and line[end] in ' \t':
+                end += 1
+            return start, end
+    return col, col
+
+
+def _fix_column(line: str, col: int, code: str) -> str:
+    """Apply a single column-level fix to a physical line."""
+    if code in _DELETE_WHITESPACE:
+        start, end = _whitespace_run(line, col)
+        return line[:start] + line[end:]
+    if code in _COLLAPSE_WHITESPACE:
+        start, end = _whitespace_run(line, col)
+        if end > start:
+            return line[:start] + ' ' + line[end:]
+        return line
+    if code in _INSERT_SPACE:
+        return line[:col] + ' ' + line[col:]
+    if code == 'E231':
+        return line[:col + 1] + ' ' + line[col + 1:]
+    if code == 'E261':
+        comment_start = line.index('#', col)
+        return line[:col].rstrip() + '  ' + line[comment_start:]
+    if code in ('E262', 'E265', 'E266'):
+        content = line.rstrip('\r\n')
+        newline = line[len(content):]
+        comment_start = content.index('#', col)
+        body = content[comment_start:].lstrip('#').lstrip(' \t\xa0')
+        return content[:comment_start] + ('# ' + body if body else '#') + newline
+    if code in ('W291', 'W293'):
+        content = line.rstrip('\r\n')
+        return content.rstrip(' \t\x0c') + line[len(content):]
+    return line
+
+
+def _insertion_point(lines: List[str], index: int) -> int:
+    """Move an insertion point above comments that belong to the definition at index."""
+    while index > 0 and lines[index - 1].lstrip().startswith('#'):
+        index -= 1
+    return index
+
+
+def _fix_blank_lines(lines: List[str], line_number: int, code: str, text: str) -> None:
+    """Add or remove blank lines in place for a blank line issue."""
+    index = line_number - 1
+
+    if code == 'W391':
+        while lines and not lines[-1].strip():
+            lines.pop()
+        return
+
+    if code in ('E303', 'E304'):
+        current = lines[index] if index < len(lines) else ''
+        allowed = 0 if code == 'E304' else (2 if not current[:1].isspace() else 1)
+        blank_start = index
+        while blank_start > 0 and not lines[blank_start - 1].strip():
+            blank_start -= 1
+        excess = (index - blank_start) - allowed
+        if excess > 0:
+            del lines[blank_start:blank_start + excess]
+        return
+
+    match = _BLANK_LINES_RE.search(text)
+    if match:
+        missing = int(match.group(1)) - int(match.group(2))
+        if missing > 0:
+            insert_at = _insertion_point(lines, index)
+            lines[insert_at:insert_at] = ['\n'] * missing
+
+
+def _apply_pass(code: str) -> Tuple[str, Counter]:
+    """Run pycodestyle once and apply every fix it supports."""
+    lines = code.splitlines(keepends=True)
+    issues = _collect_issues(lines)
+    string_lines = _string_interior_lines(code)
+    applied = Counter()
+
+    # Column fixes first (right to left), since they never change line numbers
+    column_issues = [issue for issue in issues if issue[2] not in _BLANK_LINE_CODES]
+    for line_number, col, code_id, _ in sorted(column_issues, key=lambda i: (i[0], i[1]), reverse=True):
+        if line_number in string_lines or line_number > len(lines):
+            continue
+        fixed = _fix_column(lines[line_number - 1], col, code_id)
+        if fixed != lines[line_number - 1]:
+            lines[line_number - 1] = fixed
+            applied[code_id] += 1
+
+    # Then blank line fixes, bottom-up so earlier line numbers stay valid
+    blank_issues = [issue for issue in issues if issue[2] in _BLANK_LINE_CODES]
+    for line_number, _, code_id, text in sorted(blank_issues, key=lambda i: i[0], reverse=True):
+        before = len(lines)
+        _fix_blank_lines(lines, line_number, code_id, text)
+        if len(lines) != before:
+            applied[code_id] += 1
+
+    fixed_code = ''.join(lines)
+    if any(issue[2] == 'W292' for issue in issues) and not fixed_code.endswith('\n'):
+        fixed_code += '\n'
+        applied['W292'] += 1
+
+    return fixed_code, applied
+
+
+def autofix_style(code: str) -> Dict[str, Any]:
+    """
+    Fixes mechanical whitespace and blank line issues in code.
+
+    Args:
+        code: Python source code
+
+    Returns:
+        Dictionary with the fixed code, counts of fixed issues per code and
+        whether the fix was applied (it is skipped for code that does not parse)
+    """
+    try:
+        original_ast = ast.dump(ast.parse(code))
+    except SyntaxError:
+        return {"status": "skipped", "code": code, "fixed": {}, "fixed_count": 0,
+                "message": "Code does not parse - auto-fix skipped"}
+
+    fixed_code = code
+    total = Counter()
+    for _ in range(MAX_PASSES):
+        candidate, applied = _apply_pass(fixed_code)
+        if not applied:
+            break
+
+        # Never accept a pass that changes what the code does
+        try:
+            if ast.dump(ast.parse(candidate)) != original_ast:
+                logger.warning("Auto-fix pass changed the AST - discarding it")
+                break
+        except SyntaxError:
+            logger.warning("Auto-fix pass broke the syntax - discarding it")
+            break
+
+        fixed_code = candidate
+        total.update(applied)
+
+    return {
+        "status": "success",
+        "code": fixed_code,
+        "fixed": dict(total),
+        "fixed_count": sum(total.values())
+    }
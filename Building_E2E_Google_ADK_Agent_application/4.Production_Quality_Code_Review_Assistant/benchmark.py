@@ -0,0 +1,462 @@
+"""
+End-to-end review benchmark for the Code Review Assistant.
+
+Runs the review and fix pipelines against the programs in benchmark_corpus/
+(buggy and clean submissions with their expected style scores, failing
+behaviours, test verdicts and fix status) and reports per-stage latency,
+token use and accuracy, so performance work cannot silently degrade review
+quality:
+
+    python -m code_review_assistant.benchmark                    # canned responses, no model calls
+    python -m code_review_assistant.benchmark --mode record      # live models, responses are saved
+    python -m code_review_assistant.benchmark --mode replay      # replays the saved responses
+    python -m code_review_assistant.benchmark --mode replay --output run.json --baseline previous.json
+
+Stubbed runs (the default) only measure the deterministic stages and
+pipeline overhead. Their test and fix results are derived from the case
+expectations, so accuracy is reported as n/a.
+
+No recordings ship with the corpus. To create them, configure model access
+as for the agent itself and run --mode record once. One JSON file per case
+is written to benchmark_corpus/recordings/ (or --recordings); commit it to
+make replay runs reproducible. Replayed responses wait for their recorded
+latency (times --latency-scale), so stage latencies stay comparable between
+runs. With --baseline the run exits with status 1 when an accuracy metric
+drops or latency regresses.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Any, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse, LLMRegistry
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .agent import code_fix_pipeline, code_review_pipeline
+from .config import config
+from .constants import StateKeys
+from .tools import parse_json_output
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CORPUS_DIR = Path(__file__).parent / "benchmark_corpus"
+APP_NAME = "code_review_benchmark"
+
+MODE_REPLAY = "replay"
+MODE_RECORD = "record"
+MODE_STUB = "stub"
+
+# Accuracy metrics where higher is better; the false alarm rate is compared separately
+ACCURACY_METRICS = ('style_accuracy', 'failure_recall', 'verdict_accuracy', 'fix_accuracy')
+
+_current_case: contextvars.ContextVar["CaseRun"] = contextvars.ContextVar("benchmark_case")
+
+
+class BenchmarkError(Exception):
+    """Raised when a case cannot be run, e.g. a recorded response is missing."""
+
+
+@dataclass
+class CaseRun:
+    """A benchmark case being run, with its model calls and measurements."""
+    case: Dict[str, Any]
+    recordings: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    calls: Dict[str, int] = field(default_factory=dict)
+    latency: Dict[str, float] = field(default_factory=dict)
+    tokens: Dict[str, int] = field(default_factory=dict)
+
+    def next_call(self, agent_name: str) -> int:
+        index = self.calls.get(agent_name, 0)
+        self.calls[agent_name] = index + 1
+        return index
+
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR) -> List[Dict[str, Any]]:
+    """Load the benchmark cases with their source code."""
+    manifest = json.loads((corpus_dir / "cases.json").read_text(encoding="utf-8"))
+    cases = []
+    for case in manifest["cases"]:
+        case = dict(case)
+        case["code"] = (corpus_dir / case["file"]).read_text(encoding="utf-8")
+        if case.get("fixed_file"):
+            case["fixed_code"] = (corpus_dir / case["fixed_file"]).read_text(encoding="utf-8")
+        cases.append(case)
+    return cases
+
+
+def _stub_text(case: Dict[str, Any], agent_name: str) -> str:
+    """Canned response of an LLM stage, derived from the case expectations."""
+    expected = case["expected"]
+    if agent_name == "TestRunner":
+        failures = expected.get("failures", [])
+        issues = [{'type': 'bug', 'description': keywords[0], 'severity': 'high'} for keywords in failures]
+        return json.dumps({
+            'test_summary': {'total_tests_run': 10, 'tests_passed': 10 - len(issues), 'tests_failed': len(issues),
+                             'tests_with_errors': 0, 'critical_issues_found': len(issues)},
+            'critical_issues': issues,
+            'verdict': {'status': expected.get("verdict", "WORKING"), 'confidence': 'high',
+                        'recommendation': 'Benchmark stub'}
+        })
+    if agent_name == "CodeFixer":
+        return case.get("fixed_code") or case["code"]
+    if agent_name in ("FixTestRunner", "FixFullSuiteRunner"):
+        return json.dumps({'passed': 10, 'failed': 0, 'total': 10, 'pass_rate': 100,
+                           'newly_passing_tests': [], 'still_failing_tests': []})
+    return f"Benchmark stub response from {agent_name}."
+
+
+class BenchmarkLlm(BaseLlm):
+    """
+    Model of one LLM stage during a benchmark run.
+
+    Records the responses of the configured (or routed) model, replays
+    recorded responses, or returns canned stub responses.
+    """
+
+    agent_name: str
+    mode: str = MODE_REPLAY
+    latency_scale: float = 1.0
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return []
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        run = _current_case.get()
+        index = run.next_call(self.agent_name)
+
+        if self.mode == MODE_STUB:
+            yield LlmResponse(content=types.Content(
+                role="model", parts=[types.Part(text=_stub_text(run.case, self.agent_name))]
+            ))
+            return
+
+        if self.mode == MODE_REPLAY:
+            calls = run.recordings.get(self.agent_name, [])
+            if index >= len(calls):
+                raise BenchmarkError(f"No recorded response for call {index + 1} of {self.agent_name} "
+                                     f"in case {run.case['id']} - run with --mode record")
+            await asyncio.sleep(calls[index]["latency_seconds"] * self.latency_scale)
+            for response in calls[index]["responses"]:
+                yield LlmResponse.model_validate(response)
+            return
+
+        # Record: call the model the request was routed to and keep its responses
+        llm = LLMRegistry.new_llm(llm_request.model or self.model)
+        start_time = time.perf_counter()
+        responses = []
+        async for response in llm.generate_content_async(llm_request, stream=False):
+            responses.append(response)
+        run.recordings.setdefault(self.agent_name, []).append({
+            'model': llm_request.model,
+            'latency_seconds': time.perf_counter() - start_time,
+            'responses': [response.model_dump(mode='json', exclude_none=True) for response in responses]
+        })
+        for response in responses:
+            yield response
+
+
+def _llm_agents(agent: BaseAgent) -> List[LlmAgent]:
+    agents = [agent] if isinstance(agent, LlmAgent) else []
+    for sub_agent in agent.sub_agents:
+        agents.extend(_llm_agents(sub_agent))
+    return agents
+
+
+@contextmanager
+def benchmark_models(mode: str, latency_scale: float):
+    """Route every LLM stage of the pipelines through BenchmarkLlm for the duration."""
+    agents = _llm_agents(code_review_pipeline) + _llm_agents(code_fix_pipeline)
+    original_models = {id(agent): agent.model for agent in agents}
+    similarity_enabled = config.similarity_index_enabled
+    try:
+        for agent in agents:
+            model = agent.model if isinstance(agent.model, str) else agent.model.model
+            agent.model = BenchmarkLlm(model=model, agent_name=agent.name, mode=mode, latency_scale=latency_scale)
+        # Cases must not reuse each other's reviews
+        config.similarity_index_enabled = False
+        yield
+    finally:
+        for agent in agents:
+            agent.model = original_models[id(agent)]
+        config.similarity_index_enabled = similarity_enabled
+
+
+def _recording_path(recordings_dir: Path, case_id: str) -> Path:
+    return recordings_dir / f"{case_id}.json"
+
+
+async def _run_pipeline(runner: Runner, run: CaseRun, user_id: str, session_id: str, text: str) -> None:
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    last = time.perf_counter()
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+        # Time since the previous event is spent producing this one
+        now = time.perf_counter()
+        run.latency[event.author] = run.latency.get(event.author, 0.0) + now - last
+        last = now
+        if event.usage_metadata and not event.partial:
+            run.tokens[event.author] = run.tokens.get(event.author, 0) + (event.usage_metadata.total_token_count or 0)
+
+
+def score_case(case: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare the review (and fix) results in session state with the case expectations."""
+    expected = case["expected"]
+    summary = parse_json_output(state.get(StateKeys.TEST_EXECUTION_SUMMARY))
+    issue_texts = [json.dumps(issue).lower() for issue in summary.get('critical_issues') or []]
+    failures = expected.get("failures", [])
+    found = [any(keyword in text for text in issue_texts for keyword in keywords) for keywords in failures]
+
+    style_score = state.get(StateKeys.STYLE_SCORE)
+    scores = {
+        'style_score': style_score,
+        'style_ok': style_score is not None and
+                    abs(style_score - expected["style_score"]) <= expected.get("style_tolerance", 5),
+        'failures_found': sum(found),
+        'failures_expected': len(failures),
+        'false_alarm': not failures and bool(issue_texts),
+        'verdict': (summary.get('verdict') or {}).get('status'),
+    }
+    if expected.get("verdict"):
+        scores['verdict_ok'] = scores['verdict'] == expected["verdict"]
+    if expected.get("fix_status"):
+        scores['fix_status'] = state.get(StateKeys.FIX_STATUS)
+        scores['fix_ok'] = scores['fix_status'] == expected["fix_status"]
+    return scores
+
+
+async def run_case(case: Dict[str, Any], session_service: InMemorySessionService, mode: str,
+                   recordings_dir: Path, run_fix: bool) -> Dict[str, Any]:
+    """Run the review (and fix) pipelines on one case and score the results."""
+    run = CaseRun(case=case)
+    _current_case.set(run)
+    if mode == MODE_REPLAY:
+        path = _recording_path(recordings_dir, case["id"])
+        if not path.exists():
+            raise BenchmarkError(f"No recordings for case {case['id']} in {recordings_dir} - run with --mode record")
+        run.recordings = json.loads(path.read_text(encoding="utf-8"))
+
+    user_id = f"benchmark-{case['id']}"
+    session = await session_service.create_session(app_name=APP_NAME, user_id=user_id)
+    services = dict(app_name=APP_NAME, session_service=session_service,
+                    artifact_service=InMemoryArtifactService(), memory_service=InMemoryMemoryService())
+
+    start_time = time.perf_counter()
+    await _run_pipeline(Runner(agent=code_review_pipeline, **services), run, user_id, session.id,
+                        f"Please review this code:\n\n```python\n{case['code']}```")
+    if run_fix and case["expected"].get("fix_status"):
+        await _run_pipeline(Runner(agent=code_fix_pipeline, **services), run, user_id, session.id,
+                            "Yes, please fix the issues.")
+    elapsed = time.perf_counter() - start_time
+
+    if mode == MODE_RECORD:
+        recordings_dir.mkdir(parents=True, exist_ok=True)
+        _recording_path(recordings_dir, case["id"]).write_text(json.dumps(run.recordings, indent=1),
+                                                               encoding="utf-8")
+
+    session = await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+    return {
+        'id': case["id"],
+        'latency_seconds': elapsed,
+        'stage_latency': run.latency,
+        'stage_tokens': run.tokens,
+        'scores': score_case(case, session.state)
+    }
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))] if ordered else 0.0
+
+
+def _rate(flags: List[bool]) -> Optional[float]:
+    return sum(flags) / len(flags) if flags else None
+
+
+def summarize(results: List[Dict[str, Any]], mode: str = MODE_REPLAY) -> Dict[str, Any]:
+    """
+    Aggregate per-case results into stage latency, token and accuracy metrics.
+
+    Accuracy is None (n/a) in stub mode, where model outputs come from the expectations.
+    """
+    completed = [result for result in results if 'error' not in result]
+    stages: Dict[str, Dict[str, Any]] = {}
+    for stage in sorted({stage for result in completed for stage in result['stage_latency']}):
+        latencies = [result['stage_latency'][stage] for result in completed if stage in result['stage_latency']]
+        tokens = [result['stage_tokens'].get(stage, 0) for result in completed if stage in result['stage_latency']]
+        stages[stage] = {
+            'cases': len(latencies),
+            'mean_seconds': statistics.fmean(latencies),
+            'p50_seconds': _percentile(latencies, 0.5),
+            'p95_seconds': _percentile(latencies, 0.95),
+            'mean_tokens': statistics.fmean(tokens),
+        }
+
+    scores = [result['scores'] for result in completed]
+    expected_failures = sum(score['failures_expected'] for score in scores)
+    clean = [score for score in scores if not score['failures_expected']]
+    case_latencies = [result['latency_seconds'] for result in completed]
+    accuracy = {
+        'style_accuracy': _rate([score['style_ok'] for score in scores]),
+        'failure_recall': (sum(score['failures_found'] for score in scores) / expected_failures
+                           if expected_failures else None),
+        'false_alarm_rate': _rate([score['false_alarm'] for score in clean]),
+        'verdict_accuracy': _rate([score['verdict_ok'] for score in scores if 'verdict_ok' in score]),
+        'fix_accuracy': _rate([score['fix_ok'] for score in scores if 'fix_ok' in score]),
+    }
+    if mode == MODE_STUB:
+        accuracy = dict.fromkeys(accuracy)
+    return {
+        'cases': len(results),
+        'errors': [{'id': result['id'], 'error': result['error']} for result in results if 'error' in result],
+        'latency_p50_seconds': _percentile(case_latencies, 0.5),
+        'latency_p95_seconds': _percentile(case_latencies, 0.95),
+        'total_tokens': sum(sum(result['stage_tokens'].values()) for result in completed),
+        'stages': stages,
+        'accuracy': accuracy,
+    }
+
+
+def compare_to_baseline(summary: Dict[str, Any], baseline: Dict[str, Any],
+                        max_latency_regression: float) -> List[str]:
+    """Return the regressions of a run against a baseline summary."""
+    regressions = []
+    for metric in ACCURACY_METRICS:
+        current, previous = summary['accuracy'].get(metric), baseline['accuracy'].get(metric)
+        if current is not None and previous is not None and current < previous - 1e-9:
+            regressions.append(f"{metric} dropped from {previous:.2f} to {current:.2f}")
+
+    current, previous = summary['accuracy'].get('false_alarm_rate'), baseline['accuracy'].get('false_alarm_rate')
+    if current is not None and previous is not None and current > previous + 1e-9:
+        regressions.append(f"false_alarm_rate rose from {previous:.2f} to {current:.2f}")
+
+    for metric in ('latency_p50_seconds', 'latency_p95_seconds'):
+        current, previous = summary[metric], baseline.get(metric)
+        if previous and current > previous * (1 + max_latency_regression):
+            regressions.append(f"{metric} rose from {previous:.2f}s to {current:.2f}s")
+    return regressions
+
+
+def format_report(summary: Dict[str, Any], mode: str) -> str:
+    """Render a run summary as text."""
+    rows = [["Stage", "Cases", "Mean s", "P50 s", "P95 s", "Tokens/case"]]
+    for stage, stats in sorted(summary['stages'].items(), key=lambda item: item[1]['mean_seconds'], reverse=True):
+        rows.append([stage, str(stats['cases']), f"{stats['mean_seconds']:.2f}", f"{stats['p50_seconds']:.2f}",
+                     f"{stats['p95_seconds']:.2f}", f"{stats['mean_tokens']:.0f}"])
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = [f"Benchmark ({mode}): {summary['cases']} cases, {len(summary['errors'])} errors, "
+             f"p50 {summary['latency_p50_seconds']:.2f}s, p95 {summary['latency_p95_seconds']:.2f}s, "
+             f"{summary['total_tokens']} tokens", ""]
+    lines += ["  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                        for column, (cell, width) in enumerate(zip(row, widths)))
+              for row in rows]
+    lines.insert(3, "  ".join("-" * width for width in widths))
+
+    lines.append("")
+    for metric, value in summary['accuracy'].items():
+        lines.append(f"{metric}: {'n/a' if value is None else f'{value:.2f}'}")
+    for error in summary['errors']:
+        lines.append(f"ERROR {error['id']}: {error['error']}")
+    return "\n".join(lines)
+
+
+async def run_benchmark(cases: List[Dict[str, Any]], mode: str, recordings_dir: Path,
+                        concurrency: int, run_fix: bool = True,
+                        latency_scale: float = 1.0) -> List[Dict[str, Any]]:
+    """Run all cases, at most concurrency at a time; failed cases are reported with their error."""
+    session_service = InMemorySessionService()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(case):
+        async with semaphore:
+            try:
+                return await run_case(case, session_service, mode, recordings_dir, run_fix)
+            except Exception as e:
+                logger.error(f"Benchmark case {case['id']} failed: {e}", exc_info=not isinstance(e, BenchmarkError))
+                return {'id': case['id'], 'error': str(e)}
+
+    with benchmark_models(mode, latency_scale):
+        # Each case runs in its own task, so the current case is task-local
+        return await asyncio.gather(*(run_one(case) for case in cases))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark review latency, token use and accuracy.")
+    parser.add_argument('--mode', choices=(MODE_REPLAY, MODE_RECORD, MODE_STUB), default=MODE_STUB,
+                        help="Use stubs (default, no accuracy metrics), record model responses, "
+                             "or replay recorded ones")
+    parser.add_argument('--corpus', type=Path, default=CORPUS_DIR, help="Corpus directory with cases.json")
+    parser.add_argument('--recordings', type=Path, help="Recorded responses (default: <corpus>/recordings)")
+    parser.add_argument('--cases', help="Comma-separated case ids to run (default: all)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Cases run in parallel (default 4)")
+    parser.add_argument('--no-fix', action='store_true', help="Only run the review pipeline")
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="Multiplier for recorded model latency in replay mode (0 = no waiting)")
+    parser.add_argument('--output', type=Path, help="Write the results and summary as JSON")
+    parser.add_argument('--baseline', type=Path, help="JSON output of an earlier run to compare against")
+    parser.add_argument('--max-latency-regression', type=float, default=0.2,
+                        help="Allowed relative latency increase over the baseline (default 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    cases = load_corpus(args.corpus)
+    if args.cases:
+        wanted = set(args.cases.split(','))
+        cases = [case for case in cases if case['id'] in wanted]
+        if not cases:
+            parser.error(f"no cases match {args.cases}")
+
+    recordings_dir = args.recordings or args.corpus / "recordings"
+    results = asyncio.run(run_benchmark(cases, args.mode, recordings_dir, args.concurrency,
+                                        run_fix=not args.no_fix, latency_scale=args.latency_scale))
+    summary = summarize(results, args.mode)
+    print(format_report(summary, args.mode))
+
+    if args.output:
+        args.output.write_text(json.dumps({'mode': args.mode, 'summary': summary, 'results': results}, indent=2),
+                               encoding="utf-8")
+
+    status = 1 if summary['errors'] else 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(summary, baseline['summary'], args.max_latency_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            status = 1
+    return status
+
+
+# Module exports
+__all__ = [
+    'BenchmarkError',
+    'BenchmarkLlm',
+    'load_corpus',
+    'score_case',
+    'run_case',
+    'run_benchmark',
+    'summarize',
+    'compare_to_baseline',
+    'format_report',
+]
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,9 @@
+def average(values):
+    """Return the arithmetic mean of a list of numbers."""
+    return sum(values) / len(values)
+
+
+def normalize(values):
+    """Scale values so that they sum to one."""
+    total = sum(values)
+    return [value / total for value in values]
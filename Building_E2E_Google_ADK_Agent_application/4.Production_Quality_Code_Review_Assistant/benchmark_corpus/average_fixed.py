@@ -0,0 +1,13 @@
+def average(values):
+    """Return the arithmetic mean of a list of numbers, or 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    return sum(values) / len(values)
+
+
+def normalize(values):
+    """Scale values so that they sum to one; an all-zero list is returned unchanged."""
+    total = sum(values)
+    if total == 0:
+        return list(values)
+    return [value / total for value in values]
@@ -0,0 +1,18 @@
+def binary_search(items, target):
+    """
+    Return the index of target in the sorted list items, or -1 if it is absent.
+
+    Args:
+        items: List sorted in ascending order
+        target: Value to look for
+    """
+    low, high = 0, len(items) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        if items[middle] == target:
+            return middle
+        if items[middle] < target:
+            low = middle + 1
+        else:
+            high = middle - 1
+    return -1
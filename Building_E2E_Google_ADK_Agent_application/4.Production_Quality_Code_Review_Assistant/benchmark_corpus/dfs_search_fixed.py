@@ -0,0 +1,19 @@
+def dfs_search_v1(graph, start, target):
+    """Return True if target is reachable from start in the adjacency-list graph."""
+    visited = set()
+    stack = [start]
+
+    while stack:
+        current = stack.pop()
+
+        if current == target:
+            return True
+
+        if current not in visited:
+            visited.add(current)
+
+            for neighbor in graph.get(current, []):
+                if neighbor not in visited:
+                    stack.append(neighbor)
+
+    return False
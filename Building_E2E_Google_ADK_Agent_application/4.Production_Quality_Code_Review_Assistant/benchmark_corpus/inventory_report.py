@@ -0,0 +1,7 @@
+def low_stock(inventory, threshold=5):
+    """Return the names of items with fewer than threshold units in stock."""
+    return [name for name, units in inventory.items() if units<threshold]
+
+def restock_order(inventory, target=20):
+    """Return the units to order per item to bring stock up to target."""
+    return {name: target-units for name, units in inventory.items() if units < target}
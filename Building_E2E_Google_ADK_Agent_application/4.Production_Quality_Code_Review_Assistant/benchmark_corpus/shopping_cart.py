@@ -0,0 +1,13 @@
+class ShoppingCart:
+    """A shopping cart holding (name, price, quantity) items."""
+
+    def __init__(self, items=[]):
+        self.items = items
+
+    def add_item(self, name, price, quantity=1):
+        """Add an item to the cart."""
+        self.items.append((name, price, quantity))
+
+    def total(self):
+        """Return the total price of the cart."""
+        return sum(price * quantity for _, price, quantity in self.items)
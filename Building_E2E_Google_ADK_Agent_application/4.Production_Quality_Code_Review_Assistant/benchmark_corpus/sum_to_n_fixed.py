@@ -0,0 +1,11 @@
+def sum_to_n(n):
+    """Return the sum of the integers from 1 to n inclusive."""
+    total = 0
+    for i in range(1, n + 1):
+        total += i
+    return total
+
+
+def sum_of_squares(n):
+    """Return the sum of the squares of the integers from 1 to n inclusive."""
+    return sum(i * i for i in range(1, n + 1))
@@ -0,0 +1,12 @@
+import math,sys
+def CelsiusToFahrenheit(Celsius):
+    return Celsius*9/5+32
+def FahrenheitToCelsius( f ):
+  return (f-32)*5/9
+class temperature_log:
+    def __init__(self):
+        self.Readings=[]
+    def Add(self,value):
+        self.Readings.append(value)
+    def maximum(self):
+        return max(self.Readings) if self.Readings else None
@@ -0,0 +1,23 @@
+def celsius_to_fahrenheit(celsius):
+    """Convert degrees Celsius to degrees Fahrenheit."""
+    return celsius * 9 / 5 + 32
+
+
+def fahrenheit_to_celsius(fahrenheit):
+    """Convert degrees Fahrenheit to degrees Celsius."""
+    return (fahrenheit - 32) * 5 / 9
+
+
+class TemperatureLog:
+    """A log of temperature readings."""
+
+    def __init__(self):
+        self.readings = []
+
+    def add(self, value):
+        """Record a reading."""
+        self.readings.append(value)
+
+    def maximum(self):
+        """Return the highest reading, or None when the log is empty."""
+        return max(self.readings) if self.readings else None
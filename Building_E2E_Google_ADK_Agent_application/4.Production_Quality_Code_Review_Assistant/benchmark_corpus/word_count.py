@@ -0,0 +1,12 @@
+from collections import Counter
+
+
+def word_count(text):
+    """Return a Counter of the lowercase words in text, ignoring punctuation."""
+    words = (word.strip('.,;:!?"\'()').lower() for word in text.split())
+    return Counter(word for word in words if word)
+
+
+def most_common_words(text, count=3):
+    """Return the count most common (word, frequency) pairs in text."""
+    return word_count(text).most_common(count)
@@ -0,0 +1,159 @@
+"""
+Structural analysis of Python source for the Code Review Assistant.
+
+Only depends on the standard library, so it can run in worker processes
+and, as a script, in the isolated subprocess used for large or suspicious
+submissions (see analysis_tiers.py). The script reads the source from
+stdin, applies the memory and CPU limits given as arguments and writes a
+JSON result to stdout.
+"""
+
+import ast
+import json
+import re
+import sys
+from typing import Dict, Any
+
+# Line-based patterns for metrics of code that is not parsed
+_DEF_RE = re.compile(r"^[ \t]*(?:async[ \t]+)?def[ \t]+\w+", re.MULTILINE)
+_CLASS_RE = re.compile(r"^[ \t]*class[ \t]+\w+", re.MULTILINE)
+_IMPORT_RE = re.compile(r"^[ \t]*(?:import|from)[ \t]+[\w.]+", re.MULTILINE)
+
+
+def extract_code_structure(tree: ast.AST, code: str) -> Dict[str, Any]:
+    """
+    Extracts structural information from a parsed module.
+    Runs inline, in a worker process or in an isolated subprocess.
+    """
+    functions = []
+    classes = []
+    imports = []
+    docstrings = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            func_info = {
+                'name': node.name,
+                'args': [arg.arg for arg in node.args.args],
+                'lineno': node.lineno,
+                'has_docstring': ast.get_docstring(node) is not None,
+                'is_async': isinstance(node, ast.AsyncFunctionDef),
+                'decorators': [d.id for d in node.decorator_list
+                               if isinstance(d, ast.Name)]
+            }
+            functions.append(func_info)
+
+            if func_info['has_docstring']:
+                docstrings.append(f"{node.name}: {ast.get_docstring(node)[:50]}...")
+
+        elif isinstance(node, ast.ClassDef):
+            methods = []
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef):
+                    methods.append(item.name)
+
+            class_info = {
+                'name': node.name,
+                'lineno': node.lineno,
+                'methods': methods,
+                'has_docstring': ast.get_docstring(node) is not None,
+                'base_classes': [base.id for base in node.bases
+                                 if isinstance(base, ast.Name)]
+            }
+            classes.append(class_info)
+
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append({
+                    'module': alias.name,
+                    'alias': alias.asname,
+                    'type': 'import'
+                })
+        elif isinstance(node, ast.ImportFrom):
+            imports.append({
+                'module': node.module or '',
+                'names': [alias.name for alias in node.names],
+                'type': 'from_import',
+                'level': node.level
+            })
+
+    return {
+        'functions': functions,
+        'classes': classes,
+        'imports': imports,
+        'docstrings': docstrings,
+        'metrics': {
+            'line_count': len(code.splitlines()),
+            'function_count': len(functions),
+            'class_count': len(classes),
+            'import_count': len(imports),
+            'has_main': any(f['name'] == 'main' for f in functions),
+            'has_if_main': '__main__' in code,
+            'avg_function_length': calculate_avg_function_length(tree)
+        }
+    }
+
+
+def calculate_avg_function_length(tree: ast.AST) -> float:
+    """Calculate average function length in lines."""
+    function_lengths = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            if hasattr(node, 'end_lineno') and hasattr(node, 'lineno'):
+                length = node.end_lineno - node.lineno + 1
+                function_lengths.append(length)
+
+    if function_lengths:
+        return sum(function_lengths) / len(function_lengths)
+    return 0.0
+
+
+def analyze_source(code: str) -> Dict[str, Any]:
+    """Parse and analyze source code; raises SyntaxError for invalid code."""
+    return extract_code_structure(ast.parse(code), code)
+
+
+def partial_metrics(code: str) -> Dict[str, Any]:
+    """
+    Cheap metrics for code that is not parsed, with the same keys as full metrics.
+
+    Function, class and import counts come from line patterns and are estimates.
+    """
+    lines = code.splitlines()
+    return {
+        'line_count': len(lines),
+        'byte_count': len(code.encode('utf-8', errors='replace')),
+        'max_line_length': max(map(len, lines), default=0),
+        'function_count': len(_DEF_RE.findall(code)),
+        'class_count': len(_CLASS_RE.findall(code)),
+        'import_count': len(_IMPORT_RE.findall(code)),
+        'has_main': bool(re.search(r"^[ \t]*(?:async[ \t]+)?def[ \t]+main\b", code, re.MULTILINE)),
+        'has_if_main': '__main__' in code,
+        'avg_function_length': 0.0,
+        'partial': True
+    }
+
+
+def _isolated_main(memory_mb: int, cpu_seconds: int) -> None:
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    except (ImportError, ValueError, OSError):
+        # No rlimits on this platform; the parent's wall-clock timeout still applies
+        pass
+
+    code = sys.stdin.buffer.read().decode("utf-8", errors="replace")
+    try:
+        result = {'status': 'success', 'analysis': analyze_source(code)}
+    except SyntaxError as e:
+        result = {'status': 'syntax_error', 'message': e.msg, 'line': e.lineno, 'offset': e.offset}
+    except (MemoryError, RecursionError) as e:
+        result = {'status': 'too_large', 'reason': f"{type(e).__name__} while parsing"}
+    json.dump(result, sys.stdout)
+
+
+if __name__ == '__main__':
+    _isolated_main(int(sys.argv[1]), int(sys.argv[2]))
@@ -51,6 +51,17 @@ class AgentConfig(BaseSettings):
         default=None, description="The name of the database."
     )
 
+    # --- In-Memory Session Limits (used when no session database is configured) ---
+    session_ttl_seconds: int = Field(
+        default=6 * 3600, ge=0, description="Evict sessions idle longer than this (0 = never)."
+    )
+    session_max_count: int = Field(
+        default=1000, ge=0, description="Max sessions kept in memory (0 = unlimited)."
+    )
+    session_memory_budget_bytes: int = Field(
+        default=256 * 1024 * 1024, ge=0, description="Approximate memory budget for all sessions (0 = unlimited)."
+    )
+
     # --- Agent Engine Configuration (for agent-engine deployment) ---
     agent_engine_id: Optional[str] = Field(
         default=None, description="ID of the deployed Vertex AI Agent Engine."
@@ -63,6 +74,23 @@ class AgentConfig(BaseSettings):
     artifact_bucket: Optional[str] = Field(
         default=None, description="GCS bucket for artifact storage (e.g., 'your-project-artifacts')"
     )
+    artifact_dir: Optional[str] = Field(
+        default=None, description="Local directory for artifact storage when no bucket is set."
+    )
+    artifact_mmap_threshold: int = Field(
+        default=1_000_000, ge=0, description="Read local artifacts at least this large through mmap."
+    )
+
+    # --- Memory Configuration ---
+    memory_db_path: Optional[str] = Field(
+        default=None, description="SQLite file for the local indexed memory service (unset = in-memory)."
+    )
+    memory_embedding_model: Optional[str] = Field(
+        default=None, description="Embedding model used to re-rank memory search results (optional)."
+    )
+    memory_search_limit: int = Field(
+        default=10, ge=1, description="Max memories returned per search."
+    )
 
     # --- Model Configuration ---
     google_genai_use_vertexai: bool = Field(
@@ -79,6 +107,162 @@ class AgentConfig(BaseSettings):
         default="gemini-2.5-pro", description="Advanced model for nuanced feedback."
     )
 
+    # --- Model Routing ---
+    model_routing_enabled: bool = Field(
+        default=True, description="Route small, simple submissions to the worker model."
+    )
+    routing_max_worker_lines: int = Field(
+        default=40, ge=0, description="Max code lines for the worker route."
+    )
+    routing_max_worker_symbols: int = Field(
+        default=5, ge=0, description="Max functions + classes for the worker route."
+    )
+    routing_max_worker_function_length: float = Field(
+        default=25.0, ge=0.0, description="Max average function length for the worker route."
+    )
+    routing_max_worker_style_issues: int = Field(
+        default=10, ge=0, description="Max style issues for the worker route."
+    )
+    routing_max_worker_critical_issues: int = Field(
+        default=1, ge=0, description="Max critical test issues for the worker route."
+    )
+
+    # --- Pipeline Stages ---
+    style_summary_use_llm: bool = Field(
+        default=False, description="Use the LLM to present style results instead of the fixed template."
+    )
+
+    # --- Analysis Resource Tiers ---
+    analysis_inline_max_chars: int = Field(
+        default=20_000, ge=0, description="Parse submissions up to this many characters inline in the server process."
+    )
+    analysis_pool_max_chars: int = Field(
+        default=500_000, ge=0, description="Parse submissions up to this many characters in the worker process pool."
+    )
+    analysis_max_chars: int = Field(
+        default=5_000_000, ge=0, description="Never parse longer submissions; only partial metrics are returned."
+    )
+    analysis_pool_workers: int = Field(
+        default=2, ge=1, description="Worker processes for medium-sized submissions."
+    )
+    analysis_max_nesting: int = Field(
+        default=60, ge=1, description="Bracket or indentation depth above which a submission is isolated."
+    )
+    analysis_max_line_chars: int = Field(
+        default=10_000, ge=1, description="Line length above which a submission is isolated."
+    )
+    analysis_isolated_memory_mb: int = Field(
+        default=512, ge=64, description="Address space limit of the isolated analysis subprocess."
+    )
+    analysis_isolated_timeout_seconds: float = Field(
+        default=10.0, gt=0.0, description="Time limit of the isolated analysis subprocess."
+    )
+
+    # --- Stage Deadlines (seconds per pipeline stage, 0 = no deadline) ---
+    analysis_stage_timeout_seconds: float = Field(
+        default=60.0, ge=0.0, description="Deadline for the code analysis and style check stages."
+    )
+    test_stage_timeout_seconds: float = Field(
+        default=180.0, ge=0.0, description="Deadline for test generation and execution stages."
+    )
+    feedback_stage_timeout_seconds: float = Field(
+        default=120.0, ge=0.0, description="Deadline for the feedback synthesis stage."
+    )
+    project_analysis_timeout_seconds: float = Field(
+        default=300.0, ge=0.0, description="Deadline for the whole-project analysis stage."
+    )
+    fix_stage_timeout_seconds: float = Field(
+        default=180.0, ge=0.0, description="Deadline for each code fix generation attempt."
+    )
+
+    # --- Token Accounting (prices in USD per million tokens) ---
+    token_accounting_enabled: bool = Field(
+        default=True, description="Record token usage and cost of every model call."
+    )
+    worker_input_cost_per_million: float = Field(
+        default=0.30, ge=0.0, description="Input token price of the worker model."
+    )
+    worker_output_cost_per_million: float = Field(
+        default=2.50, ge=0.0, description="Output (including thinking) token price of the worker model."
+    )
+    critic_input_cost_per_million: float = Field(
+        default=1.25, ge=0.0, description="Input token price of the critic model."
+    )
+    critic_output_cost_per_million: float = Field(
+        default=10.00, ge=0.0, description="Output (including thinking) token price of the critic model."
+    )
+
+    # --- Project Review ---
+    project_review_root: Optional[str] = Field(
+        default=None,
+        description="Directory under which project directories may be reviewed; unset disables directory mode."
+    )
+    project_max_files: int = Field(default=1000, gt=0, description="Max Python files per project.")
+    project_max_file_bytes: int = Field(default=1_000_000, gt=0, description="Max size of a single module.")
+    project_max_total_bytes: int = Field(default=50_000_000, gt=0, description="Max total source size per project.")
+    project_review_workers: int = Field(
+        default=0, ge=0, description="Worker processes for module analysis (0 = CPU count)."
+    )
+    project_parallel_min_files: int = Field(
+        default=8, ge=1, description="Analyze smaller projects inline instead of in worker processes."
+    )
+    project_max_llm_modules: int = Field(
+        default=10, gt=0, description="Max modules with issues passed to the LLM stages."
+    )
+    project_max_llm_lines: int = Field(
+        default=1500, gt=0, description="Max total lines of modules passed to the LLM stages."
+    )
+
+    # --- Near-Duplicate Reuse ---
+    similarity_index_enabled: bool = Field(
+        default=True, description="Reuse the tests and feedback of near-duplicate past submissions."
+    )
+    similarity_index_path: str = Field(
+        default=".review_cache/similarity_index.json", description="Local file backing the similarity index."
+    )
+    similarity_index_max_entries: int = Field(
+        default=2000, gt=0, description="Max reviews kept in the index (least recently used are evicted)."
+    )
+    similarity_threshold: float = Field(
+        default=0.85, ge=0.0, le=1.0, description="Min estimated similarity to reuse a prior review."
+    )
+    similarity_num_perm: int = Field(default=128, gt=0, description="MinHash signature length.")
+    similarity_lsh_bands: int = Field(
+        default=32, gt=0, description="LSH bands; must divide similarity_num_perm."
+    )
+    similarity_shingle_size: int = Field(default=5, gt=0, description="Tokens per shingle.")
+    similarity_max_feedback_chars: int = Field(
+        default=8000, gt=0, description="Max characters of prior feedback stored per review."
+    )
+
+    # --- Feedback History ---
+    feedback_history_depth: int = Field(
+        default=10, gt=0, description="Recent reviews kept in full in the per-user history."
+    )
+    feedback_history_compaction_batch: int = Field(
+        default=5, gt=0, description="Older reviews folded into pattern counters at a time."
+    )
+    feedback_history_max_bytes: int = Field(
+        default=32_000, gt=0, description="Hard cap on the serialized per-user history."
+    )
+    feedback_excerpt_chars: int = Field(
+        default=500, gt=0, description="Characters of feedback kept per review in user state."
+    )
+
+    # --- Progress Analytics ---
+    analytics_dir: Optional[str] = Field(
+        default=None, description="Directory for the per-user metric series (unset = in-memory)."
+    )
+    analytics_window: int = Field(
+        default=5, gt=1, description="Reviews covered by moving averages and recurring issues."
+    )
+    analytics_ema_alpha: float = Field(
+        default=0.3, gt=0.0, le=1.0, description="Smoothing factor of the exponential moving averages."
+    )
+    analytics_max_issue_codes: int = Field(
+        default=50, gt=0, description="Issue codes tracked per kind and user."
+    )
+
     # --- Grading Parameters ---
     passing_score_threshold: float = Field(default=0.8, ge=0.0, le=1.0)
     style_weight: float = Field(default=0.3, ge=0.0, le=1.0)
@@ -87,6 +271,16 @@ class AgentConfig(BaseSettings):
 
     # --- Application Limits ---
     max_grading_attempts: int = Field(default=3, gt=0)
+    max_fix_attempts: int = Field(
+        default=3, gt=0, description="Maximum iterations of the fix attempt loop."
+    )
+    fix_convergence_epsilon: float = Field(
+        default=1.0, ge=0.0,
+        description="Minimum gain in test pass rate or style score that counts as progress."
+    )
+    fix_convergence_patience: int = Field(
+        default=1, gt=0, description="Attempts without progress before the fix loop stops."
+    )
 
     # --- Logging & Debugging ---
     log_level: str = Field(default="INFO")
@@ -100,6 +294,22 @@ class AgentConfig(BaseSettings):
             raise ValueError(f"Grading weights must sum to 1.0, but got {total}")
         return self
 
+    @model_validator(mode='after')
+    def validate_analysis_tiers(self):
+        """Ensure the analysis size tiers are in increasing order."""
+        if not self.analysis_inline_max_chars <= self.analysis_pool_max_chars <= self.analysis_max_chars:
+            raise ValueError("Analysis tiers must satisfy analysis_inline_max_chars <= "
+                             "analysis_pool_max_chars <= analysis_max_chars")
+        return self
+
+    @model_validator(mode='after')
+    def validate_lsh_bands(self):
+        """Ensure the MinHash signature splits evenly into LSH bands."""
+        if self.similarity_num_perm % self.similarity_lsh_bands:
+            raise ValueError(f"similarity_num_perm ({self.similarity_num_perm}) must be a multiple "
+                             f"of similarity_lsh_bands ({self.similarity_lsh_bands})")
+        return self
+
     @field_validator('log_level')
     @classmethod
     def validate_log_level(cls, v: str) -> str:
@@ -145,5 +355,9 @@ if config.google_api_key:
 # Log a summary of the most important configuration values on startup.
 logger.info("Code Review Assistant Configuration Loaded:")
 logger.info(f"  - GCP Project: {config.google_cloud_project or 'Not set'}")
-logger.info(f"  - Artifact Bucket: {config.artifact_bucket or 'In-memory (local only)'}")
-logger.info(f"  - Models: worker={config.worker_model}, critic={config.critic_model}")
\ No newline at end of file
+logger.info(f"  - Artifact Storage: {config.artifact_bucket or config.artifact_dir or 'In-memory (local only)'}")
+logger.info(f"  - Memory: {config.memory_db_path or 'In-memory (local only)'}")
+logger.info(f"  - Progress analytics: {config.analytics_dir or 'In-memory (local only)'}")
+logger.info(f"  - Models: worker={config.worker_model}, critic={config.critic_model}")
+logger.info(f"  - Model routing: {'enabled' if config.model_routing_enabled else 'disabled'} "
+            f"(worker up to {config.routing_max_worker_lines} lines)")
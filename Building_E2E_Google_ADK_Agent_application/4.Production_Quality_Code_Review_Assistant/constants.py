@@ -17,6 +17,15 @@ class StateKeys:
 
     # === Test-related keys ===
     TEST_EXECUTION_SUMMARY = "test_execution_summary"  # From test_runner_agent output_key
+    TEST_SUITE_CODE = "test_suite_code"  # Generated tests, without the code under test
+    TEST_SUITE_HASH = "test_suite_hash"
+    TEST_SUITE_ARTIFACT = "test_suite_artifact"
+    TESTED_FUNCTIONS = "tested_functions"  # Functions covered by the persisted suite
+    TEST_IMPACT_MAP = "test_impact_map"  # Test name -> code-under-test symbols it exercises
+
+    # === Project review keys ===
+    PROJECT_REVIEW = "project_review"  # Package aggregates, import cycles and selected modules
+    PROJECT_SOURCE = "project_source"
 
     # === Review pipeline state ===
     FINAL_GRADE = "final_grade"
@@ -37,6 +46,7 @@ class StateKeys:
     FINAL_FIX_REPORT = "final_fix_report"  # From fix_validator_agent output_key
     LAST_FIX_REPORT = "last_fix_report"
     FIX_REQUESTED = "fix_requested"
+    FIX_STOP_REASON = "fix_stop_reason"
 
     # === Agent output keys (for reference) ===
     STRUCTURE_ANALYSIS_SUMMARY = "structure_analysis_summary"  # From code_analyzer_agent
@@ -50,16 +60,35 @@ class StateKeys:
     TEMP_TEST_GENERATION_COMPLETE = "temp:test_generation_complete"
     TEMP_FUNCTIONS_TO_TEST = "temp:functions_to_test"
     TEMP_PROCESSING_TIMESTAMP = "temp:processing_timestamp"
+    TEMP_FIX_TEST_MODULE = "temp:fix_test_module"
+    TEMP_NEW_FUNCTIONS = "temp:new_functions_to_test"
+    TEMP_FIX_FULL_TEST_MODULE = "temp:fix_full_test_module"
+    TEMP_FIX_TEST_SELECTION = "temp:fix_test_selection"
+    TEMP_FIX_FUNCTION_FINGERPRINTS = "temp:fix_function_fingerprints"
+    TEMP_FULL_SUITE_REQUIRED = "temp:full_suite_required"
+    TEMP_AUTOFIXED_CODE = "temp:autofixed_code"
+    TEMP_AUTOFIX_REMAINING_ISSUES = "temp:autofix_remaining_issues"
+    TEMP_AUTOFIX_SUMMARY = "temp:autofix_summary"
+    TEMP_FIX_ATTEMPT_HISTORY = "temp:fix_attempt_history"
+    TEMP_SIMILAR_REVIEW = "temp:similar_review"  # Id, similarity and reuse mode of a matching past review
+    TEMP_REUSED_TEST_SUITE = "temp:reused_test_suite"
+    TEMP_PRIOR_FEEDBACK = "temp:prior_feedback"
+    TEMP_LIFETIME_SUBMISSIONS = "temp:lifetime_submissions"
+    TEMP_PREVIOUS_STYLE_SCORE = "temp:previous_style_score"
+    TEMP_TOKEN_USAGE = "temp:token_usage"  # Per-stage token counts and cost of this invocation
+    TEMP_PROGRESS_TRENDS = "temp:progress_trends"  # Rolling per-user metrics before this review
 
     # === User-scoped keys (persist across sessions for a user) ===
+    # Submission counts and last/best scores live in the atomic counter store when one is available
     USER_ID = "user_id"
     USER_PREFERRED_STYLE = "user:preferred_style"
     USER_TOTAL_SUBMISSIONS = "user:total_submissions"
     USER_LAST_STYLE_SCORE = "user:last_style_score"
     USER_LAST_SUBMISSION_TIME = "user:last_submission_time"
     USER_LAST_TEST_PASS_RATE = "user:last_test_pass_rate"
-    USER_PAST_FEEDBACK_CACHE = "user:past_feedback_cache"
-    USER_LAST_GRADING_REPORT = "user:last_grading_report"
+    USER_BEST_STYLE_SCORE = "user:best_style_score"
+    USER_PAST_FEEDBACK_CACHE = "user:past_feedback_cache"  # Bounded ring buffer plus compacted pattern counters
+    USER_LAST_GRADING_REPORT = "user:last_grading_report"  # Compact summary; full report is an artifact
 
     # === App-scoped keys (shared across all users) ===
     APP_GRADING_VERSION = "app:grading_version"
@@ -0,0 +1,208 @@
+"""
+Atomic user- and app-scoped counters for the Code Review Assistant.
+
+Updating user:* keys through session state is a read-modify-write of the
+whole user state, so concurrent reviews by the same user lose increments.
+Counters here are updated with single statements instead: an upsert with
+ON CONFLICT DO UPDATE in the session database (SQLite or PostgreSQL), or a
+locked dictionary when sessions are kept in memory.
+
+Supported operations are increment (of one counter, or of several in one
+transaction), max (keep the largest value), last-write (overwrite with any
+JSON value) and insert-if-absent (seed a counter that does not exist yet).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, create_engine, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Scope id used for app-wide counters
+APP_SCOPE = ''
+
+_metadata = MetaData()
+
+counters_table = Table(
+    'review_counters', _metadata,
+    Column('app_name', String(128), primary_key=True),
+    Column('scope_id', String(128), primary_key=True),
+    Column('key', String(128), primary_key=True),
+    Column('num_value', Float, nullable=True),
+    Column('json_value', Text, nullable=True),
+    Column('update_time', Float, nullable=False),
+)
+
+
+class InMemoryCounterStore:
+    """Counter store for in-memory sessions; a lock makes each operation atomic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, str, str], Any] = {}
+
+    async def increment(self, app_name: str, user_id: Optional[str], key: str, delta: float = 1) -> float:
+        with self._lock:
+            scoped = (app_name, user_id or APP_SCOPE, key)
+            self._values[scoped] = (self._values.get(scoped) or 0) + delta
+            return self._values[scoped]
+
+    async def increment_many(self, app_name: str, user_id: Optional[str], deltas: Dict[str, float]) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                scoped = (app_name, user_id or APP_SCOPE, key)
+                self._values[scoped] = (self._values.get(scoped) or 0) + delta
+
+    async def maximum(self, app_name: str, user_id: Optional[str], key: str, value: float) -> float:
+        with self._lock:
+            scoped = (app_name, user_id or APP_SCOPE, key)
+            current = self._values.get(scoped)
+            self._values[scoped] = value if current is None else max(current, value)
+            return self._values[scoped]
+
+    async def set(self, app_name: str, user_id: Optional[str], key: str, value: Any) -> None:
+        with self._lock:
+            self._values[(app_name, user_id or APP_SCOPE, key)] = value
+
+    async def insert_if_absent(self, app_name: str, user_id: Optional[str], key: str, value: float) -> None:
+        with self._lock:
+            self._values.setdefault((app_name, user_id or APP_SCOPE, key), value)
+
+    async def get(self, app_name: str, user_id: Optional[str], key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._values.get((app_name, user_id or APP_SCOPE, key), default)
+
+    async def get_all(self, app_name: str, user_id: Optional[str]) -> Dict[str, Any]:
+        scope = user_id or APP_SCOPE
+        with self._lock:
+            return {key: value for (app, scope_id, key), value in self._values.items()
+                    if app == app_name and scope_id == scope}
+
+
+class DatabaseCounterStore:
+    """
+    Counter store in the session database, one row per counter.
+
+    Every operation is a single INSERT ... ON CONFLICT statement, so
+    concurrent updates from any number of sessions or processes never race.
+    """
+
+    def __init__(self, db_url: str):
+        self._engine = create_engine(db_url)
+        dialect = self._engine.dialect.name
+        if dialect == 'sqlite':
+            self._insert = sqlite.insert
+            self._greatest = func.max
+        elif dialect == 'postgresql':
+            self._insert = postgresql.insert
+            self._greatest = func.greatest
+        else:
+            raise ValueError(f"Atomic counters are not supported for the {dialect} dialect")
+        _metadata.create_all(self._engine, tables=[counters_table])
+
+    def _upsert_statement(self, app_name: str, user_id: Optional[str], key: str,
+                          insert_values: Dict[str, Any], update_values):
+        statement = self._insert(counters_table).values(
+            app_name=app_name, scope_id=user_id or APP_SCOPE, key=key,
+            update_time=time.time(), **insert_values
+        )
+        update_values = update_values(statement.excluded)
+        update_values['update_time'] = statement.excluded.update_time
+        return statement.on_conflict_do_update(
+            index_elements=['app_name', 'scope_id', 'key'], set_=update_values
+        )
+
+    def _upsert(self, app_name: str, user_id: Optional[str], key: str, insert_values: Dict[str, Any],
+                update_values, returning: bool):
+        statement = self._upsert_statement(app_name, user_id, key, insert_values, update_values)
+        if returning:
+            statement = statement.returning(counters_table.c.num_value)
+
+        with self._engine.begin() as connection:
+            result = connection.execute(statement)
+            return result.scalar_one() if returning else None
+
+    @staticmethod
+    def _add_delta(excluded) -> Dict[str, Any]:
+        return {'num_value': func.coalesce(counters_table.c.num_value, 0) + excluded.num_value,
+                'json_value': None}
+
+    def _increment_many(self, app_name: str, user_id: Optional[str], deltas: Dict[str, float]) -> None:
+        with self._engine.begin() as connection:
+            for key, delta in deltas.items():
+                connection.execute(self._upsert_statement(
+                    app_name, user_id, key, {'num_value': delta}, self._add_delta
+                ))
+
+    async def increment(self, app_name: str, user_id: Optional[str], key: str, delta: float = 1) -> float:
+        return await asyncio.to_thread(
+            self._upsert, app_name, user_id, key, {'num_value': delta}, self._add_delta, True
+        )
+
+    async def increment_many(self, app_name: str, user_id: Optional[str], deltas: Dict[str, float]) -> None:
+        """Increment several counters in a single transaction."""
+        await asyncio.to_thread(self._increment_many, app_name, user_id, deltas)
+
+    async def maximum(self, app_name: str, user_id: Optional[str], key: str, value: float) -> float:
+        return await asyncio.to_thread(
+            self._upsert, app_name, user_id, key, {'num_value': value},
+            lambda excluded: {'num_value': self._greatest(
+                func.coalesce(counters_table.c.num_value, excluded.num_value), excluded.num_value),
+                'json_value': None},
+            True
+        )
+
+    async def set(self, app_name: str, user_id: Optional[str], key: str, value: Any) -> None:
+        await asyncio.to_thread(
+            self._upsert, app_name, user_id, key, {'num_value': None, 'json_value': json.dumps(value)},
+            lambda excluded: {'num_value': excluded.num_value, 'json_value': excluded.json_value},
+            False
+        )
+
+    def _insert_if_absent(self, app_name: str, user_id: Optional[str], key: str, value: float) -> None:
+        statement = self._insert(counters_table).values(
+            app_name=app_name, scope_id=user_id or APP_SCOPE, key=key,
+            num_value=value, update_time=time.time()
+        ).on_conflict_do_nothing(index_elements=['app_name', 'scope_id', 'key'])
+        with self._engine.begin() as connection:
+            connection.execute(statement)
+
+    async def insert_if_absent(self, app_name: str, user_id: Optional[str], key: str, value: float) -> None:
+        """Create a counter with value unless it already exists, in one statement."""
+        await asyncio.to_thread(self._insert_if_absent, app_name, user_id, key, value)
+
+    @staticmethod
+    def _row_value(row) -> Any:
+        return json.loads(row.json_value) if row.json_value is not None else row.num_value
+
+    def _select(self, app_name: str, user_id: Optional[str], key: Optional[str]):
+        query = select(counters_table.c.key, counters_table.c.num_value, counters_table.c.json_value).where(
+            counters_table.c.app_name == app_name,
+            counters_table.c.scope_id == (user_id or APP_SCOPE)
+        )
+        if key is not None:
+            query = query.where(counters_table.c.key == key)
+        with self._engine.connect() as connection:
+            return {row.key: self._row_value(row) for row in connection.execute(query)}
+
+    async def get(self, app_name: str, user_id: Optional[str], key: str, default: Any = None) -> Any:
+        values = await asyncio.to_thread(self._select, app_name, user_id, key)
+        return values.get(key, default)
+
+    async def get_all(self, app_name: str, user_id: Optional[str]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._select, app_name, user_id, None)
+
+
+# Module exports
+__all__ = [
+    'APP_SCOPE',
+    'InMemoryCounterStore',
+    'DatabaseCounterStore',
+]
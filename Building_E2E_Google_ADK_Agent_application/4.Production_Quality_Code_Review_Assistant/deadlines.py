@@ -0,0 +1,134 @@
+"""
+Per-stage deadlines for the Code Review Assistant pipelines.
+
+A hung stage, typically a code execution turn of a test runner, must not
+hold a review for minutes. DeadlineAgent runs one stage under a wall-clock
+deadline; when it passes, the stage is cancelled (aborting its in-flight
+model call, including server-side code execution, and its tools) and a
+stage-specific fallback writes degraded results to state so the rest of
+the pipeline can still report partial results.
+
+Cancellation from the runner, such as a client disconnecting from a
+streaming request, closes the wrapper and propagates to the stage as usual.
+"""
+
+import asyncio
+import logging
+from contextlib import aclosing, suppress
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from .routing import routing_metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Writes degraded results to state and returns the text shown for the stage
+Fallback = Callable[[ToolContext, float], str]
+
+_STAGE_DONE = object()
+
+
+async def _run_stage(stage: BaseAgent, ctx: InvocationContext,
+                     outbox: asyncio.Queue, resume: asyncio.Queue) -> None:
+    """Runs a stage, waiting after each event until the consumer has handled it."""
+    async with aclosing(stage.run_async(ctx)) as events:
+        async for event in events:
+            outbox.put_nowait(event)
+            await resume.get()
+
+
+class DeadlineAgent(BaseAgent):
+    """
+    Runs a single stage (its only sub-agent) under a wall-clock deadline.
+
+    If the stage already wrote its output_key before the deadline passed, its
+    result is kept and the fallback is not called.
+    """
+
+    timeout_seconds: float
+    fallback: Optional[Fallback] = None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        stage = self.sub_agents[0]
+        output_key = getattr(stage, 'output_key', None)
+        output_written = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+
+        # The stage runs in one task, handing over one event at a time, so its
+        # tracing context stays intact while each wait is bounded by the deadline
+        outbox: asyncio.Queue = asyncio.Queue()
+        resume: asyncio.Queue = asyncio.Queue()
+        runner = asyncio.create_task(_run_stage(stage, ctx, outbox, resume))
+        runner.add_done_callback(lambda _: outbox.put_nowait(_STAGE_DONE))
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(outbox.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if event is _STAGE_DONE:
+                    # Re-raises errors of the stage, including its own timeouts
+                    runner.result()
+                    return
+                if output_key and output_key in event.actions.state_delta:
+                    output_written = True
+                yield event
+                resume.put_nowait(None)
+        finally:
+            if not runner.done():
+                runner.cancel()
+                with suppress(asyncio.CancelledError):
+                    await runner
+
+        routing_metrics.discard(ctx.invocation_id, stage.name)
+        logger.warning(f"{stage.name} exceeded its {self.timeout_seconds:.0f}s deadline and was cancelled")
+        if output_written or self.fallback is None:
+            return
+
+        tool_context = ToolContext(ctx)
+        text = self.fallback(tool_context, self.timeout_seconds)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=tool_context.actions
+        )
+
+
+def with_deadline(stage: BaseAgent, timeout_seconds: float,
+                  fallback: Optional[Fallback] = None) -> BaseAgent:
+    """
+    Wraps a pipeline stage in a DeadlineAgent.
+
+    Args:
+        stage: Agent to run under the deadline
+        timeout_seconds: Deadline in seconds; 0 returns the stage unwrapped
+        fallback: Called after a timeout to write degraded results to state
+
+    Returns:
+        The wrapping DeadlineAgent, or the stage itself when there is no deadline
+    """
+    if not timeout_seconds:
+        return stage
+    return DeadlineAgent(
+        name=f"{stage.name}Deadline",
+        description=stage.description,
+        sub_agents=[stage],
+        timeout_seconds=timeout_seconds,
+        fallback=fallback
+    )
+
+
+# Module exports
+__all__ = [
+    'DeadlineAgent',
+    'with_deadline',
+]
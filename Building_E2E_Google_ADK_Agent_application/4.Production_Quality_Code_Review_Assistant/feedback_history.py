@@ -0,0 +1,216 @@
+"""
+Bounded per-user feedback history for the Code Review Assistant.
+
+User-scoped state is loaded into every session for that user, so the feedback
+history kept there must not grow with the number of reviews. The history is a
+ring buffer of compact review entries; entries that fall out of the buffer are
+compacted into aggregated pattern counters, and the serialized history is
+held under a hard byte cap.
+"""
+
+import json
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from .config import config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HISTORY_VERSION = 1
+
+# Counters kept per pattern category after trimming for the byte cap
+MIN_PATTERN_KEYS = 5
+
+
+def empty_history() -> Dict[str, Any]:
+    """Return a history with no reviews."""
+    return {
+        'version': HISTORY_VERSION,
+        'recent': [],
+        'patterns': {
+            'reviews': 0,
+            'style_score_total': 0,
+            'pass_rate_total': 0.0,
+            'pass_rate_reviews': 0,
+            'style_codes': {},
+            'critical_issue_types': {},
+            'verdicts': {}
+        }
+    }
+
+
+def _section(feedback_text: str, heading: str) -> str:
+    """Return the text of a markdown section whose heading contains the given word."""
+    lines = feedback_text.splitlines()
+    for index, line in enumerate(lines):
+        if line.startswith('#') and heading.lower() in line.lower():
+            body = []
+            for following in lines[index + 1:]:
+                if following.startswith('#'):
+                    break
+                body.append(following)
+            return "\n".join(body).strip()
+    return ''
+
+
+def summarize_review(report: Dict[str, Any], excerpt_chars: int) -> Dict[str, Any]:
+    """
+    Reduces a grading report to the compact entry kept in user state.
+
+    Code, analysis and the full feedback stay in the report artifact; the entry
+    keeps scores, issue codes and a short excerpt of the feedback summary.
+    """
+    tests = report.get('tests') if isinstance(report.get('tests'), dict) else {}
+    summary = tests.get('test_summary') or {}
+    total = summary.get('total_tests_run', 0) or 0
+    code = report.get('code') or {}
+    style = report.get('style') or {}
+    feedback_text = report.get('feedback') or ''
+    excerpt = _section(feedback_text, 'Summary') or feedback_text
+
+    return {
+        'timestamp': report.get('timestamp'),
+        'code_hash': code.get('hash'),
+        'line_count': code.get('line_count', 0),
+        'style_score': style.get('score', 0),
+        'style_codes': sorted({issue['code'] for issue in style.get('issues', []) if issue.get('code')}),
+        'pass_rate': round(summary.get('tests_passed', 0) / total * 100, 1) if total else None,
+        'critical_issue_types': sorted({issue.get('type', 'unknown') for issue in tests.get('critical_issues') or []
+                                        if isinstance(issue, dict)}),
+        'verdict': (tests.get('verdict') or {}).get('status'),
+        'feedback_excerpt': excerpt[:excerpt_chars]
+    }
+
+
+def load_history(value: Any) -> Dict[str, Any]:
+    """Return a history dict from stored user state, migrating the old plain-list cache."""
+    if isinstance(value, dict) and value.get('version') == HISTORY_VERSION:
+        return value
+
+    history = empty_history()
+    if isinstance(value, list):
+        history['recent'] = [{'feedback_excerpt': str(item)[:config.feedback_excerpt_chars]}
+                             for item in value]
+    return history
+
+
+def _fold(patterns: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Add one entry to the aggregated pattern counters."""
+    patterns['reviews'] += 1
+    patterns['style_score_total'] += entry.get('style_score') or 0
+    if entry.get('pass_rate') is not None:
+        patterns['pass_rate_total'] += entry['pass_rate']
+        patterns['pass_rate_reviews'] += 1
+    for key in ('style_codes', 'critical_issue_types'):
+        counts = patterns[key]
+        for item in entry.get(key) or []:
+            counts[item] = counts.get(item, 0) + 1
+    if entry.get('verdict'):
+        patterns['verdicts'][entry['verdict']] = patterns['verdicts'].get(entry['verdict'], 0) + 1
+
+
+def _trim_counters(patterns: Dict[str, Any], keep: int) -> None:
+    for key in ('style_codes', 'critical_issue_types', 'verdicts'):
+        patterns[key] = dict(Counter(patterns[key]).most_common(keep))
+
+
+def _size(history: Dict[str, Any]) -> int:
+    return len(json.dumps(history, separators=(',', ':')))
+
+
+def append_review(history: Dict[str, Any], entry: Dict[str, Any], depth: int,
+                  compaction_batch: int, max_bytes: int) -> Dict[str, Any]:
+    """
+    Adds a review entry to the history, compacting and trimming as needed.
+
+    Once the buffer holds depth + compaction_batch entries, the oldest ones are
+    folded into the pattern counters until depth remain. If the serialized
+    history still exceeds max_bytes, more of the oldest entries are folded and
+    finally the counters are trimmed to their most frequent keys.
+
+    Returns:
+        The updated history (a new dict; the input is not modified)
+    """
+    history = json.loads(json.dumps(history))
+    recent: List[Dict[str, Any]] = history['recent']
+    patterns = history['patterns']
+    recent.append(entry)
+
+    if len(recent) >= depth + compaction_batch:
+        for old in recent[:len(recent) - depth]:
+            _fold(patterns, old)
+        del recent[:len(recent) - depth]
+
+    while _size(history) > max_bytes and len(recent) > 1:
+        _fold(patterns, recent.pop(0))
+
+    keep = max(max(len(patterns[key]) for key in ('style_codes', 'critical_issue_types', 'verdicts')), 1)
+    while _size(history) > max_bytes and keep > MIN_PATTERN_KEYS:
+        keep //= 2
+        _trim_counters(patterns, max(keep, MIN_PATTERN_KEYS))
+
+    if _size(history) > max_bytes:
+        # Last resort: the newest entry alone is too large
+        recent[-1]['feedback_excerpt'] = ''
+        logger.warning(f"Feedback history exceeds {max_bytes} bytes even after compaction")
+
+    return history
+
+
+def history_feedback(history: Dict[str, Any]) -> List[str]:
+    """Return the feedback excerpts of the recent reviews, newest first."""
+    return [entry['feedback_excerpt'] for entry in reversed(history['recent'])
+            if entry.get('feedback_excerpt')]
+
+
+def history_patterns(history: Dict[str, Any], top: int = 3) -> Dict[str, Any]:
+    """
+    Summarizes recurring issues over all reviews in the history.
+
+    Returns:
+        Dictionary in the shape of the memory-derived patterns (common_issues,
+        improvements, strengths) plus review count and averages
+    """
+    totals = json.loads(json.dumps(history['patterns']))
+    for entry in history['recent']:
+        _fold(totals, entry)
+
+    reviews = totals['reviews']
+    common = [code for code, _ in Counter(totals['style_codes']).most_common(top)]
+    common += [kind for kind, _ in Counter(totals['critical_issue_types']).most_common(top)]
+
+    scores = [entry.get('style_score') for entry in history['recent'] if entry.get('style_score') is not None]
+    improvements = ['showing improvement'] if len(scores) >= 2 and scores[-1] > scores[0] else []
+    strengths = ['consistent quality'] if totals['verdicts'].get('WORKING', 0) * 2 > reviews > 0 else []
+
+    return {
+        'common_issues': common,
+        'improvements': improvements,
+        'strengths': strengths,
+        'reviews': reviews,
+        'average_style_score': round(totals['style_score_total'] / reviews, 1) if reviews else None,
+        'average_pass_rate': (round(totals['pass_rate_total'] / totals['pass_rate_reviews'], 1)
+                              if totals['pass_rate_reviews'] else None)
+    }
+
+
+def compact_report(report: Dict[str, Any], artifact: Optional[str], excerpt_chars: int) -> Dict[str, Any]:
+    """Return the bounded form of the last grading report kept in user state."""
+    compact = summarize_review(report, excerpt_chars)
+    compact['grading_attempt'] = report.get('grading_attempt')
+    compact['artifact'] = artifact
+    return compact
+
+
+# Module exports
+__all__ = [
+    'empty_history',
+    'summarize_review',
+    'load_history',
+    'append_review',
+    'history_feedback',
+    'history_patterns',
+    'compact_report',
+]
@@ -0,0 +1,249 @@
+"""
+Local filesystem artifact service for the Code Review Assistant.
+
+For on-prem deployments without GCS. Artifact contents are stored once per
+unique SHA-256 under blobs/, and every saved version is a small metadata file
+pointing at its blob, so re-saving identical reports (such as
+latest_grading_report.json) costs no extra disk. Writes go through temporary
+files and atomic renames, and large blobs are read through mmap.
+
+Layout under the root directory:
+    blobs/<sha[:2]>/<sha>
+    index/<app>/<user>/s-<session>/<filename>/<version>.json
+    index/<app>/<user>/user/<filename>/<version>.json   ("user:" artifacts)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote, unquote
+
+from google.adk.artifacts import BaseArtifactService
+from google.genai import types
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+USER_SCOPE = "user"
+
+
+def _component(value: str) -> str:
+    """Encode a path component so names like '../x' or 'a/b' stay inside their directory."""
+    encoded = quote(value, safe='')
+    if encoded in ('.', '..'):
+        return encoded.replace('.', '%2E')
+    return encoded or '%00'
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path through a temporary file and rename."""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class LocalArtifactService(BaseArtifactService):
+    """
+    Versioned, content-deduplicated artifact storage on the local filesystem.
+
+    Filenames starting with "user:" are shared across a user's sessions, as in
+    the ADK in-memory and GCS services. Version numbers start at 0.
+    """
+
+    def __init__(self, root_dir: str, mmap_threshold: int = 1_000_000):
+        self.root = Path(root_dir).resolve()
+        self.mmap_threshold = mmap_threshold
+        (self.root / 'blobs').mkdir(parents=True, exist_ok=True)
+        (self.root / 'index').mkdir(parents=True, exist_ok=True)
+
+    # --- Paths ---
+
+    def _scope_dir(self, app_name: str, user_id: str, scope: Optional[str]) -> Path:
+        """Index directory for a session, or for the user namespace when scope is None."""
+        # Session directories are prefixed so a session named "user" cannot collide with it
+        scope_component = USER_SCOPE if scope is None else f"s-{_component(scope)}"
+        return self.root / 'index' / _component(app_name) / _component(user_id) / scope_component
+
+    def _artifact_dir(self, app_name: str, user_id: str, session_id: str, filename: str) -> Path:
+        scope = None if filename.startswith('user:') else session_id
+        return self._scope_dir(app_name, user_id, scope) / _component(filename)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / 'blobs' / digest[:2] / digest
+
+    # --- Blocking implementations (run in a worker thread) ---
+
+    @staticmethod
+    def _versions(artifact_dir: Path) -> List[int]:
+        if not artifact_dir.is_dir():
+            return []
+        versions = []
+        for entry in artifact_dir.iterdir():
+            if entry.suffix == '.json' and entry.stem.isdigit():
+                versions.append(int(entry.stem))
+        return sorted(versions)
+
+    def _store_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(blob_path, data)
+        return digest
+
+    def _save(self, artifact_dir: Path, artifact: types.Part) -> int:
+        if artifact.inline_data is not None:
+            data = artifact.inline_data.data or b''
+            metadata = {'kind': 'inline', 'mime_type': artifact.inline_data.mime_type}
+        elif artifact.text is not None:
+            data = artifact.text.encode('utf-8')
+            metadata = {'kind': 'text', 'mime_type': 'text/plain'}
+        else:
+            raise ValueError("Only text and inline data artifacts are supported")
+
+        metadata['sha256'] = self._store_blob(data)
+        metadata['size'] = len(data)
+        payload = json.dumps(metadata).encode()
+
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+        versions = self._versions(artifact_dir)
+        version = versions[-1] + 1 if versions else 0
+
+        # Publish the version with a hard link, which fails if a concurrent save took the number
+        fd, temp_path = tempfile.mkstemp(dir=artifact_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            while True:
+                try:
+                    os.link(temp_path, artifact_dir / f"{version}.json")
+                    return version
+                except FileExistsError:
+                    version += 1
+        finally:
+            os.unlink(temp_path)
+
+    def _read_blob(self, digest: str, size: int, as_text: bool):
+        blob_path = self._blob_path(digest)
+        with open(blob_path, 'rb') as f:
+            if size < self.mmap_threshold or size == 0:
+                data = f.read()
+                return data.decode('utf-8') if as_text else data
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Decoding straight from the mapping avoids an intermediate bytes copy
+                return str(mapped, 'utf-8') if as_text else mapped[:]
+
+    def _load(self, artifact_dir: Path, version: Optional[int]) -> Optional[types.Part]:
+        if version is None:
+            versions = self._versions(artifact_dir)
+            if not versions:
+                return None
+            version = versions[-1]
+
+        try:
+            metadata = json.loads((artifact_dir / f"{version}.json").read_text())
+        except FileNotFoundError:
+            return None
+
+        try:
+            if metadata['kind'] == 'text':
+                return types.Part(text=self._read_blob(metadata['sha256'], metadata['size'], True))
+            data = self._read_blob(metadata['sha256'], metadata['size'], False)
+        except FileNotFoundError:
+            logger.error(f"Blob {metadata['sha256']} missing for {artifact_dir} version {version}")
+            return None
+        return types.Part.from_bytes(data=data, mime_type=metadata['mime_type'])
+
+    def _list_keys(self, app_name: str, user_id: str, session_id: str) -> List[str]:
+        filenames = []
+        for scope_dir in (self._scope_dir(app_name, user_id, session_id),
+                          self._scope_dir(app_name, user_id, None)):
+            if scope_dir.is_dir():
+                filenames.extend(unquote(entry.name) for entry in scope_dir.iterdir()
+                                 if entry.is_dir() and self._versions(entry))
+        return sorted(filenames)
+
+    def _delete(self, artifact_dir: Path) -> None:
+        if not artifact_dir.is_dir():
+            return
+        for entry in artifact_dir.iterdir():
+            entry.unlink()
+        artifact_dir.rmdir()
+
+    def _referenced_blobs(self) -> set:
+        referenced = set()
+        for metadata_path in (self.root / 'index').rglob('*.json'):
+            try:
+                referenced.add(json.loads(metadata_path.read_text())['sha256'])
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Unreadable artifact metadata {metadata_path}")
+        return referenced
+
+    def collect_garbage(self) -> Dict[str, Any]:
+        """
+        Removes blobs no longer referenced by any artifact version.
+
+        Deleting an artifact only drops its version records, since the blob may
+        be shared; run this periodically (it is not safe to run concurrently
+        with saves from other processes).
+
+        Returns:
+            Number of blobs and bytes removed
+        """
+        referenced = self._referenced_blobs()
+        removed, freed = 0, 0
+        for blob_path in (self.root / 'blobs').glob('*/*'):
+            if blob_path.name.startswith('.tmp-') or blob_path.name in referenced:
+                continue
+            freed += blob_path.stat().st_size
+            blob_path.unlink()
+            removed += 1
+        logger.info(f"Artifact GC removed {removed} blobs ({freed} bytes)")
+        return {'removed': removed, 'bytes': freed}
+
+    # --- BaseArtifactService ---
+
+    async def save_artifact(self, *, app_name: str, user_id: str, session_id: str,
+                            filename: str, artifact: types.Part) -> int:
+        artifact_dir = self._artifact_dir(app_name, user_id, session_id, filename)
+        return await asyncio.to_thread(self._save, artifact_dir, artifact)
+
+    async def load_artifact(self, *, app_name: str, user_id: str, session_id: str,
+                            filename: str, version: Optional[int] = None) -> Optional[types.Part]:
+        artifact_dir = self._artifact_dir(app_name, user_id, session_id, filename)
+        return await asyncio.to_thread(self._load, artifact_dir, version)
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: str) -> List[str]:
+        return await asyncio.to_thread(self._list_keys, app_name, user_id, session_id)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, session_id: str,
+                              filename: str) -> None:
+        artifact_dir = self._artifact_dir(app_name, user_id, session_id, filename)
+        await asyncio.to_thread(self._delete, artifact_dir)
+
+    async def list_versions(self, *, app_name: str, user_id: str, session_id: str,
+                            filename: str) -> List[int]:
+        artifact_dir = self._artifact_dir(app_name, user_id, session_id, filename)
+        return await asyncio.to_thread(self._versions, artifact_dir)
+
+
+# Module exports
+__all__ = [
+    'LocalArtifactService',
+]
@@ -0,0 +1,235 @@
+"""
+Local indexed memory service for the Code Review Assistant.
+
+Self-hosted deployments without a Vertex AI memory bank get real history
+search from a SQLite database: session events and saved grading reports are
+indexed with FTS5 and ranked with BM25, always filtered to a single developer
+through an owner token in the full-text index. When an embedding function is
+configured, the best BM25 candidates are re-ranked by cosine similarity.
+"""
+
+import array
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from google.adk.memory import BaseMemoryService
+from google.adk.memory.base_memory_service import SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions import Session
+from google.genai import types
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], List[float]]
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]{2,}")
+
+# Query words that only describe the search itself
+_QUERY_STOPWORDS = {'developer', 'and', 'or', 'not', 'near', 'the'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT,
+    source TEXT NOT NULL,
+    author TEXT,
+    timestamp TEXT,
+    text TEXT NOT NULL,
+    embedding BLOB,
+    dedup_key TEXT UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    text, owner, content='memories', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, text, owner) VALUES (new.id, new.text, new.owner);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, text, owner) VALUES ('delete', old.id, old.text, old.owner);
+END;
+"""
+
+
+def _owner_token(app_name: str, user_id: str) -> str:
+    """Single FTS token identifying a developer, so filtering happens inside the index."""
+    return 'o' + hashlib.sha256(f"{app_name}/{user_id}".encode()).hexdigest()[:24]
+
+
+def _match_expression(owner: str, query: str) -> Optional[str]:
+    words = {word.lower() for word in _WORD_RE.findall(query)} - _QUERY_STOPWORDS
+    if not words:
+        return None
+    terms = " OR ".join(f'"{word}"' for word in sorted(words))
+    return f'owner:{owner} AND text:({terms})'
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array.array('f', vector).tobytes()
+
+
+def _cosine(first: array.array, second: array.array) -> float:
+    dot = sum(a * b for a, b in zip(first, second))
+    norm = math.sqrt(sum(a * a for a in first)) * math.sqrt(sum(b * b for b in second))
+    return dot / norm if norm else 0.0
+
+
+def create_genai_embedder(model: str) -> Embedder:
+    """Return an embedding function backed by the Gemini embedding API."""
+    from google import genai
+
+    client = genai.Client()
+
+    def embed(text: str) -> List[float]:
+        response = client.models.embed_content(model=model, contents=text)
+        return list(response.embeddings[0].values)
+
+    return embed
+
+
+class LocalMemoryService(BaseMemoryService):
+    """
+    SQLite FTS5 memory service with optional embedding re-ranking.
+
+    Args:
+        db_path: SQLite database file
+        embedder: Optional function returning an embedding vector for a text
+        search_limit: Maximum memories returned per search
+        rerank_candidates: BM25 candidates re-ranked by embedding similarity
+    """
+
+    def __init__(self, db_path: str, embedder: Optional[Embedder] = None,
+                 search_limit: int = 10, rerank_candidates: int = 50):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.embedder = embedder
+        self.search_limit = search_limit
+        self.rerank_candidates = rerank_candidates
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def _embed(self, text: str) -> Optional[bytes]:
+        if not self.embedder:
+            return None
+        try:
+            return _pack(self.embedder(text))
+        except Exception as e:
+            logger.warning(f"Embedding failed, storing memory without a vector: {e}")
+            return None
+
+    def _insert(self, rows: List[tuple]) -> int:
+        with self._lock, self._connection:
+            cursor = self._connection.executemany(
+                "INSERT OR IGNORE INTO memories (owner, app_name, user_id, session_id, source, author, "
+                "timestamp, text, embedding, dedup_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return cursor.rowcount
+
+    def _session_rows(self, session: Session) -> List[tuple]:
+        owner = _owner_token(session.app_name, session.user_id)
+        with self._lock:
+            known = {row['dedup_key'] for row in self._connection.execute(
+                "SELECT dedup_key FROM memories WHERE owner = ? AND session_id = ?", (owner, session.id)
+            )}
+
+        rows = []
+        for event in session.events:
+            if not event.content or not event.content.parts:
+                continue
+            text = "\n".join(part.text for part in event.content.parts if part.text).strip()
+            dedup_key = f"event:{session.id}:{event.id}"
+            if not text or dedup_key in known:
+                continue
+            timestamp = datetime.fromtimestamp(event.timestamp, tz=timezone.utc).isoformat()
+            rows.append((owner, session.app_name, session.user_id, session.id, 'session',
+                         event.author, timestamp, text, self._embed(text), dedup_key))
+        return rows
+
+    async def add_session_to_memory(self, session: Session):
+        rows = await asyncio.to_thread(self._session_rows, session)
+        if rows:
+            added = await asyncio.to_thread(self._insert, rows)
+            logger.info(f"Memory: indexed {added} events from session {session.id}")
+
+    async def add_report(self, *, app_name: str, user_id: str, session_id: str,
+                         text: str, timestamp: str) -> None:
+        """Index a grading report; saving the same report twice is a no-op."""
+        dedup_key = "report:" + hashlib.sha256(f"{session_id}:{timestamp}:{text}".encode()).hexdigest()
+        owner = _owner_token(app_name, user_id)
+
+        def insert():
+            return self._insert([(owner, app_name, user_id, session_id, 'report', 'FeedbackSynthesizer',
+                                  timestamp, text, self._embed(text), dedup_key)])
+
+        await asyncio.to_thread(insert)
+
+    def _search(self, app_name: str, user_id: str, query: str) -> List[sqlite3.Row]:
+        expression = _match_expression(_owner_token(app_name, user_id), query)
+        if expression is None:
+            return []
+
+        limit = self.rerank_candidates if self.embedder else self.search_limit
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT m.text, m.author, m.timestamp, m.embedding, bm25(memories_fts) AS score "
+                "FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid "
+                "WHERE memories_fts MATCH ? ORDER BY score LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+
+        if not self.embedder or len(rows) <= 1:
+            return rows[:self.search_limit]
+
+        query_vector = self._embed(query)
+        if query_vector is None:
+            return rows[:self.search_limit]
+        query_array = array.array('f', query_vector)
+
+        # bm25() is lower-is-better; combine normalized ranks with cosine similarity
+        best, worst = rows[0]['score'], rows[-1]['score']
+        span = (worst - best) or 1.0
+
+        def combined(row):
+            lexical = 1.0 - (row['score'] - best) / span
+            if row['embedding'] is None:
+                return lexical / 2
+            return (lexical + _cosine(query_array, array.array('f', row['embedding']))) / 2
+
+        return sorted(rows, key=combined, reverse=True)[:self.search_limit]
+
+    async def search_memory(self, *, app_name: str, user_id: str, query: str) -> SearchMemoryResponse:
+        rows = await asyncio.to_thread(self._search, app_name, user_id, query)
+        return SearchMemoryResponse(memories=[
+            MemoryEntry(
+                content=types.Content(role='model', parts=[types.Part(text=row['text'])]),
+                author=row['author'],
+                timestamp=row['timestamp']
+            )
+            for row in rows
+        ])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+# Module exports
+__all__ = [
+    'LocalMemoryService',
+    'create_genai_embedder',
+]
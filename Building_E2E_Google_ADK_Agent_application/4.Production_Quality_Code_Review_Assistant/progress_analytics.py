@@ -0,0 +1,380 @@
+"""
+Incremental per-user progress analytics for the Code Review Assistant.
+
+Each saved grading report appends its key metrics to a compact per-user time
+series with one append-only binary column per metric, and updates rolling
+aggregates in constant time per submission: the latest, best and worst
+values, exponential and windowed moving averages, and per issue code
+frequencies. Trend queries read the aggregates and the last few points of
+the series, never the historical reports.
+
+With analytics_dir set, each user's series is a directory of column files
+plus aggregates.json, shared by all server processes on the host. Without
+it, series are kept in memory and trimmed to the most recent points.
+"""
+
+import array
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks on Windows; appends are only serialized within the process
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+AGGREGATES_VERSION = 1
+
+# Column name -> array typecode; NaN marks a missing value
+SERIES_COLUMNS = {
+    'timestamp': 'd',
+    'style_score': 'd',
+    'pass_rate': 'd',
+    'critical_issues': 'f',
+    'line_count': 'f',
+    'verdict': 'b',
+}
+
+# Metrics with rolling aggregates, and the slope per review below which they count as steady
+TREND_METRICS = {'style_score': 1.0, 'pass_rate': 2.0, 'critical_issues': 0.2}
+
+VERDICT_CODES = {'WORKING': 1, 'BUGGY': 2, 'BROKEN': 3, 'NOT_RUN': 4}
+
+ISSUE_KINDS = ('style_codes', 'critical_issue_types')
+
+
+def _user_token(app_name: str, user_id: str) -> str:
+    return hashlib.sha256(f"{app_name}/{user_id}".encode()).hexdigest()[:32]
+
+
+def review_point(report: Dict[str, Any], style_issues: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Extracts the series values and issue codes of a grading report.
+
+    Args:
+        report: Grading report as built by save_grading_report
+        style_issues: Style issues to count; defaults to those in the report
+
+    Returns:
+        Dictionary with 'values' (one per series column) and the issue codes found
+    """
+    tests = report.get('tests') if isinstance(report.get('tests'), dict) else {}
+    summary = tests.get('test_summary') or {}
+    total = summary.get('total_tests_run', 0) or 0
+    critical = [issue for issue in tests.get('critical_issues') or [] if isinstance(issue, dict)]
+    style = report.get('style') or {}
+    if style_issues is None:
+        style_issues = style.get('issues') or []
+
+    return {
+        'values': {
+            'timestamp': datetime.fromisoformat(report['timestamp']).timestamp(),
+            'style_score': style.get('score', 0),
+            'pass_rate': summary.get('tests_passed', 0) / total * 100 if total else math.nan,
+            'critical_issues': len(critical),
+            'line_count': (report.get('code') or {}).get('line_count', 0),
+            'verdict': VERDICT_CODES.get((tests.get('verdict') or {}).get('status'), 0),
+        },
+        'style_codes': sorted({issue['code'] for issue in style_issues if issue.get('code')}),
+        'critical_issue_types': sorted({issue.get('type', 'unknown') for issue in critical}),
+    }
+
+
+def empty_aggregates() -> Dict[str, Any]:
+    """Return the aggregates of a user without reviews."""
+    return {
+        'version': AGGREGATES_VERSION,
+        'count': 0,
+        'first_timestamp': None,
+        'last_timestamp': None,
+        'metrics': {name: {'samples': 0, 'last': None, 'min': None, 'max': None, 'ema': None,
+                           'window_sum': 0.0, 'window_count': 0}
+                    for name in TREND_METRICS},
+        # Issue code -> [reviews containing it, index of the last such review]
+        'style_codes': {},
+        'critical_issue_types': {},
+    }
+
+
+def _update_metric(stats: Dict[str, Any], value: float, leaving: Optional[float], alpha: float) -> None:
+    if leaving is not None and not math.isnan(leaving):
+        stats['window_sum'] -= leaving
+        stats['window_count'] -= 1
+    if math.isnan(value):
+        return
+
+    stats['samples'] += 1
+    stats['last'] = value
+    stats['min'] = value if stats['min'] is None else min(stats['min'], value)
+    stats['max'] = value if stats['max'] is None else max(stats['max'], value)
+    stats['ema'] = value if stats['ema'] is None else alpha * value + (1 - alpha) * stats['ema']
+    stats['window_sum'] += value
+    stats['window_count'] += 1
+
+
+def update_aggregates(aggregates: Dict[str, Any], point: Dict[str, Any], leaving: Dict[str, float],
+                      alpha: float, max_issue_codes: int) -> Dict[str, Any]:
+    """
+    Folds one review into the rolling aggregates in place.
+
+    Args:
+        aggregates: Aggregates of the earlier reviews
+        point: Review from review_point
+        leaving: Values of the review that drops out of the moving-average window
+        alpha: Smoothing factor of the exponential moving averages
+        max_issue_codes: Issue codes kept per kind; the least frequent are dropped
+
+    Returns:
+        The updated aggregates
+    """
+    index = aggregates['count']
+    values = point['values']
+    aggregates['count'] = index + 1
+    aggregates['first_timestamp'] = aggregates['first_timestamp'] or values['timestamp']
+    aggregates['last_timestamp'] = values['timestamp']
+
+    for name in TREND_METRICS:
+        _update_metric(aggregates['metrics'][name], float(values[name]), leaving.get(name), alpha)
+
+    for kind in ISSUE_KINDS:
+        counts = aggregates[kind]
+        for code in point[kind]:
+            entry = counts.setdefault(code, [0, index])
+            entry[0] += 1
+            entry[1] = index
+        if len(counts) > max_issue_codes:
+            kept = sorted(counts.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+            aggregates[kind] = dict(kept[:max_issue_codes])
+    return aggregates
+
+
+def _direction(values: List[float], steady_slope: float) -> Optional[str]:
+    """Least-squares direction of the recent values: 'rising', 'falling' or 'steady'."""
+    points = [(x, y) for x, y in enumerate(values) if not math.isnan(y)]
+    if len(points) < 3:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    if abs(slope) < steady_slope:
+        return 'steady'
+    return 'rising' if slope > 0 else 'falling'
+
+
+def summarize_trends(aggregates: Dict[str, Any], recent: Dict[str, List[float]], window: int) -> Dict[str, Any]:
+    """
+    Compact trend summary for the feedback prompt.
+
+    Args:
+        aggregates: Rolling aggregates of the user
+        recent: Last values of each trend metric, oldest first
+        window: Reviews covered by the moving averages and recurring issues
+
+    Returns:
+        Review count, per-metric statistics and direction, and recurring and
+        no longer seen issue codes
+    """
+    count = aggregates['count']
+    if not count:
+        return {'reviews': 0}
+
+    trends: Dict[str, Any] = {
+        'reviews': count,
+        'since': datetime.fromtimestamp(aggregates['first_timestamp']).date().isoformat(),
+    }
+    for name, steady_slope in TREND_METRICS.items():
+        stats = aggregates['metrics'][name]
+        if not stats['samples']:
+            continue
+        trends[name] = {
+            'last': round(stats['last'], 1),
+            'moving_average': (round(stats['window_sum'] / stats['window_count'], 1)
+                               if stats['window_count'] else None),
+            'ema': round(stats['ema'], 1),
+            'min': round(stats['min'], 1),
+            'max': round(stats['max'], 1),
+            'direction': _direction(recent.get(name, []), steady_slope),
+        }
+
+    recent_start = count - window
+    for kind in ISSUE_KINDS:
+        ranked = sorted(aggregates[kind].items(), key=lambda item: item[1][0], reverse=True)
+        trends[f'recurring_{kind}'] = [code for code, (seen, last) in ranked
+                                       if seen >= 2 and last >= recent_start][:5]
+        trends[f'resolved_{kind}'] = [code for code, (seen, last) in ranked
+                                      if seen >= 2 and last < recent_start][:5]
+    return trends
+
+
+class ProgressAnalyticsStore:
+    """
+    Append-only per-user metric series with rolling aggregates.
+
+    Args:
+        root_dir: Directory for the column files; None keeps series in memory
+        window: Reviews covered by the moving averages
+        ema_alpha: Smoothing factor of the exponential moving averages
+        max_issue_codes: Issue codes tracked per kind and user
+        memory_max_points: Points kept per user by the in-memory store
+    """
+
+    def __init__(self, root_dir: Optional[str] = None, window: int = 5, ema_alpha: float = 0.3,
+                 max_issue_codes: int = 50, memory_max_points: int = 1000):
+        self.root_dir = root_dir
+        self.window = window
+        self.ema_alpha = ema_alpha
+        self.max_issue_codes = max_issue_codes
+        self.memory_max_points = max(memory_max_points, window + 1)
+        self._lock = threading.Lock()
+        # In-memory series: user token -> {'offset', 'columns', 'aggregates'}
+        self._users: Dict[str, Dict[str, Any]] = {}
+        if root_dir:
+            os.makedirs(root_dir, exist_ok=True)
+
+    # --- Storage: column files or in-memory arrays ---
+
+    def _dir(self, token: str) -> str:
+        return os.path.join(self.root_dir, token)
+
+    @contextmanager
+    def _locked(self, token: str):
+        with self._lock:
+            if not self.root_dir or fcntl is None:
+                yield
+                return
+            os.makedirs(self._dir(token), exist_ok=True)
+            with open(os.path.join(self._dir(token), '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _memory_user(self, token: str) -> Dict[str, Any]:
+        return self._users.setdefault(token, {
+            'offset': 0,
+            'columns': {name: array.array(typecode) for name, typecode in SERIES_COLUMNS.items()},
+            'aggregates': empty_aggregates(),
+        })
+
+    def _load_aggregates(self, token: str) -> Dict[str, Any]:
+        if not self.root_dir:
+            return self._memory_user(token)['aggregates']
+        try:
+            with open(os.path.join(self._dir(token), 'aggregates.json'), encoding='utf-8') as file:
+                aggregates = json.load(file)
+        except FileNotFoundError:
+            return empty_aggregates()
+        return aggregates if aggregates.get('version') == AGGREGATES_VERSION else empty_aggregates()
+
+    def _save_aggregates(self, token: str, aggregates: Dict[str, Any]) -> None:
+        if not self.root_dir:
+            return
+        descriptor, temp_path = tempfile.mkstemp(dir=self._dir(token), suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(aggregates, file, separators=(',', ':'))
+        os.replace(temp_path, os.path.join(self._dir(token), 'aggregates.json'))
+
+    def _read(self, token: str, column: str, start: int, stop: int) -> List[float]:
+        """Values of points [start, stop) of a column; points no longer kept are left out."""
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        if not self.root_dir:
+            user = self._memory_user(token)
+            offset = user['offset']
+            return list(user['columns'][column][max(start - offset, 0):max(stop - offset, 0)])
+
+        values = array.array(SERIES_COLUMNS[column])
+        try:
+            with open(os.path.join(self._dir(token), f"{column}.bin"), 'rb') as file:
+                file.seek(start * values.itemsize)
+                data = file.read((stop - start) * values.itemsize)
+        except FileNotFoundError:
+            return []
+        values.frombytes(data[:len(data) - len(data) % values.itemsize])
+        return list(values)
+
+    def _append(self, token: str, index: int, values: Dict[str, float]) -> None:
+        if not self.root_dir:
+            user = self._memory_user(token)
+            for name, column in user['columns'].items():
+                column.append(values[name])
+                if len(column) > self.memory_max_points:
+                    del column[0]
+            user['offset'] = index + 1 - len(user['columns']['timestamp'])
+            return
+
+        for name, typecode in SERIES_COLUMNS.items():
+            path = os.path.join(self._dir(token), f"{name}.bin")
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as file:
+                # Position by index, so a column left behind by an interrupted append realigns
+                file.seek(index * array.array(typecode).itemsize)
+                file.write(array.array(typecode, [values[name]]).tobytes())
+                file.truncate()
+
+    # --- Operations ---
+
+    def _append_point(self, app_name: str, user_id: str, point: Dict[str, Any]) -> Dict[str, Any]:
+        token = _user_token(app_name, user_id)
+        with self._locked(token):
+            aggregates = self._load_aggregates(token)
+            index = aggregates['count']
+            leaving = {name: values[0] for name in TREND_METRICS
+                       if (values := self._read(token, name, index - self.window, index - self.window + 1))}
+            self._append(token, index, point['values'])
+            update_aggregates(aggregates, point, leaving, self.ema_alpha, self.max_issue_codes)
+            self._save_aggregates(token, aggregates)
+            return aggregates
+
+    def _trends(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        token = _user_token(app_name, user_id)
+        with self._locked(token):
+            aggregates = self._load_aggregates(token)
+            count = aggregates['count']
+            recent = {name: self._read(token, name, count - self.window, count) for name in TREND_METRICS}
+            return summarize_trends(aggregates, recent, self.window)
+
+    async def append(self, app_name: str, user_id: str, point: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a review to the user's series and return the updated aggregates."""
+        return await asyncio.to_thread(self._append_point, app_name, user_id, point)
+
+    async def trends(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        """Return the trend summary of the user's reviews."""
+        return await asyncio.to_thread(self._trends, app_name, user_id)
+
+    async def series(self, app_name: str, user_id: str, column: str, last: int) -> List[float]:
+        """Return the last values of one column, oldest first."""
+        token = _user_token(app_name, user_id)
+
+        def read():
+            with self._locked(token):
+                count = self._load_aggregates(token)['count']
+                return self._read(token, column, count - last, count)
+
+        return await asyncio.to_thread(read)
+
+
+# Module exports
+__all__ = [
+    'SERIES_COLUMNS',
+    'TREND_METRICS',
+    'review_point',
+    'empty_aggregates',
+    'update_aggregates',
+    'summarize_trends',
+    'ProgressAnalyticsStore',
+]
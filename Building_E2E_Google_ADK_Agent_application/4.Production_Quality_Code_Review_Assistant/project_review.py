@@ -0,0 +1,433 @@
+"""
+Multi-file project review for the Code Review Assistant.
+
+Loads a project from a zip archive or a directory, builds the intra-project
+import graph, analyzes and style-checks every module in parallel worker
+processes, aggregates metrics per package, and selects the modules with
+issues that are worth sending to the LLM stages.
+"""
+
+import ast
+import io
+import logging
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, List, Optional, Set
+
+from .analysis_tiers import worker_mp_context
+from .config import config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directories that never contain reviewable project code
+SKIPPED_DIRECTORIES = {'__pycache__', '.git', '.hg', '.svn', '.tox', '.nox', '.venv',
+                       'venv', 'env', 'node_modules', 'build', 'dist', '.eggs'}
+
+
+# How often the worker-pool wait checks for cancellation
+CANCEL_POLL_SECONDS = 0.2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class ProjectLoadError(ValueError):
+    """Raised when a project submission cannot be loaded within the configured limits."""
+
+
+class ProjectReviewCancelled(Exception):
+    """Raised when a project review is cancelled before all modules are analyzed."""
+
+
+def _check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise ProjectReviewCancelled("Project review cancelled")
+
+
+def _is_reviewable(relative_path: str) -> bool:
+    parts = PurePosixPath(relative_path).parts
+    return (relative_path.endswith('.py')
+            and not any(part in SKIPPED_DIRECTORIES or part.endswith('.egg-info') for part in parts))
+
+
+def _decode_source(data: bytes, relative_path: str) -> str:
+    if len(data) > config.project_max_file_bytes:
+        raise ProjectLoadError(f"{relative_path} exceeds {config.project_max_file_bytes} bytes")
+    return data.decode('utf-8', errors='replace')
+
+
+def load_project_from_zip(data: bytes) -> Dict[str, str]:
+    """
+    Loads the Python modules of a zipped project.
+
+    Args:
+        data: Zip archive bytes
+
+    Returns:
+        {relative posix path: source}
+
+    Raises:
+        ProjectLoadError: If the archive is invalid or exceeds the configured limits
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        raise ProjectLoadError(f"Invalid zip archive: {e}") from e
+
+    modules = {}
+    total_bytes = 0
+    with archive:
+        for info in archive.infolist():
+            path = PurePosixPath(info.filename)
+            if info.is_dir() or path.is_absolute() or '..' in path.parts:
+                continue
+            if not _is_reviewable(str(path)):
+                continue
+            if len(modules) >= config.project_max_files:
+                raise ProjectLoadError(f"Project has more than {config.project_max_files} Python files")
+
+            # Check declared sizes before decompressing to guard against zip bombs
+            total_bytes += info.file_size
+            if total_bytes > config.project_max_total_bytes:
+                raise ProjectLoadError(f"Project exceeds {config.project_max_total_bytes} bytes")
+            if info.file_size > config.project_max_file_bytes:
+                raise ProjectLoadError(f"{path} exceeds {config.project_max_file_bytes} bytes")
+
+            modules[str(path)] = _decode_source(archive.read(info), str(path))
+
+    return modules
+
+
+def load_project_from_directory(directory: str) -> Dict[str, str]:
+    """
+    Loads the Python modules below a directory inside the allowed project root.
+
+    Raises:
+        ProjectLoadError: If directory reviews are disabled, the path escapes the
+            allowed root, or the project exceeds the configured limits
+    """
+    if not config.project_review_root:
+        raise ProjectLoadError("Directory reviews are disabled (PROJECT_REVIEW_ROOT is not set)")
+
+    root = Path(config.project_review_root).resolve()
+    target = (root / directory).resolve()
+    if target != root and root not in target.parents:
+        raise ProjectLoadError(f"{directory} is outside the allowed project root")
+    if not target.is_dir():
+        raise ProjectLoadError(f"{directory} is not a directory")
+
+    modules = {}
+    total_bytes = 0
+    for current, dirnames, filenames in os.walk(target):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in SKIPPED_DIRECTORIES and not d.endswith('.egg-info'))
+        for filename in sorted(filenames):
+            file_path = Path(current) / filename
+            relative_path = file_path.relative_to(target).as_posix()
+            if not _is_reviewable(relative_path) or file_path.is_symlink():
+                continue
+            if len(modules) >= config.project_max_files:
+                raise ProjectLoadError(f"Project has more than {config.project_max_files} Python files")
+
+            data = file_path.read_bytes()
+            total_bytes += len(data)
+            if total_bytes > config.project_max_total_bytes:
+                raise ProjectLoadError(f"Project exceeds {config.project_max_total_bytes} bytes")
+            modules[relative_path] = _decode_source(data, relative_path)
+
+    return modules
+
+
+def module_name(relative_path: str) -> str:
+    """Convert a relative file path to a dotted module name (packages map to their __init__)."""
+    parts = list(PurePosixPath(relative_path).with_suffix('').parts)
+    if parts and parts[-1] == '__init__':
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+
+def _resolve_import(importer: str, is_package: bool, node: ast.AST, known: Set[str]) -> Set[str]:
+    """Resolve one import statement to the project modules it refers to."""
+    targets = set()
+
+    def longest_known(name: str) -> Optional[str]:
+        parts = name.split('.')
+        for end in range(len(parts), 0, -1):
+            candidate = '.'.join(parts[:end])
+            if candidate in known:
+                return candidate
+        return None
+
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            match = longest_known(alias.name)
+            if match:
+                targets.add(match)
+        return targets
+
+    # ast.ImportFrom
+    if node.level:
+        package_parts = importer.split('.') if is_package else importer.split('.')[:-1]
+        if node.level - 1 > len(package_parts):
+            return targets
+        base_parts = package_parts[:len(package_parts) - (node.level - 1)]
+        base = '.'.join(base_parts + ([node.module] if node.module else []))
+    else:
+        base = node.module or ''
+
+    for alias in node.names:
+        submodule = f"{base}.{alias.name}" if base else alias.name
+        match = submodule if submodule in known else longest_known(base) if base else None
+        if match:
+            targets.add(match)
+    return targets
+
+
+def build_import_graph(modules: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Builds the intra-project import graph.
+
+    Args:
+        modules: {relative path: source}
+
+    Returns:
+        {module name: sorted project modules it imports}; external imports are ignored
+    """
+    names = {path: module_name(path) for path in modules}
+    known = set(names.values())
+    graph = {}
+
+    for path, source in modules.items():
+        importer = names[path]
+        edges = set()
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            graph[importer] = []
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                edges |= _resolve_import(importer, path.endswith('__init__.py'), node, known)
+        edges.discard(importer)
+        graph[importer] = sorted(edges)
+
+    return graph
+
+
+def find_import_cycles(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Return import cycles (strongly connected components with more than one module)."""
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+
+    # Iterative Tarjan so large projects do not hit the recursion limit
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph.get(root, [])))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(graph.get(neighbor, []))))
+                    advanced = True
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    cycles.append(sorted(component))
+
+    return cycles
+
+
+def analyze_module(relative_path: str, source: str) -> Dict[str, Any]:
+    """
+    Analyzes and style-checks one module. Runs in a worker process.
+
+    Returns:
+        Dictionary with the module's path, structure metrics and style results
+    """
+    # Imported here so worker processes only pay for what they use
+    from .code_structure import extract_code_structure
+    from .tools import _perform_style_check
+
+    result = {'path': relative_path, 'module': module_name(relative_path),
+              'line_count': len(source.splitlines())}
+    try:
+        tree = ast.parse(source)
+        result['analysis'] = extract_code_structure(tree, source)
+        result['syntax_error'] = None
+    except SyntaxError as e:
+        result['analysis'] = None
+        result['syntax_error'] = f"Syntax error at line {e.lineno}: {e.msg}"
+
+    style = _perform_style_check(source)
+    result['style_score'] = style['score']
+    result['style_issue_count'] = style['issue_count']
+    result['style_issues'] = style['issues']
+    return result
+
+
+def _analyze_module_chunk(items) -> List[Dict[str, Any]]:
+    return [analyze_module(path, source) for path, source in items]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the shared worker pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=config.project_review_workers or None,
+                                        mp_context=worker_mp_context())
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def analyze_modules(modules: Dict[str, str],
+                    cancel_event: Optional[threading.Event] = None) -> List[Dict[str, Any]]:
+    """
+    Analyze all modules across the shared worker processes, preserving path order.
+
+    Setting cancel_event drops the chunks that have not started yet and raises
+    ProjectReviewCancelled without waiting for the running ones.
+    """
+    items = sorted(modules.items())
+    if len(items) < config.project_parallel_min_files:
+        results = []
+        for path, source in items:
+            _check_cancelled(cancel_event)
+            results.append(analyze_module(path, source))
+        return results
+
+    pool = _get_pool()
+    workers = config.project_review_workers or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (workers * 4))
+    futures = []
+    try:
+        futures = [pool.submit(_analyze_module_chunk, items[start:start + chunksize])
+                   for start in range(0, len(items), chunksize)]
+        pending = set(futures)
+        while pending:
+            _check_cancelled(cancel_event)
+            _, pending = wait(pending, timeout=CANCEL_POLL_SECONDS)
+        return [result for future in futures for result in future.result()]
+    except BrokenProcessPool:
+        # A worker died, e.g. killed by the OOM killer; start a fresh pool next time
+        _reset_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def aggregate_by_package(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate module metrics per package (the module's parent directory)."""
+    packages = {}
+    for result in results:
+        package = str(PurePosixPath(result['path']).parent).replace('/', '.')
+        package = '' if package == '.' else package
+        stats = packages.setdefault(package or '<root>', {
+            'modules': 0, 'lines': 0, 'functions': 0, 'classes': 0,
+            'style_issues': 0, 'syntax_errors': 0, '_weighted_score': 0
+        })
+        metrics = (result['analysis'] or {}).get('metrics', {})
+        stats['modules'] += 1
+        stats['lines'] += result['line_count']
+        stats['functions'] += metrics.get('function_count', 0)
+        stats['classes'] += metrics.get('class_count', 0)
+        stats['style_issues'] += result['style_issue_count']
+        stats['syntax_errors'] += 1 if result['syntax_error'] else 0
+        stats['_weighted_score'] += result['style_score'] * max(result['line_count'], 1)
+
+    for stats in packages.values():
+        weighted = stats.pop('_weighted_score')
+        stats['style_score'] = round(weighted / max(stats['lines'], stats['modules']), 1)
+    return packages
+
+
+def select_modules_with_issues(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Picks the modules worth sending to the LLM stages, worst first.
+
+    Modules with syntax errors come first, then modules by ascending style score.
+    Clean modules are never selected; the selection is capped by module count
+    and total lines from config.
+    """
+    candidates = [r for r in results if r['syntax_error'] or r['style_issue_count'] > 0]
+    candidates.sort(key=lambda r: (r['syntax_error'] is None, r['style_score'], -r['line_count']))
+
+    selected = []
+    total_lines = 0
+    for result in candidates:
+        if len(selected) >= config.project_max_llm_modules:
+            break
+        if selected and total_lines + result['line_count'] > config.project_max_llm_lines:
+            continue
+        selected.append(result)
+        total_lines += result['line_count']
+    return selected
+
+
+def review_project(modules: Dict[str, str], cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Runs the deterministic part of a project review.
+
+    Args:
+        modules: {relative path: source}
+        cancel_event: Optional event that cancels the module analysis when set
+
+    Returns:
+        Dictionary with per-module results, package aggregates, the import graph,
+        import cycles, and the modules selected for LLM review
+    """
+    graph = build_import_graph(modules)
+    results = analyze_modules(modules, cancel_event=cancel_event)
+    selected = select_modules_with_issues(results)
+
+    logger.info(f"Project review: {len(results)} modules, {len(selected)} selected for LLM review")
+
+    return {
+        'modules': results,
+        'packages': aggregate_by_package(results),
+        'import_graph': graph,
+        'import_cycles': find_import_cycles(graph),
+        'selected': selected
+    }
@@ -0,0 +1,183 @@
+"""
+Size-aware model routing for the Code Review Assistant.
+
+Sub-agents are declared with a default model, but small submissions do not
+need the slower critic model. The callbacks in this module pick the model
+per invocation from the code size, complexity metrics and issue counts
+already stored in state, and record per-route latency so the thresholds
+in AgentConfig can be tuned.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from .config import config
+from .constants import StateKeys
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ROUTE_WORKER = "worker"
+ROUTE_CRITIC = "critic"
+ROUTE_DEFAULT = "default"  # Keep the agent's configured model
+
+
+class RoutingMetrics:
+    """Thread-safe per-route, per-agent latency counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[tuple, tuple] = {}
+
+    def start(self, invocation_id: str, agent_name: str, route: str) -> None:
+        """Mark the start of a model call for the given agent."""
+        with self._lock:
+            self._pending[(invocation_id, agent_name)] = (route, time.perf_counter())
+
+    def finish(self, invocation_id: str, agent_name: str) -> Optional[float]:
+        """Record the latency of a model call started with start()."""
+        with self._lock:
+            pending = self._pending.pop((invocation_id, agent_name), None)
+            if pending is None:
+                return None
+
+            route, started = pending
+            latency = time.perf_counter() - started
+            stats = self._stats.setdefault(f"{agent_name}:{route}", {
+                'agent': agent_name,
+                'route': route,
+                'calls': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0
+            })
+            stats['calls'] += 1
+            stats['total_seconds'] += latency
+            stats['max_seconds'] = max(stats['max_seconds'], latency)
+            return latency
+
+    def discard(self, invocation_id: str, agent_name: str) -> None:
+        """Forget a model call that was cancelled before it finished."""
+        with self._lock:
+            self._pending.pop((invocation_id, agent_name), None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the collected metrics with average latency."""
+        with self._lock:
+            result = {}
+            for key, stats in self._stats.items():
+                entry = dict(stats)
+                entry['avg_seconds'] = stats['total_seconds'] / stats['calls']
+                result[key] = entry
+            return result
+
+    def reset(self) -> None:
+        """Clear all collected metrics."""
+        with self._lock:
+            self._stats.clear()
+            self._pending.clear()
+
+
+# Process-wide metrics instance
+routing_metrics = RoutingMetrics()
+
+
+def _count_critical_issues(state) -> int:
+    """Count critical issues reported by the test runner, if any."""
+    test_results = state.get(StateKeys.TEST_EXECUTION_SUMMARY, {})
+
+    # Parse if it's a string
+    if isinstance(test_results, str):
+        try:
+            test_results = json.loads(test_results)
+        except (ValueError, TypeError):
+            return 0
+
+    if not isinstance(test_results, dict):
+        return 0
+
+    summary = test_results.get('test_summary', {})
+    if 'critical_issues_found' in summary:
+        try:
+            return int(summary['critical_issues_found'])
+        except (ValueError, TypeError):
+            pass
+    return len(test_results.get('critical_issues', []))
+
+
+def select_route(state) -> str:
+    """
+    Chooses the model route for the current submission.
+
+    Args:
+        state: Session state (or any mapping with a get method)
+
+    Returns:
+        ROUTE_WORKER when the submission is small and simple, ROUTE_DEFAULT when
+        nothing has been measured yet, otherwise ROUTE_CRITIC
+    """
+    line_count = state.get(StateKeys.CODE_LINE_COUNT, 0)
+    if not line_count:
+        # Nothing measured yet - stay on the configured model
+        return ROUTE_DEFAULT
+
+    metrics = state.get(StateKeys.CODE_ANALYSIS, {}).get('metrics', {})
+    symbol_count = metrics.get('function_count', 0) + metrics.get('class_count', 0)
+    avg_function_length = metrics.get('avg_function_length', 0.0)
+    style_issue_count = state.get(StateKeys.STYLE_ISSUE_COUNT, 0)
+    critical_issues = _count_critical_issues(state)
+
+    if (line_count <= config.routing_max_worker_lines
+            and symbol_count <= config.routing_max_worker_symbols
+            and avg_function_length <= config.routing_max_worker_function_length
+            and style_issue_count <= config.routing_max_worker_style_issues
+            and critical_issues <= config.routing_max_worker_critical_issues):
+        return ROUTE_WORKER
+    return ROUTE_CRITIC
+
+
+def route_model(callback_context: CallbackContext,
+                llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    before_model_callback that rewrites the request model based on submission size.
+
+    Returns None so the (possibly re-routed) request proceeds to the model.
+    """
+    if config.model_routing_enabled:
+        route = select_route(callback_context.state)
+        if route != ROUTE_DEFAULT:
+            llm_request.model = config.worker_model if route == ROUTE_WORKER else config.critic_model
+    else:
+        route = ROUTE_WORKER if llm_request.model == config.worker_model else ROUTE_CRITIC
+
+    logger.info(f"Routing: {callback_context.agent_name} -> {route} ({llm_request.model})")
+    routing_metrics.start(callback_context.invocation_id, callback_context.agent_name, route)
+    return None
+
+
+def record_route_latency(callback_context: CallbackContext,
+                         llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback that records the latency of the routed model call."""
+    latency = routing_metrics.finish(callback_context.invocation_id, callback_context.agent_name)
+    if latency is not None:
+        logger.info(f"Routing: {callback_context.agent_name} model call took {latency:.2f}s")
+    return None
+
+
+# Module exports
+__all__ = [
+    'ROUTE_WORKER',
+    'ROUTE_CRITIC',
+    'ROUTE_DEFAULT',
+    'RoutingMetrics',
+    'routing_metrics',
+    'select_route',
+    'route_model',
+    'record_route_latency',
+]
@@ -3,18 +3,43 @@ Service initialization utilities for the Code Review Assistant.
 """
 import os
 from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
-from google.adk.sessions import InMemorySessionService, DatabaseSessionService, VertexAiSessionService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import (
+    BaseSessionService,
+    DatabaseSessionService,
+    InMemorySessionService,
+    VertexAiSessionService
+)
 from .config import config
+from .counters import DatabaseCounterStore, InMemoryCounterStore
+from .local_artifacts import LocalArtifactService
+from .local_memory import LocalMemoryService, create_genai_embedder
+from .progress_analytics import ProgressAnalyticsStore
+from .session_eviction import BoundedInMemorySessionService
 
 
 def get_artifact_service():
     """Initialize artifact service based on environment."""
     if config.artifact_bucket:
         return GcsArtifactService(bucket_name=config.artifact_bucket)
+    elif config.artifact_dir:
+        return LocalArtifactService(root_dir=config.artifact_dir, mmap_threshold=config.artifact_mmap_threshold)
     else:
         return InMemoryArtifactService()
 
 
+def get_memory_service():
+    """Initialize memory service based on environment."""
+    if config.memory_db_path:
+        embedder = create_genai_embedder(config.memory_embedding_model) if config.memory_embedding_model else None
+        return LocalMemoryService(
+            db_path=config.memory_db_path,
+            embedder=embedder,
+            search_limit=config.memory_search_limit
+        )
+    return InMemoryMemoryService()
+
+
 def get_session_service():
     """Initialize session service based on environment."""
     # Check if we have a DATABASE_URL or SESSION_SERVICE_URI
@@ -32,5 +57,58 @@ def get_session_service():
                 agent_engine_id=agent_engine_id
             )
 
-    # Default to in-memory
-    return InMemorySessionService()
+    # Default to in-memory, bounded so long-running servers do not grow forever
+    return BoundedInMemorySessionService(
+        ttl_seconds=config.session_ttl_seconds,
+        max_sessions=config.session_max_count,
+        max_bytes=config.session_memory_budget_bytes
+    )
+
+
+_counter_stores = {}
+
+
+def get_counter_store(session_service: BaseSessionService):
+    """
+    Initialize the atomic counter store next to the session storage.
+
+    The store follows the session service the runner actually uses, so it also
+    works when sessions are configured by `adk web --session_service_uri` or by
+    Agent Engine rather than by SESSION_SERVICE_URI.
+
+    Args:
+        session_service: Session service of the current invocation
+
+    Returns:
+        A database-backed store on the same database for SQL sessions, an in-memory
+        store for in-memory sessions, or None for any other session service (such
+        as Vertex AI sessions), where counters stay in state
+    """
+    if isinstance(session_service, DatabaseSessionService):
+        db_url = session_service.db_engine.url.render_as_string(hide_password=False)
+        if db_url not in _counter_stores:
+            _counter_stores[db_url] = DatabaseCounterStore(db_url=db_url)
+        return _counter_stores[db_url]
+
+    if isinstance(session_service, InMemorySessionService):
+        if 'memory' not in _counter_stores:
+            _counter_stores['memory'] = InMemoryCounterStore()
+        return _counter_stores['memory']
+
+    return None
+
+
+_analytics_store = None
+
+
+def get_analytics_store():
+    """Initialize the per-user progress analytics store, on disk if analytics_dir is set."""
+    global _analytics_store
+    if _analytics_store is None:
+        _analytics_store = ProgressAnalyticsStore(
+            root_dir=config.analytics_dir,
+            window=config.analytics_window,
+            ema_alpha=config.analytics_ema_alpha,
+            max_issue_codes=config.analytics_max_issue_codes
+        )
+    return _analytics_store
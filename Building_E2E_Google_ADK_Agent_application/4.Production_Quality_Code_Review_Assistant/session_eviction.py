@@ -0,0 +1,157 @@
+"""
+Bounded in-memory session service for the Code Review Assistant.
+
+ADK's InMemorySessionService keeps every session and its full event list,
+each holding submitted code and reports, for the lifetime of the process.
+BoundedInMemorySessionService is a drop-in replacement that accounts the
+approximate size of every session and evicts sessions that have been idle
+longer than a TTL, then the least recently used ones, whenever the session
+count or total memory budget is exceeded. User- and app-scoped state is not
+affected by eviction.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str, str]
+
+
+def _state_size(state: Dict[str, Any]) -> int:
+    return len(json.dumps(state, default=str))
+
+
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class BoundedInMemorySessionService(InMemorySessionService):
+    """
+    InMemorySessionService with TTL and LRU eviction under a memory budget.
+
+    Sizes are estimates based on the JSON size of the initial state and of every
+    stored event, which dominate a session's footprint. Limits of 0 disable the
+    corresponding check. Like the base class, it is meant for a single event loop.
+    """
+
+    def __init__(self, ttl_seconds: float = 0, max_sessions: int = 0, max_bytes: int = 0):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # Session key -> estimated size in bytes, ordered from least to most recently used
+        self._lru: "OrderedDict[SessionKey, int]" = OrderedDict()
+        self._last_access: Dict[SessionKey, float] = {}
+        self._total_bytes = 0
+        self._stats = {'evicted_ttl': 0, 'evicted_lru': 0, 'evicted_bytes': 0}
+
+    # --- Accounting ---
+
+    def _touch(self, key: SessionKey) -> None:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self._last_access[key] = time.monotonic()
+
+    def _track(self, key: SessionKey, size: int) -> None:
+        self._total_bytes -= self._lru.pop(key, 0)
+        self._lru[key] = size
+        self._last_access[key] = time.monotonic()
+        self._total_bytes += size
+
+    def _untrack(self, key: SessionKey) -> int:
+        size = self._lru.pop(key, 0)
+        self._last_access.pop(key, None)
+        self._total_bytes -= size
+        return size
+
+    def _remove(self, key: SessionKey) -> int:
+        app_name, user_id, session_id = key
+        user_sessions = self.sessions.get(app_name, {}).get(user_id, {})
+        user_sessions.pop(session_id, None)
+        if not user_sessions:
+            self.sessions.get(app_name, {}).pop(user_id, None)
+        return self._untrack(key)
+
+    def _evict(self, key: SessionKey, reason: str) -> None:
+        app_name, user_id, session_id = key
+        size = self._remove(key)
+        self._stats[f'evicted_{reason}'] += 1
+        self._stats['evicted_bytes'] += size
+        logger.info(f"Evicted session {session_id} of user {user_id} ({reason}, ~{size} bytes)")
+
+    def _enforce_limits(self, keep: Optional[SessionKey] = None) -> None:
+        """Evict expired sessions, then least recently used ones until within limits."""
+        if self.ttl_seconds:
+            cutoff = time.monotonic() - self.ttl_seconds
+            # The LRU order is also access order, so expired sessions are at the front
+            while self._lru:
+                key = next(iter(self._lru))
+                if key == keep or self._last_access[key] >= cutoff:
+                    break
+                self._evict(key, 'ttl')
+
+        while self._lru and ((self.max_sessions and len(self._lru) > self.max_sessions)
+                             or (self.max_bytes and self._total_bytes > self.max_bytes)):
+            key = next(iter(self._lru))
+            if key == keep:
+                # Never evict the session being used, even if it alone exceeds the budget
+                break
+            self._evict(key, 'lru')
+
+    def eviction_stats(self) -> Dict[str, Any]:
+        """Return eviction counters and the current session count and size estimate."""
+        return dict(self._stats, sessions=len(self._lru), total_bytes=self._total_bytes)
+
+    def session_size(self, app_name: str, user_id: str, session_id: str) -> Optional[int]:
+        """Return the estimated size of a stored session in bytes, or None if it is not stored."""
+        return self._lru.get((app_name, user_id, session_id))
+
+    # --- InMemorySessionService overrides ---
+
+    def _create_session_impl(self, *, app_name: str, user_id: str,
+                             state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session = super()._create_session_impl(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._track(key, _state_size(state or {}))
+        self._enforce_limits(keep=key)
+        return session
+
+    def _get_session_impl(self, *, app_name: str, user_id: str, session_id: str,
+                          config=None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._touch(key)
+        self._enforce_limits(keep=key)
+        return super()._get_session_impl(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        # The base implementation looks the session up first, which would run an eviction pass
+        self._remove((app_name, user_id, session_id))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+
+        key = (session.app_name, session.user_id, session.id)
+        if not event.partial and key in self._lru:
+            # Partial events are not stored, so they do not count
+            self._track(key, self._lru[key] + _event_size(event))
+            self._enforce_limits(keep=key)
+        return event
+
+
+# Module exports
+__all__ = [
+    'BoundedInMemorySessionService',
+]
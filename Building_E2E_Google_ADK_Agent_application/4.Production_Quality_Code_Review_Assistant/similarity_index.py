@@ -0,0 +1,324 @@
+"""
+Near-duplicate submission index for the Code Review Assistant.
+
+Submissions are normalized (comments, whitespace, literals and identifier
+names dropped), split into token shingles and summarized with MinHash
+signatures. Locality sensitive hashing over signature bands finds earlier
+reviews of near-duplicate code so their test suite and feedback can be
+reused. Entries hold personalized feedback, so they are scoped to the app
+and user that submitted the code and only match that user's submissions.
+The index is persisted to a local JSON file and evicts the least recently
+used entries once it reaches its size limit.
+"""
+
+import ast
+import builtins
+import hashlib
+import io
+import json
+import keyword
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+
+from .config import config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+
+# Universal hashing modulus (a Mersenne prime) for the MinHash permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_PERMUTATION_SEED = 1
+
+_KEPT_NAMES = set(keyword.kwlist) | set(dir(builtins))
+_SKIPPED_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+_FALLBACK_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def normalize_tokens(code: str) -> List[str]:
+    """
+    Tokenizes code into a form that ignores formatting and naming.
+
+    Comments and blank lines are dropped, identifiers other than keywords and
+    builtins become ID, string literals become STR and number literals NUM,
+    so reformatted code or code with renamed variables or changed constants
+    produces the same token stream.
+    """
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in _SKIPPED_TOKENS:
+                continue
+            if token.type == tokenize.NAME:
+                tokens.append(token.string if token.string in _KEPT_NAMES else 'ID')
+            elif token.type == tokenize.STRING:
+                tokens.append('STR')
+            elif token.type == tokenize.NUMBER:
+                tokens.append('NUM')
+            elif token.type == tokenize.NEWLINE:
+                tokens.append('NEWLINE')
+            elif token.type == tokenize.INDENT:
+                tokens.append('INDENT')
+            elif token.type == tokenize.DEDENT:
+                tokens.append('DEDENT')
+            else:
+                tokens.append(token.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Unbalanced code still gets a rough signature
+        tokens = []
+        for token in _FALLBACK_TOKEN_RE.findall(code):
+            if token[0].isdigit():
+                tokens.append('NUM')
+            elif token[0].isalpha() or token[0] == '_':
+                tokens.append(token if token in _KEPT_NAMES else 'ID')
+            else:
+                tokens.append(token)
+    return tokens
+
+
+def shingles(tokens: List[str], size: int) -> Set[str]:
+    """Return the set of contiguous token windows of the given size."""
+    if not tokens:
+        return set()
+    if len(tokens) <= size:
+        return {' '.join(tokens)}
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def behavior_hash(code: str) -> Optional[str]:
+    """
+    Hash of the code's AST, identical only for code that differs in comments and formatting.
+
+    Returns None for code that does not parse.
+    """
+    try:
+        return hashlib.sha256(ast.dump(ast.parse(code)).encode()).hexdigest()
+    except SyntaxError:
+        return None
+
+
+class MinHasher:
+    """MinHash signatures over string shingles using seeded universal hash permutations."""
+
+    def __init__(self, num_perm: int):
+        rng = random.Random(_PERMUTATION_SEED)
+        self.num_perm = num_perm
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                              for _ in range(num_perm)]
+
+    def signature(self, items: Set[str]) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), 'big')
+                  for item in items]
+        return [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+                for a, b in self._permutations]
+
+
+def estimate_similarity(first: List[int], second: List[int]) -> float:
+    """Estimate the Jaccard similarity of two shingle sets from their signatures."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class SimilarityIndex:
+    """
+    Thread-safe, size-bounded MinHash/LSH index of reviewed submissions.
+
+    Entries are records of a past review (test suite, test results, feedback)
+    keyed by the app and user that submitted the code and its normalized form;
+    lookups only consider entries of the same app and user. The file is loaded
+    lazily on first use and rewritten atomically on every change.
+    """
+
+    def __init__(self, path: str, max_entries: int, num_perm: int, bands: int, shingle_size: int):
+        if bands <= 0 or num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[str]] = {}
+        self._loaded = False
+
+    def _band_keys(self, app_name: str, user_id: str, signature: List[int]) -> List[tuple]:
+        return [(app_name, user_id, band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                for band in range(self.bands)]
+
+    def _signature(self, code: str) -> Optional[List[int]]:
+        items = shingles(normalize_tokens(code), self.shingle_size)
+        return self._hasher.signature(items) if items else None
+
+    def _settings(self) -> Dict[str, int]:
+        return {'version': INDEX_VERSION, 'num_perm': self._hasher.num_perm,
+                'shingle_size': self.shingle_size}
+
+    def _insert(self, entry_id: str, entry: Dict[str, Any]) -> None:
+        self._entries[entry_id] = entry
+        for key in self._band_keys(entry['app_name'], entry['user_id'], entry['signature']):
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry['app_name'], entry['user_id'], entry['signature']):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Similarity index at {self.path} is unreadable, starting empty: {e}")
+            return
+
+        if data.get('settings') != self._settings():
+            # Signatures from different settings are not comparable
+            logger.info("Similarity index settings changed, discarding stored entries")
+            return
+
+        entries = sorted(data.get('entries', []), key=lambda e: e.get('last_used', 0))
+        for entry in entries[-self.max_entries:]:
+            self._insert(entry['id'], entry)
+        logger.info(f"Similarity index loaded with {len(self._entries)} entries")
+
+    def _save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        data = {'settings': self._settings(), 'entries': list(self._entries.values())}
+
+        # Write to a temporary file and rename so readers never see a partial index
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def find(self, app_name: str, user_id: str, code: str, threshold: float) -> Optional[Dict[str, Any]]:
+        """
+        Finds the most similar submission previously reviewed for the same app and user.
+
+        Args:
+            app_name: App the submission belongs to
+            user_id: User who submitted the code
+            code: Submitted code
+            threshold: Minimum estimated similarity (0-1)
+
+        Returns:
+            A copy of the stored record with 'similarity' and 'exact' (same AST) added,
+            or None if no entry reaches the threshold
+        """
+        signature = self._signature(code)
+        if signature is None:
+            return None
+
+        with self._lock:
+            self._load()
+            candidates = set()
+            for key in self._band_keys(app_name, user_id, signature):
+                candidates |= self._buckets.get(key, set())
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = estimate_similarity(signature, self._entries[entry_id]['signature'])
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < threshold:
+                return None
+
+            entry = self._entries[best_id]
+            entry['last_used'] = time.time()
+            self._entries.move_to_end(best_id)
+            match = {key: value for key, value in entry.items() if key != 'signature'}
+
+        match['similarity'] = round(best_similarity, 3)
+        match['exact'] = match.get('behavior_hash') is not None and match['behavior_hash'] == behavior_hash(code)
+        return match
+
+    def add(self, app_name: str, user_id: str, code: str, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Adds or replaces the record for a submission reviewed for an app and user
+        and persists the index.
+
+        Returns:
+            The entry id, or None if the code has no tokens to index
+        """
+        signature = self._signature(code)
+        if signature is None:
+            return None
+
+        normalized = ' '.join(normalize_tokens(code))
+        entry_id = hashlib.sha256(f"{app_name}\0{user_id}\0{normalized}".encode()).hexdigest()[:32]
+        now = time.time()
+        entry = dict(record)
+        entry.update({'id': entry_id, 'app_name': app_name, 'user_id': user_id, 'signature': signature, 'behavior_hash': behavior_hash(code),
+                      'created_at': now, 'last_used': now})
+
+        with self._lock:
+            self._load()
+            self._remove(entry_id)
+            self._insert(entry_id, entry)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Could not persist similarity index to {self.path}: {e}")
+        return entry_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+
+# Process-wide index instance
+similarity_index = SimilarityIndex(
+    path=config.similarity_index_path,
+    max_entries=config.similarity_index_max_entries,
+    num_perm=config.similarity_num_perm,
+    bands=config.similarity_lsh_bands,
+    shingle_size=config.similarity_shingle_size
+)
+
+
+# Module exports
+__all__ = [
+    'normalize_tokens',
+    'shingles',
+    'behavior_hash',
+    'MinHasher',
+    'estimate_similarity',
+    'SimilarityIndex',
+    'similarity_index',
+]
@@ -0,0 +1,8 @@
+"""
+Sub-agents for specialized code review and fixing tasks.
+
+This module exports the individual agent instances that are used
+in the main code review and fix pipelines.
+"""
+
+__all__ = []
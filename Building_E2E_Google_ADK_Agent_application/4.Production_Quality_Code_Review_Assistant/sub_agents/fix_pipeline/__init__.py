@@ -0,0 +1,8 @@
+"""
+Sub-agents for specialized code fix tasks.
+
+This module exports the individual agent instances that are used
+in the main code fix pipeline.
+"""
+
+__all__ = []
@@ -0,0 +1,132 @@
+"""
+Code Fixer Agent - Generates fixes for all identified issues.
+
+This agent takes the analysis results from the review pipeline
+and generates corrected code that addresses all issues. Mechanical
+whitespace and blank line issues are fixed locally before and after the
+model runs, so the model only has to handle bugs, naming and docs.
+"""
+
+import logging
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.code_executors import BuiltInCodeExecutor
+from google.adk.tools import ToolContext
+from google.adk.utils import instructions_utils
+from google.genai import types
+from code_review_assistant.config import config
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.token_usage import record_model_usage
+from code_review_assistant.tools import (
+    autofix_code_style,
+    exit_fix_loop,
+    extract_fixed_code,
+    tool_context_from_callback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def autofix_before_fixer(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: auto-fix mechanical style issues in the original code once per fix run."""
+    if callback_context.state.get(StateKeys.TEMP_AUTOFIXED_CODE):
+        return None
+
+    code = callback_context.state.get(StateKeys.CODE_TO_REVIEW, '')
+    result = await autofix_code_style(code, tool_context_from_callback(callback_context))
+
+    callback_context.state[StateKeys.TEMP_AUTOFIXED_CODE] = result.get('code', code)
+    callback_context.state[StateKeys.TEMP_AUTOFIX_REMAINING_ISSUES] = result.get(
+        'remaining_issues', callback_context.state.get(StateKeys.STYLE_ISSUES, [])
+    )
+    callback_context.state[StateKeys.TEMP_AUTOFIX_SUMMARY] = {
+        'fixed': result.get('fixed', {}),
+        'fixed_count': result.get('fixed_count', 0),
+        'score_after_autofix': result.get('remaining_score')
+    }
+    return None
+
+
+async def autofix_after_fixer(callback_context: CallbackContext) -> Optional[types.Content]:
+    """after_agent_callback: clean up mechanical style issues the model introduced."""
+    code_fixes = extract_fixed_code(callback_context.state.get(StateKeys.CODE_FIXES, ''))
+    if not code_fixes:
+        return None
+
+    result = await autofix_code_style(code_fixes, tool_context_from_callback(callback_context))
+    if result.get('status') == 'success' and result.get('fixed_count'):
+        logger.info(f"Auto-fixed {result['fixed_count']} mechanical issues in the model's fix")
+        callback_context.state[StateKeys.CODE_FIXES] = result['code']
+    return None
+
+
+def fixer_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """Deadline fallback: stop the fix loop and keep the results of earlier attempts."""
+    state = tool_context.state
+    message = f"Fix generation did not finish within {timeout_seconds:.0f}s."
+
+    if not state.get(StateKeys.TEMP_FIX_ATTEMPT_HISTORY):
+        # No attempt completed - only the local mechanical fixes are available
+        state[StateKeys.CODE_FIXES] = state.get(StateKeys.TEMP_AUTOFIXED_CODE) or state.get(StateKeys.CODE_TO_REVIEW, '')
+        state[StateKeys.FIX_STATUS] = 'FAILED'
+        state[StateKeys.FINAL_FIX_REPORT] = (f"## ❌ Fix Status: FAILED\n\n{message} Only mechanical "
+                                             "whitespace and blank line fixes were applied.")
+
+    state[StateKeys.FIX_STOP_REASON] = "timeout"
+    exit_fix_loop(tool_context)
+    return message
+
+
+async def code_fixer_instruction_provider(context: ReadonlyContext) -> str:
+    """Dynamic instruction provider that injects state variables."""
+    template = """You are an expert code fixing specialist.
+
+Original Code (whitespace and blank line issues have already been fixed automatically):
+{temp:autofixed_code}
+
+Analysis Results:
+- Original Style Score: {style_score}/100
+- Remaining Style Issues: {temp:autofix_remaining_issues}
+- Test Results: {test_execution_summary}
+
+Based on the test results, identify and fix ALL issues including:
+- Interface bugs (e.g., if start parameter expects wrong type)
+- Logic errors (e.g., KeyError when accessing graph nodes)
+- Style violations
+- Missing documentation
+
+YOUR TASK:
+Generate the complete fixed Python code that addresses all identified issues.
+
+CRITICAL INSTRUCTIONS:
+- Output ONLY the corrected Python code
+- Do NOT include markdown code blocks (```python)
+- Do NOT include any explanations or commentary
+- The output should be valid, executable Python code and nothing else
+- Keep the existing formatting - do not spend effort on whitespace or blank lines
+
+Common fixes to apply based on test results:
+- If tests show AttributeError with 'pop', fix: stack = [start] instead of stack = start
+- If tests show KeyError accessing graph, fix: use graph.get(current, [])
+- Add docstrings if missing
+- Fix any remaining style violations identified (e.g. naming conventions)
+
+Output the complete fixed code now:"""
+
+    return await instructions_utils.inject_session_state(template, context)
+
+
+code_fixer_agent = Agent(
+    name="CodeFixer",
+    model=config.worker_model,
+    description="Generates comprehensive fixes for all identified code issues",
+    instruction=code_fixer_instruction_provider,
+    code_executor=BuiltInCodeExecutor(),
+    before_agent_callback=autofix_before_fixer,
+    after_agent_callback=autofix_after_fixer,
+    after_model_callback=record_model_usage,
+    output_key="code_fixes"
+)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Fix Test Runner Agent - Validates fixes by running tests on corrected code.
+
+This agent executes the same test suite on the fixed code to verify
+that all issues have been resolved. When the review pipeline persisted
+its generated tests, that exact suite is rerun against the fixed code and
+new tests are only written for functions the suite does not cover.
+Later loop iterations rerun only the tests impacted by changed functions,
+and a full-suite confirmation run precedes any SUCCESSFUL verdict.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.code_executors import BuiltInCodeExecutor
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import ToolContext
+from google.adk.utils import instructions_utils
+from google.genai import types
+from code_review_assistant.config import config
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.routing import route_model, record_route_latency
+from code_review_assistant.token_usage import record_model_usage, track_model_request
+from code_review_assistant.tools import (
+    merge_selective_test_results,
+    parse_json_output,
+    prepare_fix_test_module,
+    tool_context_from_callback,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMAT = """Execute your tests and output ONLY valid JSON with this structure:
+- "passed": number of tests that passed
+- "failed": number of tests that failed  
+- "total": total number of tests
+- "pass_rate": percentage as a number
+- "comparison": object with "original_pass_rate", "new_pass_rate", "improvement"
+- "newly_passing_tests": array of test names that now pass
+- "still_failing_tests": array of test names still failing
+
+Use the test function names from the suite for the test name arrays.
+Do NOT output the test code itself, only the JSON analysis."""
+
+
+async def prepare_persisted_suite(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: assemble the fixed code with the persisted test suite."""
+    result = prepare_fix_test_module(tool_context_from_callback(callback_context))
+    if result.get("status") != "success":
+        logger.info(f"Falling back to test generation: {result.get('message')}")
+    return None
+
+
+async def merge_carried_over_results(callback_context: CallbackContext) -> Optional[types.Content]:
+    """after_agent_callback: add results of tests skipped by impact selection."""
+    result = merge_selective_test_results(tool_context_from_callback(callback_context))
+    if result.get("status") == "error":
+        logger.warning(f"Could not merge carried-over results: {result.get('message')}")
+    return None
+
+
+async def require_full_suite_confirmation(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: only run the full suite when a selective run looks fully successful."""
+    selection = callback_context.state.get(StateKeys.TEMP_FIX_TEST_SELECTION, {})
+    results = parse_json_output(callback_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, {}))
+
+    required = (selection.get('mode') == 'selected' and results.get('total', 0) > 0
+                and results.get('failed', 1) == 0)
+    callback_context.state[StateKeys.TEMP_FULL_SUITE_REQUIRED] = required
+    if required:
+        logger.info("Selective run passed - confirming with the full test suite")
+
+    # Returning content here would end the whole invocation, so skipping happens per model call
+    return None
+
+
+def skip_unneeded_full_suite(callback_context: CallbackContext,
+                             llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: answer with the current results when no confirmation run is needed."""
+    if callback_context.state.get(StateKeys.TEMP_FULL_SUITE_REQUIRED):
+        return None
+
+    # The response goes through output_key, so repeat the existing results unchanged
+    summary = callback_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, '')
+    text = summary if isinstance(summary, str) else json.dumps(summary)
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+async def mark_full_suite_run(callback_context: CallbackContext) -> Optional[types.Content]:
+    """after_agent_callback: record that the latest results come from a full suite run."""
+    if not callback_context.state.get(StateKeys.TEMP_FULL_SUITE_REQUIRED):
+        return None
+    selection = dict(callback_context.state.get(StateKeys.TEMP_FIX_TEST_SELECTION, {}))
+    selection['mode'] = 'full'
+    callback_context.state[StateKeys.TEMP_FIX_TEST_SELECTION] = selection
+    return None
+
+
+def fix_test_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """Deadline fallback: record the fix test run as incomplete so it never counts as passing."""
+    previous = parse_json_output(tool_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, {}))
+    summary = json.dumps({
+        'passed': 0,
+        'total': 0,
+        'pass_rate': 0.0,
+        'timed_out': True,
+        'still_failing_tests': previous.get('still_failing_tests', [])
+    })
+    tool_context.state[StateKeys.FIX_TEST_EXECUTION_SUMMARY] = summary
+    return f"Fix tests did not finish within {timeout_seconds:.0f}s and were skipped.\n{summary}"
+
+
+def full_suite_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """Deadline fallback: keep the selective results; the fix is then not confirmed as successful."""
+    return (f"Full suite confirmation did not finish within {timeout_seconds:.0f}s - "
+            "keeping the selective test results.")
+
+
+async def full_suite_instruction_provider(context: ReadonlyContext) -> str:
+    """Instruction provider for the full-suite confirmation run."""
+    template = """You are confirming that the fixed code passes the COMPLETE test suite.
+
+Execute this module EXACTLY as given with your code executor - do not rewrite,
+reorder or drop any tests, and do not write new tests.
+
+MODULE TO EXECUTE:
+{temp:fix_full_test_module}
+
+ORIGINAL TEST RESULTS: {test_execution_summary}
+
+""" + OUTPUT_FORMAT
+
+    return await instructions_utils.inject_session_state(template, context)
+
+
+async def fix_test_runner_instruction_provider(context: ReadonlyContext) -> str:
+    """Dynamic instruction provider that reuses the persisted suite when available."""
+    if context.state.get(StateKeys.TEMP_FIX_TEST_MODULE):
+        template = """You are responsible for validating the fixed code by running tests.
+
+The test suite generated during the review has been combined with the fixed code
+into the module below. Execute this module EXACTLY as given with your code executor -
+do not rewrite, reorder or drop any tests.
+
+MODULE TO EXECUTE:
+{temp:fix_test_module}
+
+NEW FUNCTIONS NOT COVERED BY THE SUITE: {temp:new_functions_to_test}
+If that list is not empty, write a few additional tests for ONLY those functions
+and execute them after the module. Otherwise do not write any new tests.
+
+ORIGINAL TEST RESULTS: {test_execution_summary}
+
+Compare the results with the original test results.
+
+""" + OUTPUT_FORMAT
+    else:
+        template = """You are responsible for validating the fixed code by running tests.
+
+THE FIXED CODE TO TEST:
+{code_fixes}
+
+ORIGINAL TEST RESULTS: {test_execution_summary}
+
+YOUR TASK:
+1. Understand the fixes that were applied
+2. Generate the same comprehensive tests (15-20 test cases)
+3. Execute the tests on the FIXED code using your code executor
+4. Compare results with original test results
+5. Output a detailed JSON analysis
+
+TESTING METHODOLOGY:
+- Run the same tests that revealed issues in the original code
+- Verify that previously failing tests now pass
+- Ensure no regressions were introduced
+- Document the improvement
+
+""" + OUTPUT_FORMAT
+
+    return await instructions_utils.inject_session_state(template, context)
+
+
+fix_test_runner_agent = Agent(
+    name="FixTestRunner",
+    model=config.critic_model,
+    description="Runs comprehensive tests on fixed code to verify all issues are resolved",
+    instruction=fix_test_runner_instruction_provider,
+    code_executor=BuiltInCodeExecutor(),
+    before_agent_callback=prepare_persisted_suite,
+    after_agent_callback=merge_carried_over_results,
+    before_model_callback=[route_model, track_model_request],
+    after_model_callback=[record_route_latency, record_model_usage],
+    output_key="fix_test_execution_summary"
+)
+
+fix_full_suite_runner_agent = Agent(
+    name="FixFullSuiteRunner",
+    model=config.critic_model,
+    description="Reruns the complete test suite before a fix is declared successful",
+    instruction=full_suite_instruction_provider,
+    code_executor=BuiltInCodeExecutor(),
+    before_agent_callback=require_full_suite_confirmation,
+    after_agent_callback=mark_full_suite_run,
+    before_model_callback=[skip_unneeded_full_suite, route_model, track_model_request],
+    after_model_callback=[record_route_latency, record_model_usage],
+    output_key="fix_test_execution_summary"
+)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Fix Validator Agent - Final validation and report generation.
+
+This agent compiles all results and determines if the fix was successful.
+It runs the validation tools directly in code instead of through a model,
+so each fix loop iteration pays no extra model round trip. The loop also
+stops once test pass rate and style score stop improving.
+"""
+
+import logging
+from typing import AsyncGenerator, Dict, Any, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.tools import ToolContext
+from google.genai import types
+from code_review_assistant.config import config
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.tools import validate_fixed_style, compile_fix_report, exit_fix_loop
+
+logger = logging.getLogger(__name__)
+
+
+def _format_validation_summary(style_result: dict, report_result: dict) -> str:
+    """Render the validation outcome as the markdown summary stored in final_fix_report."""
+    if report_result.get("status") != "success":
+        return (f"❌ Fix Status: FAILED\n"
+                f"Could not compile fix report: {report_result.get('message', 'unknown error')}")
+
+    report = report_result["report"]
+    tests = report["improvements"]["tests"]
+    style = report["improvements"]["style"]
+
+    lines = [
+        f"## {report['status_emoji']} Fix Status: {report['status']}",
+        "",
+        f"- Tests: {tests['original_pass_rate']:.1f}% → {tests['fixed_pass_rate']:.1f}% "
+        f"({'all passing' if tests['all_tests_pass'] else 'failures remain'})",
+        f"- Style: {style['original_score']}/100 → {style['fixed_score']}/100 "
+        f"({style['improvement']:+} points)",
+    ]
+
+    remaining = style_result.get("remaining_issues", []) if style_result.get("status") == "success" else []
+    if remaining:
+        lines.extend(["", "### Remaining style issues"])
+        for issue in remaining:
+            lines.append(f"- Line {issue['line']}: {issue['code']} {issue['message']}")
+    elif style_result.get("status") != "success":
+        lines.extend(["", f"Style validation failed: {style_result.get('message', 'unknown error')}"])
+
+    return "\n".join(lines)
+
+
+def detect_plateau(history: List[Dict[str, Any]], epsilon: float, patience: int) -> bool:
+    """
+    Checks whether the last `patience` attempts failed to improve on earlier ones.
+
+    Args:
+        history: Per-attempt metrics with 'pass_rate' and 'style_score', oldest first
+        epsilon: Minimum gain in either metric that counts as progress
+        patience: Number of recent attempts that must show no progress
+
+    Returns:
+        True if the fix loop has converged and further attempts are unlikely to help
+    """
+    if len(history) <= patience:
+        return False
+
+    earlier, recent = history[:-patience], history[-patience:]
+    best_pass = max(attempt['pass_rate'] for attempt in earlier)
+    best_style = max(attempt['style_score'] for attempt in earlier)
+    pass_gain = max(attempt['pass_rate'] for attempt in recent) - best_pass
+    style_gain = max(attempt['style_score'] for attempt in recent) - best_style
+    return pass_gain < epsilon and style_gain < epsilon
+
+
+class FixValidatorAgent(BaseAgent):
+    """Deterministic agent that validates fixed code and decides whether to exit the fix loop."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        tool_context = ToolContext(ctx)
+
+        # Step 1: Style compliance of the fixed code
+        style_result = await validate_fixed_style(tool_context)
+
+        # Step 2: Compile the report (sets fix_status and fix_report in state)
+        report_result = await compile_fix_report(tool_context)
+
+        # Step 3: Track this attempt's metrics
+        fix_status = report_result.get("fix_status")
+        history = list(tool_context.state.get(StateKeys.TEMP_FIX_ATTEMPT_HISTORY, []))
+        if report_result.get("status") == "success":
+            improvements = report_result["report"]["improvements"]
+            history.append({
+                'attempt': len(history) + 1,
+                'status': fix_status,
+                'pass_rate': improvements['tests']['fixed_pass_rate'],
+                'style_score': improvements['style']['fixed_score']
+            })
+        tool_context.state[StateKeys.TEMP_FIX_ATTEMPT_HISTORY] = history
+
+        # Step 4: Exit the loop on full success (from a full suite run) or when progress stalls
+        selection = tool_context.state.get(StateKeys.TEMP_FIX_TEST_SELECTION, {})
+        if fix_status == "SUCCESSFUL" and selection.get("mode") != "selected":
+            stop_reason = "successful"
+        elif detect_plateau(history, config.fix_convergence_epsilon, config.fix_convergence_patience):
+            stop_reason = "plateau"
+        elif len(history) >= config.max_fix_attempts:
+            stop_reason = "max_attempts"
+        else:
+            stop_reason = None
+
+        if stop_reason:
+            if stop_reason != "max_attempts":
+                exit_fix_loop(tool_context)
+            tool_context.state[StateKeys.FIX_STOP_REASON] = stop_reason
+            fix_report = tool_context.state.get(StateKeys.FIX_REPORT)
+            if fix_report:
+                tool_context.state[StateKeys.FIX_REPORT] = {
+                    **fix_report, 'stop_reason': stop_reason, 'attempts': history
+                }
+
+        summary = _format_validation_summary(style_result, report_result)
+        if stop_reason == "plateau":
+            summary += (f"\n\nStopping after attempt {len(history)}: no improvement of at least "
+                        f"{config.fix_convergence_epsilon} in the last "
+                        f"{config.fix_convergence_patience} attempt(s).")
+        tool_context.state[StateKeys.FINAL_FIX_REPORT] = summary
+
+        logger.info(f"FixValidator: status={fix_status}, stop_reason={stop_reason}, "
+                    f"escalate={bool(tool_context.actions.escalate)}")
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=summary)]),
+            actions=tool_context.actions
+        )
+
+
+fix_validator_agent = FixValidatorAgent(
+    name="FixValidator",
+    description="Validates fixes and generates final fix report"
+)
\ No newline at end of file
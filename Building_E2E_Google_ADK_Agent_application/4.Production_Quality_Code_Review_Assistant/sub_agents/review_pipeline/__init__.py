@@ -0,0 +1,8 @@
+"""
+Sub-agents for specialized code review tasks.
+
+This module exports the individual agent instances that are used
+in the main code review pipeline.
+"""
+
+__all__ = []
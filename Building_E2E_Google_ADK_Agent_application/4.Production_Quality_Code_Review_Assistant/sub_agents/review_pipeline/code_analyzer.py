@@ -0,0 +1,109 @@
+"""
+Code Analyzer Agent - Understands code structure and complexity.
+
+This agent is responsible for parsing and analyzing Python code structure,
+identifying functions, classes, imports, and potential issues.
+The submission is extracted from the user message and analyzed in code
+before the model runs; the model only summarizes the structured result.
+"""
+
+import logging
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import ToolContext
+from google.adk.utils import instructions_utils
+from google.genai import types
+from code_review_assistant.config import config
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.token_usage import record_model_usage
+from code_review_assistant.tools import (
+    analyze_code_structure,
+    clear_persisted_test_suite,
+    extract_code_from_message,
+    tool_context_from_callback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_code_analysis(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: extract the submission and analyze it deterministically."""
+    user_content = callback_context.user_content
+    message_text = ""
+    if user_content and user_content.parts:
+        message_text = "\n".join(part.text for part in user_content.parts if part.text)
+
+    code = extract_code_from_message(message_text)
+
+    # Clear results from any previous submission in this session
+    callback_context.state[StateKeys.SYNTAX_ERROR] = ""
+    callback_context.state[StateKeys.CODE_ANALYSIS] = {}
+    clear_persisted_test_suite(callback_context.state)
+
+    result = await analyze_code_structure(code, tool_context_from_callback(callback_context))
+    if result.get("status") != "success":
+        logger.info(f"Code analysis did not succeed: {result.get('message')}")
+        # The analysis tool does not record non-syntax failures, so expose them to the model
+        if not callback_context.state.get(StateKeys.SYNTAX_ERROR):
+            callback_context.state[StateKeys.SYNTAX_ERROR] = result.get("message", "Analysis failed")
+
+    return None
+
+
+def analysis_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """Deadline fallback: summarize the deterministic analysis without the model."""
+    state = tool_context.state
+    if state.get(StateKeys.CODE_TO_REVIEW) is None:
+        state[StateKeys.CODE_TO_REVIEW] = ""
+    metrics = (state.get(StateKeys.CODE_ANALYSIS) or {}).get('metrics', {})
+
+    lines = [
+        "## Code Structure",
+        f"- Lines: {state.get(StateKeys.CODE_LINE_COUNT, 0)}",
+        f"- Functions: {metrics.get('function_count', 0)}",
+        f"- Classes: {metrics.get('class_count', 0)}",
+    ]
+    if state.get(StateKeys.SYNTAX_ERROR):
+        lines.append(f"- Syntax error: {state[StateKeys.SYNTAX_ERROR]}")
+    lines.append(f"\n(Summary generated without the model: analysis exceeded its {timeout_seconds:.0f}s deadline.)")
+
+    summary = "\n".join(lines)
+    state[StateKeys.STRUCTURE_ANALYSIS_SUMMARY] = summary
+    return summary
+
+
+async def code_analyzer_instruction_provider(context: ReadonlyContext) -> str:
+    """Dynamic instruction provider that injects the structured analysis."""
+    template = """You are a code analysis specialist responsible for understanding code structure.
+
+The submitted code has already been parsed and analyzed. Base your summary ONLY on
+these structured results - do not re-analyze, fix or rewrite the code.
+
+ANALYSIS RESULTS:
+- Line count: {code_line_count?}
+- Structure (functions, classes, imports, metrics): {code_analysis?}
+- Syntax or parse error (empty if none): {syntax_error?}
+
+If a syntax or parse error is reported, clearly report the error location and type.
+
+Provide a clear summary including:
+- Number of functions and classes found
+- Key structural observations
+- Any syntax errors or issues detected
+- Overall code organization assessment"""
+
+    return await instructions_utils.inject_session_state(template, context)
+
+
+code_analyzer_agent = Agent(
+    name="CodeAnalyzer",
+    model=config.worker_model,
+    description="Analyzes Python code structure and identifies components",
+    instruction=code_analyzer_instruction_provider,
+    before_agent_callback=run_code_analysis,
+    after_model_callback=record_model_usage,
+    output_key="structure_analysis_summary"
+)
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Feedback Synthesizer Agent - Provides comprehensive, personalized feedback.
+
+This agent synthesizes all analysis results into constructive feedback,
+incorporating past feedback history and tracking improvement over time.
+History lookup, progress tracking, report saving and indexing the review
+for near-duplicate reuse run as deterministic callbacks around a single
+model generation.
+"""
+
+import logging
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import ToolContext
+from google.adk.utils import instructions_utils
+from google.genai import types
+from code_review_assistant.config import config
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.routing import route_model, record_route_latency
+from code_review_assistant.token_usage import record_model_usage, track_model_request
+from code_review_assistant.tools import (
+    index_reviewed_submission,
+    load_progress_trends,
+    parse_json_output,
+    search_past_feedback,
+    update_grading_progress,
+    save_grading_report,
+    tool_context_from_callback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def prepare_feedback_context(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: look up past feedback and update progress before the model runs."""
+    tool_context = tool_context_from_callback(callback_context)
+
+    history = await search_past_feedback("", tool_context)
+    if history.get("status") != "success":
+        logger.warning(f"Feedback history lookup failed: {history.get('message')}")
+
+    progress = await update_grading_progress(tool_context)
+    if progress.get("status") != "success":
+        logger.warning(f"Progress update failed: {progress.get('message')}")
+
+    trends = await load_progress_trends(tool_context)
+    if trends.get("status") != "success":
+        logger.warning(f"Progress trends lookup failed: {trends.get('message')}")
+
+    return None
+
+
+async def persist_feedback_report(callback_context: CallbackContext) -> Optional[types.Content]:
+    """after_agent_callback: save the grading report and index the review once final_feedback is in state."""
+    feedback_text = callback_context.state.get(StateKeys.FINAL_FEEDBACK, '')
+    if not feedback_text:
+        logger.warning("No final feedback in state, skipping grading report")
+        return None
+
+    tool_context = tool_context_from_callback(callback_context)
+    result = await save_grading_report(feedback_text, tool_context)
+    if result.get("status") != "success":
+        logger.warning(f"Grading report save failed: {result.get('message')}")
+
+    result = await index_reviewed_submission(feedback_text, tool_context)
+    if result.get("status") != "success":
+        logger.warning(f"Review indexing failed: {result.get('message')}")
+
+    return None
+
+
+def feedback_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """
+    Deadline fallback: present the automated results without personalized feedback.
+
+    The partial feedback is not saved as a grading report or indexed for reuse.
+    """
+    state = tool_context.state
+    tests = parse_json_output(state.get(StateKeys.TEST_EXECUTION_SUMMARY, ''))
+    summary = tests.get('test_summary') or {}
+    verdict = tests.get('verdict') or {}
+
+    lines = [
+        "## 📊 Summary",
+        f"Detailed feedback could not be generated within {timeout_seconds:.0f}s. "
+        "The automated analysis results are below - submit the code again for full feedback.",
+        "",
+        state.get(StateKeys.STRUCTURE_ANALYSIS_SUMMARY, ''),
+        "",
+        state.get(StateKeys.STYLE_CHECK_SUMMARY, ''),
+        "",
+        "## Test Results",
+        f"- Status: {verdict.get('status', 'UNKNOWN')}",
+        f"- Tests passed: {summary.get('tests_passed', 0)} of {summary.get('total_tests_run', 0)}",
+    ]
+    for issue in tests.get('critical_issues') or []:
+        if isinstance(issue, dict):
+            lines.append(f"- Critical issue ({issue.get('type', 'unknown')}): {issue.get('description', '')}")
+
+    feedback = "\n".join(lines)
+    state[StateKeys.FINAL_FEEDBACK] = feedback
+    return feedback
+
+
+async def feedback_instruction_provider(context: ReadonlyContext) -> str:
+    """Dynamic instruction provider that injects state variables."""
+    template = """You are an expert code reviewer and mentor providing constructive, educational feedback.
+
+CONTEXT FROM PREVIOUS AGENTS:
+- Structure analysis summary: {structure_analysis_summary}
+- Style check summary: {style_check_summary}  
+- Test execution summary: {test_execution_summary}
+
+DEVELOPER HISTORY (already retrieved for you):
+- Past feedback: {past_feedback?}
+- Feedback patterns: {feedback_patterns?}
+- Attempt in this session: {grading_attempts?}
+- Lifetime submissions: {temp:lifetime_submissions?}
+- Style score change since last submission: {score_improvement?}
+- Trends over past reviews (moving averages, direction, recurring and resolved issues): {temp:progress_trends?}
+
+PRIOR REVIEW OF A NEAR-DUPLICATE SUBMISSION (empty if none): {temp:similar_review?}
+{temp:prior_feedback?}
+If a prior review is shown, use it as the skeleton for your feedback: keep its structure
+and the points that still apply, but take every score, test result and issue from the
+current analysis above - never copy numbers from the prior review.
+
+YOUR TASK:
+1. Carefully analyze the test results to understand what really happened
+2. Use the developer history to personalize the feedback and acknowledge progress;
+   point out issues that keep recurring and praise sustained improvement or resolved issues
+3. Generate comprehensive feedback following the structure below
+4. Return the feedback as your final output
+
+The history lookup, progress tracking and report saving are handled automatically -
+you do not need to call any tools.
+
+CRITICAL - Understanding Test Results:
+The test_execution_summary contains structured JSON. Parse it carefully:
+- tests_passed = Code worked correctly
+- tests_failed = Code produced wrong output
+- tests_with_errors = Code crashed
+- critical_issues = Fundamental problems with the code
+
+If critical_issues array contains items, these are serious bugs that need fixing.
+Do NOT count discovering bugs as test successes.
+
+FEEDBACK STRUCTURE TO FOLLOW:
+
+## 📊 Summary
+Provide an honest assessment. Be encouraging but truthful about problems found.
+
+## ✅ Strengths  
+List 2-3 things done well, referencing specific code elements.
+
+## 📈 Code Quality Analysis
+
+### Structure & Organization
+Comment on code organization, readability, and documentation.
+
+### Style Compliance
+Report the actual style score and any specific issues.
+
+### Test Results
+Report the actual test results accurately:
+- If critical_issues exist, report them as bugs to fix
+- Be clear: "X tests passed, Y critical issues were found"
+- List each critical issue
+- Don't hide or minimize problems
+
+## 💡 Recommendations for Improvement
+Based on the analysis, provide specific actionable fixes.
+If critical issues exist, fixing them is top priority.
+
+## 🎯 Next Steps
+Prioritized action list based on severity of issues.
+
+## 💬 Encouragement
+End with encouragement while being honest about what needs fixing."""
+
+    return await instructions_utils.inject_session_state(template, context)
+
+
+async def project_feedback_instruction_provider(context: ReadonlyContext) -> str:
+    """Feedback instruction for project reviews, followed by the modules selected for review."""
+    instruction = await feedback_instruction_provider(context)
+    code = context.state.get(StateKeys.CODE_TO_REVIEW, '')
+    if not code:
+        return instruction
+
+    # Appended after state injection so braces in the source are left untouched
+    return (f"{instruction}\n\n"
+            "PROJECT MODULES WITH ISSUES (each starts with a '# === File: <path> ===' line).\n"
+            "Reference these files and their code in your feedback:\n"
+            f"{code}")
+
+
+def create_feedback_synthesizer(name: str = "FeedbackSynthesizer",
+                                instruction=feedback_instruction_provider) -> Agent:
+    """Create a feedback synthesizer; each pipeline needs its own instance since agents have one parent."""
+    return Agent(
+        name=name,
+        model=config.critic_model,
+        description="Synthesizes all analysis into constructive, personalized feedback",
+        instruction=instruction,
+        before_agent_callback=prepare_feedback_context,
+        after_agent_callback=persist_feedback_report,
+        before_model_callback=[route_model, track_model_request],
+        after_model_callback=[record_route_latency, record_model_usage],
+        output_key="final_feedback"
+    )
+
+
+feedback_synthesizer_agent = create_feedback_synthesizer()
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Project Analyzer Agent - Reviews multi-file projects deterministically.
+
+This agent loads a project submitted as a zip file (attached or saved as an
+artifact) or a directory, analyzes every module in parallel worker processes,
+and prepares summaries and the modules with issues for the feedback stage.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+from typing import AsyncGenerator, Dict, Any, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.tools import ToolContext
+from google.genai import types
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.project_review import (
+    ProjectLoadError,
+    load_project_from_directory,
+    load_project_from_zip,
+    review_project,
+)
+from code_review_assistant.tools import clear_persisted_test_suite, not_run_test_summary
+
+logger = logging.getLogger(__name__)
+
+ZIP_MIME_TYPES = {'application/zip', 'application/x-zip-compressed'}
+
+_TOKEN_RE = re.compile(r"[`'\"]?([\w./\\-]+)[`'\"]?")
+
+
+def find_project_source(content: Optional[types.Content]) -> Tuple[Optional[str], Any]:
+    """
+    Finds the project in the user message.
+
+    Returns:
+        ('zip', bytes) for an attached zip, ('artifact', filename) for a referenced
+        zip artifact, ('directory', path) for a directory, or (None, None)
+    """
+    if not content or not content.parts:
+        return None, None
+
+    for part in content.parts:
+        if part.inline_data and part.inline_data.mime_type in ZIP_MIME_TYPES:
+            return 'zip', part.inline_data.data
+
+    text = "\n".join(part.text for part in content.parts if part.text)
+    tokens = [match.group(1).rstrip('.,;:') for match in _TOKEN_RE.finditer(text)]
+    for token in tokens:
+        if token.lower().endswith('.zip'):
+            return 'artifact', token
+    for token in tokens:
+        if '/' in token or token == '.':
+            return 'directory', token
+    return None, None
+
+
+def _render_structure_summary(review: Dict[str, Any]) -> str:
+    modules = review['modules']
+    total_lines = sum(m['line_count'] for m in modules)
+    syntax_errors = [m for m in modules if m['syntax_error']]
+
+    lines = [
+        "## Project Structure",
+        f"- Modules: {len(modules)} in {len(review['packages'])} packages ({total_lines} lines)",
+        f"- Intra-project imports: {sum(len(v) for v in review['import_graph'].values())}",
+        f"- Modules with syntax errors: {len(syntax_errors)}",
+        "",
+        "### Packages",
+        "| Package | Modules | Lines | Functions | Classes | Style score | Style issues |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for name, stats in sorted(review['packages'].items()):
+        lines.append(f"| {name} | {stats['modules']} | {stats['lines']} | {stats['functions']} | "
+                     f"{stats['classes']} | {stats['style_score']} | {stats['style_issues']} |")
+
+    if review['import_cycles']:
+        lines.extend(["", "### Import cycles"])
+        for cycle in review['import_cycles']:
+            lines.append(f"- {' -> '.join(cycle)}")
+
+    for module in syntax_errors:
+        lines.append(f"- {module['path']}: {module['syntax_error']}")
+
+    return "\n".join(lines)
+
+
+def _render_style_summary(review: Dict[str, Any]) -> str:
+    lines = ["## Style Analysis Results (modules with issues)"]
+    if not review['selected']:
+        lines.append("All modules pass the style check.")
+    for module in review['selected']:
+        lines.append("")
+        lines.append(f"### {module['path']} - {module['style_score']}/100, "
+                     f"{module['style_issue_count']} issues")
+        for issue in module['style_issues'][:5]:
+            lines.append(f"- Line {issue['line']}: {issue['message']}")
+    return "\n".join(lines)
+
+
+def _combined_code(selected: List[Dict[str, Any]], modules: Dict[str, str]) -> str:
+    return "\n\n".join(f"# === File: {m['path']} ===\n{modules[m['path']]}" for m in selected)
+
+
+def project_timeout_fallback(tool_context: ToolContext, timeout_seconds: float) -> str:
+    """Deadline fallback: stop the pipeline, as for a project that cannot be loaded."""
+    tool_context._invocation_context.end_invocation = True
+    return f"❌ Project review failed: the analysis did not finish within {timeout_seconds:.0f}s"
+
+
+class ProjectAnalyzerAgent(BaseAgent):
+    """Deterministic agent that runs the project-level analysis without a model call."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        tool_context = ToolContext(ctx)
+        kind, source = find_project_source(ctx.user_content)
+
+        try:
+            if kind == 'zip':
+                modules = await asyncio.to_thread(load_project_from_zip, source)
+            elif kind == 'artifact':
+                artifact = await tool_context.load_artifact(source)
+                if not artifact or not artifact.inline_data:
+                    raise ProjectLoadError(f"Artifact {source} not found")
+                modules = await asyncio.to_thread(load_project_from_zip, artifact.inline_data.data)
+            elif kind == 'directory':
+                modules = await asyncio.to_thread(load_project_from_directory, source)
+            else:
+                raise ProjectLoadError("No project found - attach a zip file, name a zip artifact or a directory")
+            if not modules:
+                raise ProjectLoadError("The project contains no Python files")
+
+            # Worker threads cannot be cancelled, so tell the pool to stop if this task is
+            cancel_event = threading.Event()
+            try:
+                review = await asyncio.to_thread(review_project, modules, cancel_event)
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+        except ProjectLoadError as e:
+            logger.warning(f"ProjectAnalyzer: {e}")
+            # Nothing to review - stop the pipeline here
+            ctx.end_invocation = True
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=f"❌ Project review failed: {e}")])
+            )
+            return
+
+        selected = review['selected']
+        selected_lines = sum(m['line_count'] for m in selected)
+        all_modules = review['modules']
+        total_lines = sum(m['line_count'] for m in all_modules)
+
+        # Populate the same state keys as a single-file review, restricted to modules with issues
+        state = tool_context.state
+        state[StateKeys.PROJECT_SOURCE] = f"{kind}:{source if kind != 'zip' else 'attachment'}"
+        state[StateKeys.PROJECT_REVIEW] = {
+            'module_count': len(all_modules),
+            'packages': review['packages'],
+            'import_cycles': review['import_cycles'],
+            'selected_modules': [m['path'] for m in selected]
+        }
+        state[StateKeys.CODE_TO_REVIEW] = _combined_code(selected, modules)
+        clear_persisted_test_suite(state)
+        state[StateKeys.CODE_LINE_COUNT] = selected_lines
+        state[StateKeys.CODE_ANALYSIS] = {'metrics': {
+            'line_count': total_lines,
+            'module_count': len(all_modules),
+            'function_count': sum(len((m['analysis'] or {}).get('functions', [])) for m in selected),
+            'class_count': sum(len((m['analysis'] or {}).get('classes', [])) for m in selected),
+        }}
+        state[StateKeys.STYLE_SCORE] = round(
+            sum(m['style_score'] * max(m['line_count'], 1) for m in all_modules)
+            / max(sum(max(m['line_count'], 1) for m in all_modules), 1)
+        )
+        state[StateKeys.STYLE_ISSUE_COUNT] = sum(m['style_issue_count'] for m in all_modules)
+        state[StateKeys.STYLE_ISSUES] = [
+            {**issue, 'file': m['path']} for m in selected for issue in m['style_issues'][:3]
+        ][:10]
+        state[StateKeys.STRUCTURE_ANALYSIS_SUMMARY] = _render_structure_summary(review)
+        state[StateKeys.STYLE_CHECK_SUMMARY] = _render_style_summary(review)
+        state[StateKeys.TEST_EXECUTION_SUMMARY] = not_run_test_summary(
+            'Tests are not generated in project review mode'
+        )
+
+        text = (f"{state[StateKeys.STRUCTURE_ANALYSIS_SUMMARY]}\n\n"
+                f"{len(selected)} of {len(all_modules)} modules selected for detailed feedback.")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=tool_context.actions
+        )
+
+
+project_analyzer_agent = ProjectAnalyzerAgent(
+    name="ProjectAnalyzer",
+    description="Analyzes all modules of a multi-file project and selects those with issues"
+)
\ No newline at end of file
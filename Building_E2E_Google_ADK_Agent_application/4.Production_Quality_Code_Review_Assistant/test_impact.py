@@ -0,0 +1,240 @@
+"""
+Test-impact analysis for the fix loop.
+
+Maps each test in the persisted suite to the functions and classes of the
+code under test that it references (directly or through suite helpers), so
+that fix iterations only rerun the tests affected by the functions that
+actually changed.
+"""
+
+import ast
+import hashlib
+from typing import Dict, Any, List, Optional, Set
+
+
+def _is_test_name(name: str) -> bool:
+    return name.startswith('test')
+
+
+def _referenced_names(node: ast.AST) -> Set[str]:
+    """Collect every identifier and attribute name referenced inside a node."""
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+    return names
+
+
+def _suite_tests(tree: ast.Module) -> Dict[str, ast.AST]:
+    """Return the test functions of a suite keyed by name (Class.method for TestCase methods)."""
+    tests = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and _is_test_name(node.name):
+            tests[node.name] = node
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and _is_test_name(item.name):
+                    tests[f"{node.name}.{item.name}"] = item
+    return tests
+
+
+def build_test_impact_map(suite: str, targets: Set[str]) -> Dict[str, List[str]]:
+    """
+    Builds a map from each test to the code-under-test symbols it exercises.
+
+    References are resolved statically: names used in the test body, expanded
+    transitively through helper functions and fixtures defined in the suite.
+
+    Args:
+        suite: Test suite source (without the code under test)
+        targets: Function, method and class names of the code under test
+
+    Returns:
+        {test_name: sorted target names}; empty if the suite has no test functions
+    """
+    try:
+        tree = ast.parse(suite)
+    except SyntaxError:
+        return {}
+
+    helpers = {node.name: _referenced_names(node) for node in tree.body
+               if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+               and not _is_test_name(node.name) and node.name not in targets}
+
+    impact_map = {}
+    for test_name, node in _suite_tests(tree).items():
+        seen = set()
+        pending = list(_referenced_names(node))
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            pending.extend(helpers.get(name, ()))
+        impact_map[test_name] = sorted(seen & targets)
+
+    return impact_map
+
+
+# Fingerprint key of the module-level statements that are not definitions
+MODULE_LEVEL = '<module>'
+
+
+def function_fingerprints(code: str) -> Dict[str, str]:
+    """
+    Fingerprints every function, method and class body in code.
+
+    Fingerprints come from the AST dump so comment and whitespace changes do not
+    count as changes. Methods are recorded under their bare name so they match
+    the references collected by build_test_impact_map. Module-level statements
+    other than definitions (imports, constants, globals) are fingerprinted
+    together under MODULE_LEVEL, since any test may depend on them.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {}
+
+    fingerprints = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            digest = hashlib.sha256(ast.dump(node).encode()).hexdigest()[:16]
+            # Same-named definitions are combined so any change is detected
+            fingerprints[node.name] = fingerprints.get(node.name, '') + digest
+
+    module_level = [node for node in tree.body
+                    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+    fingerprints[MODULE_LEVEL] = hashlib.sha256(
+        ast.dump(ast.Module(body=module_level, type_ignores=[])).encode()
+    ).hexdigest()[:16]
+    return fingerprints
+
+
+def changed_symbols(previous: Dict[str, str], current: Dict[str, str]) -> Set[str]:
+    """Return symbols that were added, removed or modified between two fingerprint maps."""
+    return {name for name in set(previous) | set(current)
+            if previous.get(name) != current.get(name)}
+
+
+def expand_to_dependents(code: str, changed: Set[str]) -> Set[str]:
+    """
+    Adds every symbol in code that (transitively) references a changed symbol.
+
+    A test that calls dfs() must rerun when a helper that dfs() calls changes.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set(changed)
+
+    references = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            references.setdefault(node.name, set()).update(_referenced_names(node) - {node.name})
+
+    affected = set(changed)
+    grew = True
+    while grew:
+        grew = False
+        for name, refs in references.items():
+            if name not in affected and refs & affected:
+                affected.add(name)
+                grew = True
+    return affected
+
+
+def select_tests(impact_map: Dict[str, List[str]], changed: Set[str]) -> List[str]:
+    """
+    Selects the tests that must rerun for a set of changed symbols.
+
+    Tests with no resolved references are always selected, since their
+    dependencies are unknown.
+    """
+    return [name for name, refs in impact_map.items()
+            if not refs or changed.intersection(refs)]
+
+
+def filter_suite(suite: str, keep_tests: List[str]) -> Optional[str]:
+    """
+    Removes tests not in keep_tests from the suite, along with their top-level calls.
+
+    Returns:
+        The filtered suite, or None if it cannot be filtered safely (for example when
+        remaining code still references a removed test), meaning a full run is needed
+    """
+    try:
+        tree = ast.parse(suite)
+    except SyntaxError:
+        return None
+
+    keep = set(keep_tests)
+    removed = set()
+    body = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and _is_test_name(node.name):
+            if node.name not in keep:
+                removed.add(node.name)
+                continue
+        elif isinstance(node, ast.ClassDef):
+            methods = []
+            for item in node.body:
+                if (isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                        and _is_test_name(item.name)
+                        and f"{node.name}.{item.name}" not in keep):
+                    removed.add(item.name)
+                    continue
+                methods.append(item)
+            node.body = methods or [ast.Pass()]
+        elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+              and isinstance(node.value.func, ast.Name) and node.value.func.id in removed):
+            continue
+        body.append(node)
+
+    filtered = ast.Module(body=body, type_ignores=[])
+    if removed & _referenced_names(filtered):
+        return None
+    return ast.unparse(filtered)
+
+
+def normalize_test_name(name: str) -> str:
+    """
+    Reduces a test name to the bare test function name.
+
+    The impact map keys TestCase methods as Class.method, while test runners
+    report 'test_x', 'Class.test_x', 'module.Class.test_x' or unittest's
+    'test_x (module.Class)', so names are compared in this common form.
+    """
+    name = str(name).strip().split(' (', 1)[0].strip()
+    return name.rsplit('.', 1)[-1].removesuffix('()')
+
+
+def merge_carried_results(summary: Dict[str, Any], skipped: List[str],
+                          previously_failing: List[str]) -> Dict[str, Any]:
+    """
+    Adds the results of tests that were not rerun to a selective run's summary.
+
+    Skipped tests exercise only unchanged code, so they keep their previous outcome.
+
+    Args:
+        summary: Parsed fix test runner JSON for the selected tests
+        skipped: Names of tests that were not rerun
+        previously_failing: Test names that failed in the previous run, in any
+            form normalize_test_name accepts
+
+    Returns:
+        A new summary covering the whole suite
+    """
+    failing = {normalize_test_name(name) for name in previously_failing}
+    carried_failing = [name for name in skipped if normalize_test_name(name) in failing]
+    carried_passing = len(skipped) - len(carried_failing)
+
+    merged = dict(summary)
+    merged['passed'] = summary.get('passed', 0) + carried_passing
+    merged['failed'] = summary.get('failed', 0) + len(carried_failing)
+    merged['total'] = summary.get('total', 0) + len(skipped)
+    merged['pass_rate'] = (merged['passed'] / merged['total']) * 100 if merged['total'] else 0
+    merged['still_failing_tests'] = list(summary.get('still_failing_tests', [])) + carried_failing
+    merged['carried_over_tests'] = list(skipped)
+    return merged
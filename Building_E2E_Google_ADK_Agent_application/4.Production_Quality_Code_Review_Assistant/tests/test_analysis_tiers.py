@@ -0,0 +1,91 @@
+"""
+Unit tests for tiered, resource-bounded structural analysis.
+"""
+
+import pytest
+
+from code_review_assistant import analysis_tiers
+from code_review_assistant.analysis_tiers import (
+    TIER_INLINE,
+    TIER_ISOLATED,
+    TIER_POOL,
+    TIER_TOO_LARGE,
+    analyze_submission,
+    classify_submission,
+)
+from code_review_assistant.config import config
+
+SMALL = "def add(a, b):\n    return a + b\n"
+MEDIUM = "\n".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(10))
+
+
+@pytest.fixture
+def small_tiers(monkeypatch):
+    """Tier limits small enough for short test programs."""
+    monkeypatch.setattr(config, "analysis_inline_max_chars", 100)
+    monkeypatch.setattr(config, "analysis_pool_max_chars", 1000)
+    monkeypatch.setattr(config, "analysis_max_chars", 5000)
+    monkeypatch.setattr(config, "analysis_max_line_chars", 200)
+    monkeypatch.setattr(config, "analysis_max_nesting", 8)
+
+
+def test_tiers_follow_submission_size(small_tiers):
+    """Small code is parsed inline, medium code in the pool, large code in isolation."""
+    assert classify_submission(SMALL) == (TIER_INLINE, None)
+    assert classify_submission(MEDIUM) == (TIER_POOL, None)
+    assert classify_submission(MEDIUM * 5)[0] == TIER_ISOLATED
+
+    tier, reason = classify_submission("x = 1\n" * 1000)
+    assert tier == TIER_TOO_LARGE
+    assert "exceeds the limit of 5000" in reason
+
+
+def test_suspicious_shapes_are_isolated(small_tiers):
+    """Very long lines and deep nesting go to the isolated subprocess even when small."""
+    tier, reason = classify_submission("x = '" + "a" * 300 + "'\n")
+    assert (tier, reason) == (TIER_ISOLATED, "a line of 306 characters")
+
+    tier, reason = classify_submission("x = " + "[" * 10 + "]" * 10 + "\n")
+    assert (tier, reason) == (TIER_ISOLATED, "nesting depth 10")
+
+
+@pytest.mark.asyncio
+async def test_every_tier_returns_the_same_analysis(small_tiers, monkeypatch):
+    """Inline, pool and isolated analysis agree on the result."""
+    inline = await analyze_submission(SMALL)
+    assert inline['status'] == 'success' and inline['tier'] == TIER_INLINE
+    assert inline['analysis']['metrics']['function_count'] == 1
+
+    pooled = await analyze_submission(MEDIUM)
+    assert pooled['status'] == 'success' and pooled['tier'] == TIER_POOL
+    assert pooled['analysis']['metrics']['function_count'] == 10
+
+    monkeypatch.setattr(config, "analysis_pool_max_chars", 100)
+    isolated = await analyze_submission(MEDIUM)
+    assert isolated['status'] == 'success' and isolated['tier'] == TIER_ISOLATED
+    assert isolated['analysis'] == pooled['analysis']
+
+
+@pytest.mark.asyncio
+async def test_pool_workers_are_not_forked(small_tiers):
+    """Pool workers start with forkserver or spawn, never fork from the server."""
+    await analyze_submission(MEDIUM)
+    assert analysis_tiers._pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+
+@pytest.mark.asyncio
+async def test_syntax_errors_are_raised_from_isolated_analysis(small_tiers, monkeypatch):
+    """A syntax error found in the subprocess is raised with its location."""
+    monkeypatch.setattr(config, "analysis_pool_max_chars", 100)
+    with pytest.raises(SyntaxError) as error:
+        await analyze_submission(MEDIUM + "\ndef broken(:\n    pass\n")
+    assert error.value.lineno == MEDIUM.count("\n") + 2
+
+
+@pytest.mark.asyncio
+async def test_too_large_submissions_get_partial_metrics(small_tiers):
+    """Submissions over the limit are never parsed but still get line counts."""
+    result = await analyze_submission("x = 1\n" * 1000)
+    assert result['status'] == 'too_large'
+    assert result['tier'] == TIER_TOO_LARGE
+    assert result['partial_metrics']['line_count'] == 1000
@@ -0,0 +1,46 @@
+"""
+Unit tests for the deterministic style auto-fix.
+"""
+
+import ast
+
+from code_review_assistant.autofix import autofix_style
+
+
+def test_whitespace_and_blank_lines_are_fixed():
+    """Mechanical whitespace and blank line issues are fixed in place."""
+    code = "import os\ndef f( a ,b ):\n    x=a+b\n    return x\nclass K:\n    pass\n"
+    result = autofix_style(code)
+    assert result['status'] == 'success'
+    assert result['code'] == ("import os\n\n\ndef f(a, b):\n    x = a + b\n    return x\n\n\n"
+                              "class K:\n    pass\n")
+    assert result['fixed']['E302'] == 2
+    assert result['fixed_count'] == sum(result['fixed'].values())
+
+
+def test_behaviour_is_unchanged():
+    """Fixed code always parses to the same AST."""
+    code = "def f(x):\n    y=x*2\n    return {'a':y , 'b' :[1,2]}\n"
+    result = autofix_style(code)
+    assert ast.dump(ast.parse(result['code'])) == ast.dump(ast.parse(code))
+
+
+def test_string_contents_are_not_touched():
+    """Whitespace inside string literals is part of the program."""
+    code = 's = """a  =  b\n  x=1 """\nt = "c  =  d"\n'
+    assert autofix_style(code)['code'] == code
+
+
+def test_clean_code_is_returned_as_is():
+    """Nothing to fix means nothing is reported."""
+    code = "def f(a, b):\n    return a + b\n"
+    result = autofix_style(code)
+    assert result['code'] == code
+    assert result['fixed_count'] == 0
+
+
+def test_unparsable_code_is_skipped():
+    """Code with syntax errors is left for the model."""
+    result = autofix_style("def f(:\n  pass")
+    assert result['status'] == 'skipped'
+    assert result['code'] == "def f(:\n  pass"
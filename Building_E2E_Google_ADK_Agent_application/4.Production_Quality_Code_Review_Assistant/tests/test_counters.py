@@ -0,0 +1,81 @@
+"""
+Unit tests for the atomic counter stores.
+"""
+
+import asyncio
+
+import pytest
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+
+from code_review_assistant.counters import DatabaseCounterStore, InMemoryCounterStore
+from code_review_assistant.services import get_counter_store
+
+APP = "test_app"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryCounterStore()
+    return DatabaseCounterStore(db_url=f"sqlite:///{tmp_path / 'counters.db'}")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_increments_are_not_lost(store):
+    """Every concurrent increment is counted exactly once."""
+    results = await asyncio.gather(*(store.increment(APP, "user", "user:total_submissions")
+                                     for _ in range(20)))
+    assert sorted(results) == list(range(1, 21))
+    assert await store.get(APP, "user", "user:total_submissions") == 20
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_reviews_carry_over_state_once(store):
+    """Seeding a counter from state is idempotent under concurrency."""
+    async def first_review():
+        await store.insert_if_absent(APP, "user", "user:total_submissions", 5)
+        return await store.increment(APP, "user", "user:total_submissions", 1)
+
+    await asyncio.gather(*(first_review() for _ in range(8)))
+    assert await store.get(APP, "user", "user:total_submissions") == 13
+
+
+@pytest.mark.asyncio
+async def test_increment_many_and_maximum(store):
+    """Several counters move together; maximum only ever grows."""
+    await store.increment_many(APP, None, {"app:reviews": 1, "app:tokens": 250})
+    await store.increment_many(APP, None, {"app:reviews": 1, "app:tokens": 100})
+    assert await store.get_all(APP, None) == {"app:reviews": 2, "app:tokens": 350}
+
+    await store.maximum(APP, "user", "user:best_style_score", 70)
+    await store.maximum(APP, "user", "user:best_style_score", 60)
+    assert await store.get(APP, "user", "user:best_style_score") == 70
+
+
+@pytest.mark.asyncio
+async def test_set_stores_json_values_per_user(store):
+    """Last-write values keep their type and are scoped per user."""
+    await store.set(APP, "alice", "user:last_submission_time", "2025-01-01T00:00:00")
+    await store.set(APP, "alice", "user:last_style_score", 82)
+    await store.set(APP, "bob", "user:last_style_score", 40)
+
+    assert await store.get_all(APP, "alice") == {
+        "user:last_submission_time": "2025-01-01T00:00:00",
+        "user:last_style_score": 82,
+    }
+    assert await store.get(APP, "bob", "user:last_style_score") == 40
+    assert await store.get(APP, "carol", "user:last_style_score", 0) == 0
+
+
+def test_store_follows_the_session_service(tmp_path):
+    """SQL sessions get a store on the same database, in-memory sessions a shared in-memory one."""
+    db_url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    database_store = get_counter_store(DatabaseSessionService(db_url=db_url))
+    assert isinstance(database_store, DatabaseCounterStore)
+    assert get_counter_store(DatabaseSessionService(db_url=db_url)) is database_store
+
+    memory_store = get_counter_store(InMemorySessionService())
+    assert isinstance(memory_store, InMemoryCounterStore)
+    assert get_counter_store(InMemorySessionService()) is memory_store
+
+    assert get_counter_store(object()) is None
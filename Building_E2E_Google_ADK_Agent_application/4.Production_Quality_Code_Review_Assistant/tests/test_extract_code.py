@@ -0,0 +1,28 @@
+"""
+Unit tests for extracting the submitted code from a user message.
+"""
+
+from code_review_assistant.tools import extract_code_from_message
+
+
+def test_fenced_block_is_preferred():
+    """The largest fenced block is used when the message has one."""
+    message = "Please review:\n```python\ndef add(a, b):\n    return a + b\n```\nThanks!"
+    assert extract_code_from_message(message) == "def add(a, b):\n    return a + b"
+
+
+def test_leading_and_trailing_prose_is_dropped():
+    """Prose around unfenced code must not reach the analyzer."""
+    message = "Can you review this?\n\ndef add(a, b):\n    return a + b\n\nThanks for your help!"
+    assert extract_code_from_message(message) == "def add(a, b):\n    return a + b"
+
+
+def test_syntax_error_is_kept_in_place():
+    """Broken code is kept whole so the analyzer reports the real error."""
+    message = "Why does this fail?\ndef add(a, b)\n    return a + b\nprint add(1, 2)"
+    assert extract_code_from_message(message) == "def add(a, b)\n    return a + b\nprint add(1, 2)"
+
+
+def test_prose_only_message_is_returned_as_is():
+    """A message with no code is analyzed as is."""
+    assert extract_code_from_message("Hello there") == "Hello there"
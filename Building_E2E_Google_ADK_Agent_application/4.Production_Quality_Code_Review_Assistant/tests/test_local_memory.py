@@ -0,0 +1,110 @@
+"""
+Unit tests for the local SQLite FTS memory service.
+"""
+
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.genai.types import Content, Part
+
+from code_review_assistant.local_memory import LocalMemoryService
+
+APP = "test_app"
+
+
+@pytest.fixture
+def memory(tmp_path):
+    service = LocalMemoryService(str(tmp_path / "memory.db"))
+    yield service
+    service.close()
+
+
+def _texts(response):
+    return [entry.content.parts[0].text for entry in response.memories]
+
+
+async def _add_report(memory, user_id, text, timestamp="2025-01-01T00:00:00"):
+    await memory.add_report(app_name=APP, user_id=user_id, session_id="s1", text=text, timestamp=timestamp)
+
+
+@pytest.mark.asyncio
+async def test_search_only_returns_the_developers_memories(memory):
+    """Memories of other users or apps never leak into a search."""
+    await _add_report(memory, "alice", "Recursion without a base case in factorial")
+    await _add_report(memory, "bob", "Recursion depth exceeded in fibonacci")
+    await memory.add_report(app_name="other_app", user_id="alice", session_id="s1",
+                            text="Recursion in tree walk", timestamp="2025-01-01T00:00:00")
+
+    response = await memory.search_memory(app_name=APP, user_id="alice", query="recursion")
+    assert _texts(response) == ["Recursion without a base case in factorial"]
+
+
+@pytest.mark.asyncio
+async def test_results_are_ranked_by_relevance(memory):
+    """BM25 ranks the memory matching more query terms first."""
+    await _add_report(memory, "alice", "Style score 80, naming issues", "2025-01-01T00:00:00")
+    await _add_report(memory, "alice", "Stack initialized as an int, dfs crashes on pop", "2025-01-02T00:00:00")
+
+    response = await memory.search_memory(app_name=APP, user_id="alice", query="dfs stack pop")
+    assert _texts(response)[0] == "Stack initialized as an int, dfs crashes on pop"
+
+
+@pytest.mark.asyncio
+async def test_stemming_matches_word_forms(memory):
+    """The porter tokenizer matches different forms of a word."""
+    await _add_report(memory, "alice", "Tests failing because of off-by-one errors")
+    response = await memory.search_memory(app_name=APP, user_id="alice", query="failed test")
+    assert len(response.memories) == 1
+
+
+@pytest.mark.asyncio
+async def test_query_without_search_terms_returns_nothing(memory):
+    """A query made only of stopwords does not match every memory."""
+    await _add_report(memory, "alice", "Missing docstrings")
+    response = await memory.search_memory(app_name=APP, user_id="alice", query="developer and the")
+    assert response.memories == []
+
+
+@pytest.mark.asyncio
+async def test_sessions_and_reports_are_indexed_once(memory):
+    """Re-adding a session or report does not create duplicates."""
+    session = Session(id="s1", app_name=APP, user_id="alice", events=[
+        Event(author="user", content=Content(role="user", parts=[Part(text="Please review my quicksort")])),
+        Event(author="FeedbackSynthesizer",
+              content=Content(role="model", parts=[Part(text="Quicksort pivot choice is fine")])),
+    ])
+    await memory.add_session_to_memory(session)
+    await memory.add_session_to_memory(session)
+    await _add_report(memory, "alice", "Quicksort report")
+    await _add_report(memory, "alice", "Quicksort report")
+
+    response = await memory.search_memory(app_name=APP, user_id="alice", query="quicksort")
+    assert sorted(_texts(response)) == ["Please review my quicksort", "Quicksort pivot choice is fine",
+                                        "Quicksort report"]
+    assert {entry.author for entry in response.memories} == {"user", "FeedbackSynthesizer"}
+
+
+@pytest.mark.asyncio
+async def test_embeddings_rerank_lexical_candidates(tmp_path):
+    """With an embedder, semantic similarity can overturn the BM25 order."""
+    reports = {
+        "loop loop loop never terminates": [1.0, 0.0],
+        "loop counter is off by one": [0.0, 1.0],
+        "loop variable shadows the builtin list inside a nested helper function": [1.0, 0.0],
+    }
+    vectors = dict(reports, loop=[0.0, 1.0])
+
+    lexical = LocalMemoryService(str(tmp_path / "lexical.db"))
+    reranked = LocalMemoryService(str(tmp_path / "reranked.db"), embedder=lambda text: vectors[text])
+    try:
+        for service in (lexical, reranked):
+            for day, text in enumerate(reports, start=1):
+                await _add_report(service, "alice", text, f"2025-01-0{day}T00:00:00")
+
+        response = await lexical.search_memory(app_name=APP, user_id="alice", query="loop")
+        assert _texts(response)[0] == "loop loop loop never terminates"
+        response = await reranked.search_memory(app_name=APP, user_id="alice", query="loop")
+        assert _texts(response)[0] == "loop counter is off by one"
+    finally:
+        lexical.close()
+        reranked.close()
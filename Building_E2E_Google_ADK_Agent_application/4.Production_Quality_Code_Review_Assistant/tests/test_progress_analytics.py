@@ -0,0 +1,149 @@
+"""
+Unit tests for the incremental per-user progress analytics.
+"""
+
+import math
+
+import pytest
+
+from code_review_assistant.progress_analytics import ProgressAnalyticsStore, review_point
+
+APP = "test_app"
+
+
+def _report(day, style_score, passed=None, total=0, style_codes=(), critical_types=()):
+    return {
+        'timestamp': f"2025-01-{day:02d}T12:00:00",
+        'code': {'line_count': 20},
+        'style': {'score': style_score, 'issues': [{'code': code} for code in style_codes]},
+        'tests': {
+            'test_summary': {'total_tests_run': total, 'tests_passed': passed or 0},
+            'critical_issues': [{'type': issue_type} for issue_type in critical_types],
+            'verdict': {'status': 'BUGGY' if critical_types else 'WORKING'},
+        },
+    }
+
+
+@pytest.fixture(params=["memory", "disk"])
+def store(request, tmp_path):
+    root_dir = str(tmp_path / "analytics") if request.param == "disk" else None
+    return ProgressAnalyticsStore(root_dir=root_dir, window=3, ema_alpha=0.5)
+
+
+async def _review(store, *reports, user_id="alice"):
+    for report in reports:
+        await store.append(APP, user_id, review_point(report))
+
+
+def test_review_point_extracts_metrics_and_codes():
+    """Pass rate, issue counts and codes come from the grading report."""
+    point = review_point(_report(1, 75, passed=3, total=4, style_codes=('E501', 'E501', 'W291'),
+                                 critical_types=('infinite_loop',)))
+    assert point['values']['style_score'] == 75
+    assert point['values']['pass_rate'] == 75.0
+    assert point['values']['critical_issues'] == 1
+    assert point['style_codes'] == ['E501', 'W291']
+    assert point['critical_issue_types'] == ['infinite_loop']
+
+    assert math.isnan(review_point(_report(1, 75))['values']['pass_rate'])
+
+
+@pytest.mark.asyncio
+async def test_window_and_ema_maths(store):
+    """The moving average covers the last window reviews; the EMA weighs every review."""
+    await _review(store, *(_report(day, score) for day, score in enumerate([0, 40, 80, 40], start=1)))
+
+    trends = await store.trends(APP, "alice")
+    assert trends['reviews'] == 4
+    assert trends['since'] == "2025-01-01"
+    assert trends['style_score'] == {
+        'last': 40,
+        'moving_average': 53.3,
+        'ema': 45.0,
+        'min': 0,
+        'max': 80,
+        'direction': 'steady',
+    }
+
+
+@pytest.mark.asyncio
+async def test_reviews_without_tests_do_not_skew_the_pass_rate(store):
+    """Missing pass rates are skipped by the aggregates and by the window."""
+    await _review(store, _report(1, 50, passed=1, total=2), _report(2, 50), _report(3, 50, passed=2, total=2),
+                  _report(4, 50), _report(5, 50))
+
+    trends = await store.trends(APP, "alice")
+    assert trends['pass_rate']['moving_average'] == 100.0
+    assert trends['pass_rate']['ema'] == 75.0
+    assert trends['pass_rate']['direction'] is None
+
+
+@pytest.mark.asyncio
+async def test_trend_direction(store):
+    """Directions follow the slope of the last window of values and need three of them."""
+    await _review(store, *(_report(day, score) for day, score in enumerate([90, 50, 60, 70, 80], start=1)))
+    await _review(store, *(_report(day, 80, critical_types=[f'bug{i}' for i in range(count)])
+                           for day, count in enumerate([3, 2], start=1)), user_id="bob")
+
+    assert (await store.trends(APP, "alice"))['style_score']['direction'] == 'rising'
+    assert (await store.trends(APP, "bob"))['critical_issues']['direction'] is None
+    await _review(store, _report(3, 80, critical_types=['bug0']), user_id="bob")
+    bob = await store.trends(APP, "bob")
+    assert bob['style_score']['direction'] == 'steady'
+    assert bob['critical_issues']['direction'] == 'falling'
+
+
+@pytest.mark.asyncio
+async def test_recurring_and_resolved_issues(store):
+    """Codes seen repeatedly are recurring while in the window and resolved once they leave it."""
+    await _review(store,
+                  _report(1, 70, style_codes=['E501']),
+                  _report(2, 70, style_codes=['E501'], critical_types=['index_error']),
+                  _report(3, 80),
+                  _report(4, 80, style_codes=['W291'], critical_types=['index_error']),
+                  _report(5, 90, style_codes=['W291', 'C0103']))
+
+    trends = await store.trends(APP, "alice")
+    assert trends['recurring_style_codes'] == ['W291']
+    assert trends['resolved_style_codes'] == ['E501']
+    assert trends['recurring_critical_issue_types'] == ['index_error']
+    assert trends['resolved_critical_issue_types'] == []
+
+
+@pytest.mark.asyncio
+async def test_series_are_per_user(store):
+    """Each user only sees their own reviews."""
+    await _review(store, _report(1, 60), _report(2, 70))
+    await _review(store, _report(1, 10), user_id="bob")
+
+    assert await store.series(APP, "alice", 'style_score', 5) == [60, 70]
+    assert await store.series(APP, "bob", 'style_score', 5) == [10]
+    assert await store.trends(APP, "carol") == {'reviews': 0}
+
+
+@pytest.mark.asyncio
+async def test_disk_series_are_shared_between_instances(tmp_path):
+    """A second store on the same directory continues the same series."""
+    root_dir = str(tmp_path / "analytics")
+    first = ProgressAnalyticsStore(root_dir=root_dir, window=3, ema_alpha=0.5)
+    await _review(first, _report(1, 0), _report(2, 40))
+    second = ProgressAnalyticsStore(root_dir=root_dir, window=3, ema_alpha=0.5)
+    await _review(second, _report(3, 80), _report(4, 40))
+
+    trends = await first.trends(APP, "alice")
+    assert trends['reviews'] == 4
+    assert trends['style_score']['moving_average'] == 53.3
+    assert await second.series(APP, "alice", 'style_score', 10) == [0, 40, 80, 40]
+
+
+@pytest.mark.asyncio
+async def test_memory_store_keeps_only_recent_points():
+    """The in-memory series is trimmed while the aggregates keep counting."""
+    store = ProgressAnalyticsStore(window=2, memory_max_points=3)
+    await _review(store, *(_report(day, day * 10) for day in range(1, 7)))
+
+    assert await store.series(APP, "alice", 'style_score', 10) == [40, 50, 60]
+    trends = await store.trends(APP, "alice")
+    assert trends['reviews'] == 6
+    assert trends['style_score']['moving_average'] == 55.0
+    assert trends['style_score']['min'] == 10
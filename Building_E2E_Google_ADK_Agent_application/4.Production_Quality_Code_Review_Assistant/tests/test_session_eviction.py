@@ -0,0 +1,123 @@
+"""
+Unit tests for the bounded in-memory session service.
+"""
+
+import pytest
+from google.adk.events import Event
+from google.genai.types import Content, Part
+
+from code_review_assistant import session_eviction
+from code_review_assistant.session_eviction import BoundedInMemorySessionService
+
+APP = "test_app"
+
+
+class FakeClock:
+    """Replaces time.monotonic in session_eviction."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_eviction.time, "monotonic", fake.monotonic)
+    return fake
+
+
+async def _create(service, session_id, user_id="user"):
+    return await service.create_session(app_name=APP, user_id=user_id, session_id=session_id)
+
+
+def _exists(service, session_id, user_id="user"):
+    return session_id in service.sessions.get(APP, {}).get(user_id, {})
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_expire_after_ttl(clock):
+    """Sessions idle longer than the TTL are evicted on the next access."""
+    service = BoundedInMemorySessionService(ttl_seconds=60)
+    await _create(service, "old")
+    clock.now += 30
+    await _create(service, "recent")
+    clock.now += 45
+
+    await _create(service, "new")
+    assert not _exists(service, "old")
+    assert _exists(service, "recent")
+    assert service.eviction_stats()['evicted_ttl'] == 1
+
+
+@pytest.mark.asyncio
+async def test_reading_a_session_keeps_it_alive(clock):
+    """Reading a session refreshes its TTL and is never evicted by the read itself."""
+    service = BoundedInMemorySessionService(ttl_seconds=60)
+    await _create(service, "s1")
+    clock.now += 100
+
+    session = await service.get_session(app_name=APP, user_id="user", session_id="s1")
+    assert session is not None
+    assert service.eviction_stats()['evicted_ttl'] == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_session_is_evicted():
+    """Beyond max_sessions the session used longest ago goes first."""
+    service = BoundedInMemorySessionService(max_sessions=2)
+    await _create(service, "s1")
+    await _create(service, "s2")
+    await service.get_session(app_name=APP, user_id="user", session_id="s1")
+
+    await _create(service, "s3")
+    assert _exists(service, "s1")
+    assert not _exists(service, "s2")
+    assert _exists(service, "s3")
+    assert service.eviction_stats()['evicted_lru'] == 1
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_older_sessions():
+    """Events count towards the budget; the active session is always kept."""
+    service = BoundedInMemorySessionService(max_bytes=3000)
+    first = await _create(service, "s1")
+    second = await _create(service, "s2")
+    event = Event(author="user", content=Content(role="user", parts=[Part(text="x" * 2000)]))
+
+    await service.append_event(first, event)
+    assert service.session_size(APP, "user", "s1") > 2000
+
+    await service.append_event(second, event.model_copy(update={'id': Event.new_id()}))
+    assert not _exists(service, "s1")
+    assert _exists(service, "s2")
+    stats = service.eviction_stats()
+    assert stats['sessions'] == 1
+    assert stats['total_bytes'] == service.session_size(APP, "user", "s2")
+
+
+@pytest.mark.asyncio
+async def test_partial_events_are_not_counted():
+    """Streaming chunks are not stored, so they do not grow the session."""
+    service = BoundedInMemorySessionService(max_bytes=10_000)
+    session = await _create(service, "s1")
+    size = service.session_size(APP, "user", "s1")
+
+    partial = Event(author="agent", partial=True, content=Content(role="model", parts=[Part(text="chunk")]))
+    await service.append_event(session, partial)
+    assert service.session_size(APP, "user", "s1") == size
+
+
+@pytest.mark.asyncio
+async def test_delete_is_not_counted_as_eviction():
+    """Deleting a session frees its budget without touching the eviction counters."""
+    service = BoundedInMemorySessionService(max_sessions=5)
+    await _create(service, "s1")
+    await service.delete_session(app_name=APP, user_id="user", session_id="s1")
+
+    stats = service.eviction_stats()
+    assert stats['sessions'] == 0
+    assert stats['total_bytes'] == 0
+    assert stats['evicted_lru'] == 0 and stats['evicted_ttl'] == 0
@@ -0,0 +1,137 @@
+"""
+Unit tests for the near-duplicate submission index.
+"""
+
+import pytest
+
+from code_review_assistant.similarity_index import SimilarityIndex, normalize_tokens
+
+CODE = """
+def dfs_search(graph, start, target):
+    visited = set()
+    stack = [start]
+    while stack:
+        current = stack.pop()
+        if current == target:
+            return True
+        if current not in visited:
+            visited.add(current)
+            for neighbor in graph.get(current, []):
+                if neighbor not in visited:
+                    stack.append(neighbor)
+    return False
+"""
+
+# Same program with renamed variables, a comment and different formatting
+RENAMED = """
+def find_path(g, source, goal):
+    # Iterative depth-first search
+    seen = set()
+    todo = [source]
+    while todo:
+        node = todo.pop()
+        if node == goal:
+            return True
+        if node not in seen:
+            seen.add(node)
+            for nxt in g.get(node, []):
+                if nxt not in seen:
+                    todo.append(nxt)
+    return False
+"""
+
+# One extra statement
+EDITED = CODE.replace("            visited.add(current)\n",
+                      "            visited.add(current)\n            print(current)\n")
+
+UNRELATED = """
+class Inventory:
+    def __init__(self):
+        self.items = {}
+
+    def add(self, name, count):
+        self.items[name] = self.items.get(name, 0) + count
+
+    def report(self):
+        return ", ".join(f"{k}: {v}" for k, v in sorted(self.items.items()))
+"""
+
+RECORD = {'test_suite': 'def test_x(): pass', 'feedback': 'Looks good'}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SimilarityIndex(path=str(tmp_path / "index.json"), max_entries=3,
+                           num_perm=128, bands=32, shingle_size=5)
+
+
+def test_normalization_ignores_names_literals_and_comments():
+    """Renaming, comments and changed constants do not change the token stream."""
+    assert normalize_tokens(CODE) == normalize_tokens(RENAMED)
+    assert normalize_tokens("x = 1  # one") == normalize_tokens("limit = 42")
+
+
+def test_renamed_code_is_an_exact_structural_match(index):
+    """Renamed code is found with similarity 1.0 but is not the same AST."""
+    index.add("app", "alice", CODE, RECORD)
+    match = index.find("app", "alice", RENAMED, 0.85)
+    assert match['similarity'] == 1.0
+    assert match['feedback'] == 'Looks good'
+    assert not match['exact']
+
+
+def test_reformatted_code_is_exact(index):
+    """Comment and formatting changes keep the same AST."""
+    index.add("app", "alice", CODE, RECORD)
+    assert index.find("app", "alice", "# header\n" + CODE, 0.85)['exact']
+
+
+def test_small_edit_is_recalled(index):
+    """LSH finds a submission that differs by one statement."""
+    index.add("app", "alice", CODE, RECORD)
+    match = index.find("app", "alice", EDITED, 0.7)
+    assert match is not None
+    assert 0.7 <= match['similarity'] < 1.0
+
+
+def test_unrelated_code_is_not_matched(index):
+    """Different programs stay below the threshold."""
+    index.add("app", "alice", CODE, RECORD)
+    assert index.find("app", "alice", UNRELATED, 0.85) is None
+
+
+def test_entries_are_scoped_to_app_and_user(index):
+    """Personalized reviews never match another user's or app's submissions."""
+    index.add("app", "alice", CODE, RECORD)
+    assert index.find("app", "bob", CODE, 0.85) is None
+    assert index.find("other_app", "alice", CODE, 0.85) is None
+
+
+def test_least_recently_used_entry_is_evicted(index):
+    """Beyond max_entries the entry that was used longest ago is dropped."""
+    programs = [CODE, UNRELATED, "def add(a, b):\n    return a + b\n"]
+    for code in programs:
+        index.add("app", "alice", code, RECORD)
+    # Using the oldest entry makes UNRELATED the least recently used
+    assert index.find("app", "alice", CODE, 0.85) is not None
+
+    index.add("app", "alice", "while True:\n    break\n", RECORD)
+    assert len(index) == 3
+    assert index.find("app", "alice", UNRELATED, 0.85) is None
+    assert index.find("app", "alice", CODE, 0.85) is not None
+
+
+def test_index_is_persisted(index, tmp_path):
+    """A new instance loads the entries written by an earlier one."""
+    index.add("app", "alice", CODE, RECORD)
+    reloaded = SimilarityIndex(path=str(tmp_path / "index.json"), max_entries=3,
+                               num_perm=128, bands=32, shingle_size=5)
+    assert reloaded.find("app", "alice", CODE, 0.85)['exact']
+
+
+def test_changed_settings_discard_stored_entries(index, tmp_path):
+    """Signatures from different settings are not comparable."""
+    index.add("app", "alice", CODE, RECORD)
+    reloaded = SimilarityIndex(path=str(tmp_path / "index.json"), max_entries=3,
+                               num_perm=64, bands=16, shingle_size=5)
+    assert len(reloaded) == 0
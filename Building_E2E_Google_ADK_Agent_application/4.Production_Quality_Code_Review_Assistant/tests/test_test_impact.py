@@ -0,0 +1,147 @@
+"""
+Unit tests for test-impact analysis and selective fix test runs.
+"""
+
+from types import SimpleNamespace
+
+from code_review_assistant.constants import StateKeys
+from code_review_assistant.test_impact import (
+    MODULE_LEVEL,
+    build_test_impact_map,
+    changed_symbols,
+    expand_to_dependents,
+    filter_suite,
+    function_fingerprints,
+    merge_carried_results,
+    normalize_test_name,
+    select_tests,
+)
+from code_review_assistant.tools import prepare_fix_test_module
+
+CODE = """
+LIMIT = 10
+
+def clamp(x):
+    return min(x, LIMIT)
+
+def total(values):
+    return sum(clamp(v) for v in values)
+
+def greet(name):
+    return f"hi {name}"
+"""
+
+SUITE = """
+import unittest
+
+def make_values():
+    return [1, 20]
+
+def test_total():
+    assert total(make_values()) == 11
+
+def test_greet():
+    assert greet("a") == "hi a"
+
+class TestClamp(unittest.TestCase):
+    def test_clamp(self):
+        self.assertEqual(clamp(50), 10)
+"""
+
+
+def test_impact_map_follows_suite_helpers():
+    """References through suite helpers and TestCase methods are resolved."""
+    impact_map = build_test_impact_map(SUITE, set(function_fingerprints(CODE)))
+    assert impact_map == {
+        'test_total': ['total'],
+        'test_greet': ['greet'],
+        'TestClamp.test_clamp': ['clamp'],
+    }
+
+
+def test_changed_function_selects_its_dependents_tests():
+    """A changed helper reruns the tests of every function that calls it."""
+    fixed = CODE.replace("min(x, LIMIT)", "max(min(x, LIMIT), 0)")
+    changed = changed_symbols(function_fingerprints(CODE), function_fingerprints(fixed))
+    assert changed == {'clamp'}
+
+    affected = expand_to_dependents(fixed, changed)
+    assert affected == {'clamp', 'total'}
+
+    impact_map = build_test_impact_map(SUITE, set(function_fingerprints(CODE)))
+    assert select_tests(impact_map, affected) == ['test_total', 'TestClamp.test_clamp']
+
+
+def test_formatting_changes_are_not_changes():
+    """Comments and whitespace do not change fingerprints."""
+    reformatted = CODE.replace("def greet(name):", "# Greeting\ndef greet( name ):")
+    assert changed_symbols(function_fingerprints(CODE), function_fingerprints(reformatted)) == set()
+
+
+def test_module_level_changes_are_detected():
+    """A changed constant is reported under the module-level key."""
+    fixed = CODE.replace("LIMIT = 10", "LIMIT = 5")
+    assert changed_symbols(function_fingerprints(CODE), function_fingerprints(fixed)) == {MODULE_LEVEL}
+
+
+def test_tests_without_references_are_always_selected():
+    """Tests whose dependencies are unknown always rerun."""
+    assert select_tests({'test_a': [], 'test_b': ['f']}, {'g'}) == ['test_a']
+
+
+def test_filter_suite_keeps_selected_tests():
+    """Unselected tests and their top-level calls are removed."""
+    suite = "def test_a():\n    pass\n\ndef test_b():\n    pass\n\ntest_a()\ntest_b()\n"
+    filtered = filter_suite(suite, ['test_b'])
+    assert 'def test_b' in filtered and 'test_b()' in filtered
+    assert 'test_a' not in filtered
+
+
+def test_filter_suite_refuses_when_a_removed_test_is_still_referenced():
+    """A suite that still uses a removed test must run in full."""
+    suite = "def test_a():\n    pass\n\ndef test_b():\n    test_a()\n"
+    assert filter_suite(suite, ['test_b']) is None
+
+
+def test_normalize_test_name_accepts_runner_formats():
+    """Names reported by different runners reduce to the bare test name."""
+    for name in ('test_x', 'TestK.test_x', 'module.TestK.test_x', 'test_x (module.TestK)', ' test_x() '):
+        assert normalize_test_name(name) == 'test_x'
+
+
+def test_carried_failures_stay_failing():
+    """Skipped tests keep their previous outcome, whatever form the names take."""
+    summary = {'passed': 1, 'failed': 0, 'total': 1, 'still_failing_tests': []}
+    merged = merge_carried_results(summary, ['TestClamp.test_clamp', 'test_greet'],
+                                   ['test_clamp (suite.TestClamp)'])
+    assert merged['passed'] == 2
+    assert merged['failed'] == 1
+    assert merged['total'] == 3
+    assert merged['still_failing_tests'] == ['TestClamp.test_clamp']
+
+
+def _fix_context(code_fixes: str, previous_code: str) -> SimpleNamespace:
+    return SimpleNamespace(state={
+        StateKeys.TEST_SUITE_CODE: SUITE,
+        StateKeys.TESTED_FUNCTIONS: ['clamp', 'total', 'greet'],
+        StateKeys.TEST_IMPACT_MAP: build_test_impact_map(SUITE, set(function_fingerprints(CODE))),
+        StateKeys.CODE_FIXES: code_fixes,
+        StateKeys.TEMP_FIX_FUNCTION_FINGERPRINTS: function_fingerprints(previous_code),
+        StateKeys.FIX_TEST_EXECUTION_SUMMARY: {'still_failing_tests': []},
+    })
+
+
+def test_fix_iteration_runs_only_impacted_tests():
+    """A fix to one function reruns only the tests that exercise it."""
+    tool_context = _fix_context(CODE.replace('f"hi {name}"', 'f"hello {name}"'), CODE)
+    result = prepare_fix_test_module(tool_context)
+    assert result['selection']['mode'] == 'selected'
+    assert result['selection']['selected'] == ['test_greet']
+
+
+def test_fix_iteration_with_module_level_change_runs_full_suite():
+    """A changed constant can affect any test, so nothing is carried over."""
+    tool_context = _fix_context(CODE.replace("LIMIT = 10", "LIMIT = 5"), CODE)
+    result = prepare_fix_test_module(tool_context)
+    assert result['selection']['mode'] == 'full'
+    assert result['selection']['skipped'] == []
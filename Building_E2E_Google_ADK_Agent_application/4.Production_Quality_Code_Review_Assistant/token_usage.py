@@ -0,0 +1,162 @@
+"""
+Token and cost accounting for the Code Review Assistant.
+
+Usage metadata of every model response is recorded per stage (sub-agent):
+aggregated per invocation in temp state, so grading and fix reports can
+include it, and added to rolling daily counters in the counter store, per
+app and stage and per user, for the usage report CLI (usage_report.py).
+
+Costs are estimates from the per-million-token prices in AgentConfig;
+thinking tokens are billed as output.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from .config import config
+from .constants import StateKeys
+from .services import get_counter_store
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+USAGE_METRICS = ('calls', 'prompt_tokens', 'output_tokens', 'cached_tokens', 'total_tokens', 'cost_usd')
+
+# Metrics kept in the per-user daily counters
+USER_USAGE_METRICS = ('calls', 'total_tokens', 'cost_usd')
+
+COUNTER_PREFIX = "usage"
+
+# Requested models waiting for their response; bounded in case a call is cancelled
+_MAX_PENDING_REQUESTS = 10000
+_pending_lock = threading.Lock()
+_pending_models: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+
+def usage_counter_key(day: str, metric: str, stage: Optional[str] = None) -> str:
+    """Counter key of a daily usage metric, per stage for app-scoped counters."""
+    if stage is None:
+        return f"{COUNTER_PREFIX}:{day}:{metric}"
+    return f"{COUNTER_PREFIX}:{day}:{stage}:{metric}"
+
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """Return the (input, output) price per million tokens of a configured model."""
+    if model == config.worker_model:
+        return config.worker_input_cost_per_million, config.worker_output_cost_per_million
+    if model == config.critic_model:
+        return config.critic_input_cost_per_million, config.critic_output_cost_per_million
+    logger.debug(f"No token prices configured for model {model}")
+    return 0.0, 0.0
+
+
+def usage_from_response(llm_response: LlmResponse, model: str) -> Optional[Dict[str, float]]:
+    """Convert the usage metadata of a model response into usage metrics."""
+    metadata = llm_response.usage_metadata
+    if metadata is None:
+        return None
+
+    prompt_tokens = metadata.prompt_token_count or 0
+    output_tokens = (metadata.candidates_token_count or 0) + (metadata.thoughts_token_count or 0)
+    input_price, output_price = model_prices(model)
+    return {
+        'calls': 1,
+        'prompt_tokens': prompt_tokens,
+        'output_tokens': output_tokens,
+        'cached_tokens': metadata.cached_content_token_count or 0,
+        'total_tokens': metadata.total_token_count or prompt_tokens + output_tokens,
+        'cost_usd': (prompt_tokens * input_price + output_tokens * output_price) / 1_000_000
+    }
+
+
+def add_usage(total: Optional[Dict[str, float]], usage: Dict[str, float]) -> Dict[str, float]:
+    """Return the sum of two usage dicts."""
+    total = total or {}
+    return {metric: (total.get(metric) or 0) + (usage.get(metric) or 0) for metric in USAGE_METRICS}
+
+
+def track_model_request(callback_context: CallbackContext,
+                        llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback that remembers the (possibly routed) model of the request."""
+    if config.token_accounting_enabled:
+        with _pending_lock:
+            _pending_models[(callback_context.invocation_id, callback_context.agent_name)] = llm_request.model
+            while len(_pending_models) > _MAX_PENDING_REQUESTS:
+                _pending_models.popitem(last=False)
+    return None
+
+
+def _requested_model(callback_context: CallbackContext) -> str:
+    with _pending_lock:
+        model = _pending_models.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if model:
+        return model
+
+    # Agents without track_model_request use their configured model
+    agent_model = getattr(callback_context._invocation_context.agent, 'model', '')
+    return agent_model if isinstance(agent_model, str) else getattr(agent_model, 'model', '')
+
+
+async def _add_to_counters(callback_context: CallbackContext, stage: str, usage: Dict[str, float]) -> None:
+    invocation = callback_context._invocation_context
+    store = get_counter_store(invocation.session_service)
+    if store is None:
+        # Vertex AI sessions have no counter store; usage is still kept per invocation
+        return
+
+    day = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    await store.increment_many(invocation.app_name, None, {
+        usage_counter_key(day, metric, stage): usage[metric] for metric in USAGE_METRICS
+    })
+    await store.increment_many(invocation.app_name, invocation.user_id, {
+        usage_counter_key(day, metric): usage[metric] for metric in USER_USAGE_METRICS
+    })
+
+
+async def record_model_usage(callback_context: CallbackContext,
+                             llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback that records token usage and cost of the stage's model call."""
+    # Streaming chunks are followed by an aggregated response carrying the final usage
+    if not config.token_accounting_enabled or llm_response.partial:
+        return None
+
+    model = _requested_model(callback_context)
+    usage = usage_from_response(llm_response, model)
+    if usage is None:
+        return None
+
+    stage = callback_context.agent_name
+    totals = dict(callback_context.state.get(StateKeys.TEMP_TOKEN_USAGE) or {})
+    stages = dict(totals.get('stages') or {})
+    stages[stage] = {**add_usage(stages.get(stage), usage), 'model': model}
+    totals['stages'] = stages
+    totals['total'] = add_usage(totals.get('total'), usage)
+    callback_context.state[StateKeys.TEMP_TOKEN_USAGE] = totals
+
+    logger.info(f"Usage: {stage} ({model}) used {usage['prompt_tokens']} prompt + "
+                f"{usage['output_tokens']} output tokens, ~${usage['cost_usd']:.4f}")
+
+    try:
+        await _add_to_counters(callback_context, stage, usage)
+    except Exception as e:
+        logger.warning(f"Usage: could not update usage counters: {e}")
+    return None
+
+
+# Module exports
+__all__ = [
+    'USAGE_METRICS',
+    'USER_USAGE_METRICS',
+    'usage_counter_key',
+    'model_prices',
+    'usage_from_response',
+    'add_usage',
+    'track_model_request',
+    'record_model_usage',
+]
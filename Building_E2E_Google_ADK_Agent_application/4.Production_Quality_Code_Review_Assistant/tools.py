@@ -9,22 +9,132 @@ import ast
 import asyncio
 import hashlib
 import json
+import keyword
 import os
 import pycodestyle
+import re
 import tempfile
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 from google.genai import types
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools import ToolContext
 
+from .analysis_tiers import analyze_submission
+from .autofix import autofix_style
+from .config import config
 from .constants import StateKeys
+from .feedback_history import (
+    append_review,
+    compact_report,
+    history_feedback,
+    history_patterns,
+    load_history,
+    summarize_review,
+)
+from .local_memory import LocalMemoryService
+from .progress_analytics import review_point
+from .services import get_analytics_store, get_counter_store
+from .similarity_index import similarity_index
+from .test_impact import (
+    MODULE_LEVEL,
+    build_test_impact_map,
+    changed_symbols,
+    expand_to_dependents,
+    filter_suite,
+    function_fingerprints,
+    merge_carried_results,
+    select_tests,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Matches ``` or ```python fenced blocks in a user message
+_FENCED_BLOCK_RE = re.compile(r"```[ \t]*(?:python|py|python3)?[ \t]*\n(.*?)```", re.DOTALL | re.IGNORECASE)
+
+# Tokens that mark a line of a raw message as possible code: indentation, brackets,
+# assignment, a leading string, comment or decorator, or a leading statement keyword
+_CODE_TOKEN_RE = re.compile(
+    r"^\s|[=()\[\]{}]|^[\"'#@]|^(?:" + "|".join(k for k in keyword.kwlist if k.islower()) + r")\b"
+)
+
+
+def tool_context_from_callback(callback_context: CallbackContext) -> ToolContext:
+    """
+    Wraps a callback context so tool functions can be called directly from code.
+
+    State changes made by the tools are recorded in the callback's own event actions.
+    """
+    return ToolContext(
+        callback_context._invocation_context,
+        event_actions=callback_context._event_actions
+    )
+
+
+def _is_prose_line(line: str) -> bool:
+    """True for a line that has no code tokens and is not a valid statement on its own."""
+    if _CODE_TOKEN_RE.search(line):
+        return False
+    try:
+        ast.parse(line.strip())
+        return False
+    except (SyntaxError, ValueError):
+        return True
+
+
+def extract_code_from_message(text: str) -> str:
+    """
+    Extracts the submitted Python code from a user message without a model.
+
+    Fenced code blocks are preferred (the largest one wins). Otherwise the
+    message is treated as raw code: as is when it parses, else without the
+    leading and trailing lines that are clearly prose. Trailing lines are only
+    dropped when the rest then parses, and everything from the first line that
+    may be code is kept, so the analyzer reports syntax errors where they are.
+
+    Args:
+        text: Full text of the user message
+
+    Returns:
+        The extracted code, or an empty string if the message is empty
+    """
+    if not text or not text.strip():
+        return ""
+
+    blocks = [block.strip('\n') for block in _FENCED_BLOCK_RE.findall(text)]
+    blocks = [block for block in blocks if block.strip()]
+    if blocks:
+        return max(blocks, key=len)
+
+    code = text.strip('\n')
+    try:
+        ast.parse(code)
+        return code
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        pass
+
+    lines = code.splitlines()
+    start = 0
+    while start < len(lines) and (not lines[start].strip() or _is_prose_line(lines[start])):
+        start += 1
+    if start == len(lines):
+        # Nothing looks like code - analyze the message as is
+        return code
+    end = len(lines)
+    while end > start and (not lines[end - 1].strip() or _is_prose_line(lines[end - 1])):
+        end -= 1
+
+    trimmed = "\n".join(lines[start:end])
+    try:
+        ast.parse(trimmed)
+        return trimmed
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # Trailing lines may be broken code rather than prose - keep them
+        return "\n".join(lines[start:])
+
 
 async def analyze_code_structure(code: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
@@ -50,26 +160,40 @@ async def analyze_code_structure(code: str, tool_context: ToolContext) -> Dict[s
                 "message": "No code provided or invalid input"
             }
 
-        # Parse in thread pool to avoid blocking the event loop
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            tree = await loop.run_in_executor(executor, ast.parse, code)
+        # Parse inline, in a worker process or in an isolated subprocess
+        # depending on the size and shape of the submission
+        result = await analyze_submission(code)
 
-                    # Extract comprehensive structural information
-            analysis = await loop.run_in_executor(
-                executor, _extract_code_structure, tree, code
-            )
+        if result['status'] == 'too_large':
+            metrics = result['partial_metrics']
+            error_msg = (f"Code is too large or complex for full analysis ({result['reason']}); "
+                         f"only partial metrics are available")
+            logger.warning(f"Tool: {error_msg}")
+            tool_context.state[StateKeys.CODE_TO_REVIEW] = code
+            tool_context.state[StateKeys.CODE_ANALYSIS] = {'metrics': metrics, 'too_large': result['reason']}
+            tool_context.state[StateKeys.CODE_LINE_COUNT] = metrics['line_count']
+
+            return {
+                "status": "error",
+                "error_type": "too_large",
+                "message": error_msg,
+                "tier": result['tier'],
+                "partial_metrics": metrics
+            }
 
         # Store code and analysis for other agents to access
+        analysis = result['analysis']
         tool_context.state[StateKeys.CODE_TO_REVIEW] = code
         tool_context.state[StateKeys.CODE_ANALYSIS] = analysis
         tool_context.state[StateKeys.CODE_LINE_COUNT] = len(code.splitlines())
 
-        logger.info(f"Tool: Analysis complete - {analysis['metrics']['function_count']} functions, "
+        logger.info(f"Tool: Analysis complete ({result['tier']}) - "
+                    f"{analysis['metrics']['function_count']} functions, "
                     f"{analysis['metrics']['class_count']} classes")
 
         return {
             "status": "success",
+            "tier": result['tier'],
             "analysis": analysis,
             "summary": f"Found {analysis['metrics']['function_count']} functions and "
                        f"{analysis['metrics']['class_count']} classes"
@@ -99,95 +223,6 @@ async def analyze_code_structure(code: str, tool_context: ToolContext) -> Dict[s
         }
 
 
-def _extract_code_structure(tree: ast.AST, code: str) -> Dict[str, Any]:
-    """
-    Helper function to extract structural information from AST.
-    Runs in thread pool for CPU-bound work.
-    """
-    functions = []
-    classes = []
-    imports = []
-    docstrings = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            func_info = {
-                'name': node.name,
-                'args': [arg.arg for arg in node.args.args],
-                'lineno': node.lineno,
-                'has_docstring': ast.get_docstring(node) is not None,
-                'is_async': isinstance(node, ast.AsyncFunctionDef),
-                'decorators': [d.id for d in node.decorator_list
-                               if isinstance(d, ast.Name)]
-            }
-            functions.append(func_info)
-
-            if func_info['has_docstring']:
-                docstrings.append(f"{node.name}: {ast.get_docstring(node)[:50]}...")
-
-        elif isinstance(node, ast.ClassDef):
-            methods = []
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef):
-                    methods.append(item.name)
-
-            class_info = {
-                'name': node.name,
-                'lineno': node.lineno,
-                'methods': methods,
-                'has_docstring': ast.get_docstring(node) is not None,
-                'base_classes': [base.id for base in node.bases
-                                 if isinstance(base, ast.Name)]
-            }
-            classes.append(class_info)
-
-        elif isinstance(node, ast.Import):
-            for alias in node.names:
-                imports.append({
-                    'module': alias.name,
-                    'alias': alias.asname,
-                    'type': 'import'
-                })
-        elif isinstance(node, ast.ImportFrom):
-            imports.append({
-                'module': node.module or '',
-                'names': [alias.name for alias in node.names],
-                'type': 'from_import',
-                'level': node.level
-            })
-
-    return {
-        'functions': functions,
-        'classes': classes,
-        'imports': imports,
-        'docstrings': docstrings,
-        'metrics': {
-            'line_count': len(code.splitlines()),
-            'function_count': len(functions),
-            'class_count': len(classes),
-            'import_count': len(imports),
-            'has_main': any(f['name'] == 'main' for f in functions),
-            'has_if_main': '__main__' in code,
-            'avg_function_length': _calculate_avg_function_length(tree)
-        }
-    }
-
-
-def _calculate_avg_function_length(tree: ast.AST) -> float:
-    """Calculate average function length in lines."""
-    function_lengths = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            if hasattr(node, 'end_lineno') and hasattr(node, 'lineno'):
-                length = node.end_lineno - node.lineno + 1
-                function_lengths.append(length)
-
-    if function_lengths:
-        return sum(function_lengths) / len(function_lengths)
-    return 0.0
-
-
 async def check_code_style(code: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
     Checks code style compliance using pycodestyle (PEP 8).
@@ -211,12 +246,19 @@ async def check_code_style(code: str, tool_context: ToolContext) -> Dict[str, An
                     "message": "No code provided or found in state"
                 }
 
-        # Run style check in thread pool
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            result = await loop.run_in_executor(
-                executor, _perform_style_check, code
-            )
+        too_large = (tool_context.state.get(StateKeys.CODE_ANALYSIS) or {}).get('too_large')
+        if too_large or len(code) > config.analysis_max_chars:
+            tool_context.state[StateKeys.STYLE_SCORE] = 0
+            tool_context.state[StateKeys.STYLE_ISSUES] = []
+            return {
+                "status": "error",
+                "error_type": "too_large",
+                "message": f"Code is too large or complex for a style check ({too_large or 'size limit'})",
+                "score": 0
+            }
+
+        # Run style check in a worker thread
+        result = await asyncio.to_thread(_perform_style_check, code)
 
         # Store results in state
         tool_context.state[StateKeys.STYLE_SCORE] = result['score']
@@ -367,6 +409,53 @@ def _calculate_style_score(issues: List[Dict[str, Any]]) -> int:
     return max(0, 100 - min(total_deduction, 100))
 
 
+async def autofix_code_style(code: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Fixes mechanical whitespace and blank line style issues without a model.
+
+    Args:
+        code: Python source code to fix
+        tool_context: ADK tool context
+
+    Returns:
+        Dictionary with the fixed code, what was fixed, and the remaining style issues
+    """
+    logger.info("Tool: Auto-fixing mechanical style issues...")
+
+    try:
+        result = await asyncio.to_thread(autofix_style, code)
+        remaining = await asyncio.to_thread(_perform_style_check, result['code'])
+
+        logger.info(f"Tool: Auto-fixed {result['fixed_count']} issues, "
+                    f"style score now {remaining['score']}/100")
+
+        return {
+            "status": result['status'],
+            "code": result['code'],
+            "fixed": result['fixed'],
+            "fixed_count": result['fixed_count'],
+            "remaining_score": remaining['score'],
+            "remaining_issue_count": remaining['issue_count'],
+            "remaining_issues": remaining['issues']
+        }
+
+    except Exception as e:
+        logger.error(f"Tool: Auto-fix failed: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "message": str(e),
+            "code": code
+        }
+
+
+def _memory_text(memory: Any) -> str:
+    """Return the text of a memory entry, whose content is a list of parts."""
+    content = getattr(memory, 'content', None)
+    if content is not None and content.parts:
+        return "\n".join(part.text for part in content.parts if part.text)
+    return memory.text if hasattr(memory, 'text') else str(memory)
+
+
 async def search_past_feedback(developer_id: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
     Search for past feedback in memory service.
@@ -407,7 +496,7 @@ async def search_past_feedback(developer_id: str, tool_context: ToolContext) ->
 
                     if search_result and hasattr(search_result, 'memories'):
                         for memory in search_result.memories[:5]:
-                            memory_text = memory.text if hasattr(memory, 'text') else str(memory)
+                            memory_text = _memory_text(memory)
                             all_feedback.append(memory_text)
 
                             # Extract patterns
@@ -435,16 +524,19 @@ async def search_past_feedback(developer_id: str, tool_context: ToolContext) ->
             except Exception as e:
                 logger.warning(f"Tool: Memory search error: {e}")
 
-        # Fallback: Check state for cached feedback
-        cached_feedback = tool_context.state.get(StateKeys.USER_PAST_FEEDBACK_CACHE, [])
+        # Fallback: Check the bounded per-user history in state
+        history = load_history(tool_context.state.get(StateKeys.USER_PAST_FEEDBACK_CACHE))
+        cached_feedback = history_feedback(history)
         if cached_feedback:
+            patterns = history_patterns(history)
             tool_context.state[StateKeys.PAST_FEEDBACK] = cached_feedback
+            tool_context.state[StateKeys.FEEDBACK_PATTERNS] = patterns
             return {
                 "status": "success",
                 "feedback_found": True,
                 "count": len(cached_feedback),
                 "summary": "Using cached feedback",
-                "patterns": {}
+                "patterns": patterns
             }
 
         # No feedback found
@@ -471,6 +563,56 @@ async def search_past_feedback(developer_id: str, tool_context: ToolContext) ->
         }
 
 
+async def _update_user_counters(tool_context: ToolContext, style_score: float,
+                                state_updates: Dict[str, Any]) -> Tuple[int, float]:
+    """
+    Counts the submission and reads the previous style score for the user.
+
+    With a counter store the updates are single atomic statements and user state
+    is not rewritten; otherwise they fall back to read-modify-write on state.
+
+    Returns:
+        (lifetime submissions including this one, previous style score)
+    """
+    store = get_counter_store(tool_context._invocation_context.session_service)
+    if store is None:
+        lifetime_submissions = tool_context.state.get(StateKeys.USER_TOTAL_SUBMISSIONS, 0) + 1
+        state_updates[StateKeys.USER_TOTAL_SUBMISSIONS] = lifetime_submissions
+        return lifetime_submissions, tool_context.state.get(StateKeys.USER_LAST_STYLE_SCORE, 0)
+
+    invocation = tool_context._invocation_context
+    app_name, user_id = invocation.app_name, invocation.user_id
+
+    last_style_score = await store.get(app_name, user_id, StateKeys.USER_LAST_STYLE_SCORE)
+    if last_style_score is None:
+        # First use of the store - carry over values kept in state by earlier versions
+        last_style_score = tool_context.state.get(StateKeys.USER_LAST_STYLE_SCORE, 0)
+
+    carried_submissions = tool_context.state.get(StateKeys.USER_TOTAL_SUBMISSIONS, 0)
+    if carried_submissions:
+        # Seeded in one statement, so concurrent first reviews carry it over only once
+        await store.insert_if_absent(app_name, user_id, StateKeys.USER_TOTAL_SUBMISSIONS, carried_submissions)
+    lifetime_submissions = int(
+        await store.increment(app_name, user_id, StateKeys.USER_TOTAL_SUBMISSIONS, 1)
+    )
+    await store.maximum(app_name, user_id, StateKeys.USER_BEST_STYLE_SCORE, style_score)
+
+    return lifetime_submissions, last_style_score
+
+
+async def _write_user_metrics(tool_context: ToolContext, user_metrics: Dict[str, Any],
+                              state_updates: Dict[str, Any]) -> None:
+    """Store last-write user metrics in the counter store, or in state without one."""
+    store = get_counter_store(tool_context._invocation_context.session_service)
+    if store is None:
+        state_updates.update(user_metrics)
+        return
+
+    invocation = tool_context._invocation_context
+    for key, value in user_metrics.items():
+        await store.set(invocation.app_name, invocation.user_id, key, value)
+
+
 async def update_grading_progress(tool_context: ToolContext) -> Dict[str, Any]:
     """
     Updates grading progress counters and metrics in state.
@@ -491,18 +633,21 @@ async def update_grading_progress(tool_context: ToolContext) -> Dict[str, Any]:
         state_updates[StateKeys.GRADING_ATTEMPTS] = attempts
         state_updates[StateKeys.LAST_GRADING_TIME] = current_time
 
-        # User-level persistent state
-        lifetime_submissions = tool_context.state.get(StateKeys.USER_TOTAL_SUBMISSIONS, 0) + 1
-        state_updates[StateKeys.USER_TOTAL_SUBMISSIONS] = lifetime_submissions
-        state_updates[StateKeys.USER_LAST_SUBMISSION_TIME] = current_time
+        # User-level persistent metrics
+        current_style_score = tool_context.state.get(StateKeys.STYLE_SCORE, 0)
+        user_metrics = {
+            StateKeys.USER_LAST_SUBMISSION_TIME: current_time,
+            StateKeys.USER_LAST_STYLE_SCORE: current_style_score
+        }
+        lifetime_submissions, last_style_score = await _update_user_counters(
+            tool_context, current_style_score, state_updates
+        )
 
         # Calculate improvement metrics
-        current_style_score = tool_context.state.get(StateKeys.STYLE_SCORE, 0)
-        last_style_score = tool_context.state.get(StateKeys.USER_LAST_STYLE_SCORE, 0)
         score_improvement = current_style_score - last_style_score
-
-        state_updates[StateKeys.USER_LAST_STYLE_SCORE] = current_style_score
         state_updates[StateKeys.SCORE_IMPROVEMENT] = score_improvement
+        state_updates[StateKeys.TEMP_LIFETIME_SUBMISSIONS] = lifetime_submissions
+        state_updates[StateKeys.TEMP_PREVIOUS_STYLE_SCORE] = last_style_score
 
         # Track test results if available
         test_results = tool_context.state.get(StateKeys.TEST_EXECUTION_SUMMARY, {})
@@ -520,7 +665,9 @@ async def update_grading_progress(tool_context: ToolContext) -> Dict[str, Any]:
             passed = summary.get('tests_passed', 0)
             if total > 0:
                 pass_rate = (passed / total) * 100
-                state_updates[StateKeys.USER_LAST_TEST_PASS_RATE] = pass_rate
+                user_metrics[StateKeys.USER_LAST_TEST_PASS_RATE] = pass_rate
+
+        await _write_user_metrics(tool_context, user_metrics, state_updates)
 
         # Apply all updates atomically
         for key, value in state_updates.items():
@@ -551,6 +698,90 @@ async def update_grading_progress(tool_context: ToolContext) -> Dict[str, Any]:
         }
 
 
+async def load_progress_trends(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Loads the developer's rolling progress metrics into temp state for the feedback prompt.
+
+    Only the aggregates and the last few points of the metric series are read,
+    never the stored grading reports.
+    """
+    logger.info("Tool: Loading progress trends...")
+
+    try:
+        invocation = tool_context._invocation_context
+        trends = await get_analytics_store().trends(invocation.app_name, invocation.user_id)
+        tool_context.state[StateKeys.TEMP_PROGRESS_TRENDS] = trends
+
+        return {
+            "status": "success",
+            "trends": trends,
+            "summary": f"Trends over {trends['reviews']} past reviews"
+        }
+
+    except Exception as e:
+        error_msg = f"Progress trends error: {str(e)}"
+        logger.error(f"Tool: {error_msg}", exc_info=True)
+        tool_context.state[StateKeys.TEMP_PROGRESS_TRENDS] = {}
+
+        return {
+            "status": "error",
+            "message": error_msg
+        }
+
+
+async def _record_progress_point(report: Dict[str, Any], tool_context: ToolContext) -> None:
+    """Append the report's key metrics to the developer's progress series."""
+    invocation = tool_context._invocation_context
+    point = review_point(report, tool_context.state.get(StateKeys.STYLE_ISSUES, []))
+    try:
+        await get_analytics_store().append(invocation.app_name, invocation.user_id, point)
+    except Exception as e:
+        logger.warning(f"Tool: Could not record progress metrics: {e}")
+
+
+def _record_feedback_history(report: Dict[str, Any], artifact: Optional[str],
+                             tool_context: ToolContext) -> None:
+    """Add a review to the bounded user-scoped history and last report summary."""
+    history = append_review(
+        load_history(tool_context.state.get(StateKeys.USER_PAST_FEEDBACK_CACHE)),
+        summarize_review(report, config.feedback_excerpt_chars),
+        depth=config.feedback_history_depth,
+        compaction_batch=config.feedback_history_compaction_batch,
+        max_bytes=config.feedback_history_max_bytes
+    )
+    tool_context.state[StateKeys.USER_PAST_FEEDBACK_CACHE] = history
+    tool_context.state[StateKeys.USER_LAST_GRADING_REPORT] = compact_report(
+        report, artifact, config.feedback_excerpt_chars
+    )
+
+
+async def _index_report_in_memory(report: Dict[str, Any], tool_context: ToolContext) -> None:
+    """Index a grading report in the local memory service, if one is configured."""
+    invocation = tool_context._invocation_context
+    if not isinstance(invocation.memory_service, LocalMemoryService):
+        return
+
+    entry = summarize_review(report, config.feedback_excerpt_chars)
+    facts = [f"Style score {entry['style_score']}/100"]
+    if entry['pass_rate'] is not None:
+        facts.append(f"tests pass rate {entry['pass_rate']}%")
+    if entry['style_codes']:
+        facts.append(f"style issues {', '.join(entry['style_codes'])}")
+    if entry['critical_issue_types']:
+        facts.append(f"critical issues {', '.join(entry['critical_issue_types'])}")
+
+    try:
+        await invocation.memory_service.add_report(
+            app_name=invocation.session.app_name,
+            user_id=invocation.session.user_id,
+            session_id=invocation.session.id,
+            text=f"{'; '.join(facts)}.\n\n{report['feedback']}",
+            timestamp=report['timestamp']
+        )
+    except Exception as e:
+        logger.warning(f"Tool: Could not index report in memory: {e}")
+
+
 async def save_grading_report(feedback_text: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
     Saves a detailed grading report as an artifact.
@@ -601,10 +832,15 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
             'feedback': feedback_text,
             'improvements': {
                 'score_change': tool_context.state.get(StateKeys.SCORE_IMPROVEMENT, 0),
-                'from_last_score': tool_context.state.get(StateKeys.USER_LAST_STYLE_SCORE, 0)
-            }
+                'from_last_score': tool_context.state.get(StateKeys.TEMP_PREVIOUS_STYLE_SCORE, 0)
+            },
+            # Model calls of this invocation so far (the synthesizer's own call included)
+            'token_usage': tool_context.state.get(StateKeys.TEMP_TOKEN_USAGE) or {}
         }
 
+        await _index_report_in_memory(report, tool_context)
+        await _record_progress_point(report, tool_context)
+
         # Convert report to JSON string
         report_json = json.dumps(report, indent=2)
         report_part = types.Part.from_text(text=report_json)
@@ -623,8 +859,8 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
 
                 logger.info(f"Tool: Report saved as {filename} (version {version})")
 
-                # Store report in state as well for redundancy
-                tool_context.state[StateKeys.USER_LAST_GRADING_REPORT] = report
+                # Keep a bounded summary in user state; the full report is in the artifact
+                _record_feedback_history(report, filename, tool_context)
 
                 return {
                     "status": "success",
@@ -639,9 +875,9 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
                 logger.warning(f"Artifact service error: {artifact_error}, falling back to state storage")
                 # Continue to fallback below
 
-        # Fallback: Store in state if artifact service is not available or failed
-        tool_context.state[StateKeys.USER_LAST_GRADING_REPORT] = report
-        logger.info("Tool: Report saved to state (artifact service not available)")
+        # Fallback: Store the bounded summary in state if the artifact service is not available or failed
+        _record_feedback_history(report, None, tool_context)
+        logger.info("Tool: Report summary saved to state (artifact service not available)")
 
         return {
             "status": "success",
@@ -659,7 +895,7 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
         try:
             tool_context.state[StateKeys.USER_LAST_GRADING_REPORT] = {
                 'error': error_msg,
-                'feedback': feedback_text,
+                'feedback_excerpt': feedback_text[:config.feedback_excerpt_chars],
                 'timestamp': datetime.now().isoformat()
             }
         except:
@@ -673,6 +909,391 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
         }
 
 
+def extract_fixed_code(code_fixes: str) -> str:
+    """Strips a markdown ```python fence from the code fixer output, if present."""
+    if '```python' in code_fixes:
+        start = code_fixes.rfind('```python') + 9
+        end = code_fixes.rfind('```')
+        if start < end:
+            code_fixes = code_fixes[start:end].strip()
+    return code_fixes
+
+
+def _collect_function_names(code: str) -> List[str]:
+    """Return the names of all functions and methods defined in code (empty on syntax errors)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    return [node.name for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+
+
+def _bound_names(node: ast.AST) -> set:
+    """Return the names a top-level definition or assignment binds (empty for other statements)."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+        targets = [node.target]
+    else:
+        return set()
+    return {child.id for target in targets for child in ast.walk(target)
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store)}
+
+
+def _top_level_names(code: str) -> set:
+    """Return the names bound by top-level definitions and assignments in code (empty on syntax errors)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set()
+    return set().union(*(_bound_names(node) for node in tree.body))
+
+
+def _strip_code_under_test(test_block: str, names: set) -> str:
+    """
+    Removes top-level definitions and assignments of the code under test from a generated test block.
+
+    The test runner usually pastes the submitted code above its tests. The suite
+    is later appended after the fixed code, so any of those statements left in
+    place (including constants such as MAX_SIZE = 10) would override the fix.
+    """
+    try:
+        tree = ast.parse(test_block)
+    except SyntaxError:
+        return test_block
+
+    kept = [node for node in tree.body if not (_bound_names(node) & names)]
+    if len(kept) == len(tree.body):
+        return test_block
+    return ast.unparse(ast.Module(body=kept, type_ignores=[]))
+
+
+def clear_persisted_test_suite(state: Any) -> None:
+    """
+    Forgets the test suite persisted for a previous submission in this session.
+
+    Called when a new submission arrives, so the fix pipeline never reruns tests
+    written for other code if no new suite is generated.
+    """
+    state[StateKeys.TEST_SUITE_CODE] = ''
+    state[StateKeys.TEST_SUITE_HASH] = ''
+    state[StateKeys.TEST_SUITE_ARTIFACT] = ''
+    state[StateKeys.TESTED_FUNCTIONS] = []
+    state[StateKeys.TEST_IMPACT_MAP] = {}
+
+
+async def save_test_suite(test_blocks: List[str], tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Persists the test suite generated by the test runner for reuse by the fix pipeline.
+
+    Args:
+        test_blocks: Code blocks executed by the test runner, in order
+        tool_context: ADK tool context for state management
+
+    Returns:
+        Dictionary containing save status, hash and artifact details
+    """
+    logger.info("Tool: Saving generated test suite...")
+
+    try:
+        code = tool_context.state.get(StateKeys.CODE_TO_REVIEW, '')
+        analysis = tool_context.state.get(StateKeys.CODE_ANALYSIS, {})
+        definitions = {f['name'] for f in analysis.get('functions', [])}
+        definitions.update(c['name'] for c in analysis.get('classes', []))
+        definitions.update(_top_level_names(code))
+
+        suite = "\n\n".join(
+            _strip_code_under_test(block, definitions) for block in test_blocks if block.strip()
+        ).strip()
+
+        if not suite:
+            return {
+                "status": "error",
+                "message": "No generated test code found"
+            }
+
+        suite_hash = hashlib.sha256(suite.encode()).hexdigest()
+
+        tool_context.state[StateKeys.TEST_SUITE_CODE] = suite
+        tool_context.state[StateKeys.TEST_SUITE_HASH] = suite_hash
+        tool_context.state[StateKeys.TESTED_FUNCTIONS] = _collect_function_names(code)
+        tool_context.state[StateKeys.TEST_IMPACT_MAP] = build_test_impact_map(
+            suite, set(function_fingerprints(code))
+        )
+
+        filename = f"test_suite_{suite_hash[:12]}.py"
+        if hasattr(tool_context, 'save_artifact'):
+            try:
+                suite_part = types.Part.from_bytes(data=suite.encode(), mime_type="text/x-python")
+                version = await tool_context.save_artifact(filename, suite_part)
+                tool_context.state[StateKeys.TEST_SUITE_ARTIFACT] = filename
+
+                logger.info(f"Tool: Test suite saved as {filename} (version {version})")
+
+                return {
+                    "status": "success",
+                    "artifact_saved": True,
+                    "filename": filename,
+                    "hash": suite_hash,
+                    "size": len(suite)
+                }
+            except Exception as e:
+                logger.warning(f"Could not save test suite as artifact: {e}")
+
+        return {
+            "status": "success",
+            "artifact_saved": False,
+            "hash": suite_hash,
+            "size": len(suite),
+            "message": "Test suite saved to state only"
+        }
+
+    except Exception as e:
+        logger.error(f"Tool: Failed to save test suite: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+
+async def find_similar_review(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Looks up a past review of a near-duplicate submitted earlier by the same user.
+
+    A match always provides its feedback as a starting point. Its test suite is
+    reused when every symbol the suite was written against still exists, and its
+    test results are reused as well when the code differs only in comments and
+    formatting (identical AST).
+
+    Args:
+        tool_context: ADK tool context with the analyzed submission in state
+
+    Returns:
+        Dictionary with the match details and reuse mode ('none', 'feedback', 'suite' or 'results')
+    """
+    code = tool_context.state.get(StateKeys.CODE_TO_REVIEW, '')
+    if not config.similarity_index_enabled or not code or tool_context.state.get(StateKeys.SYNTAX_ERROR):
+        return {"status": "success", "mode": "none"}
+
+    try:
+        invocation = tool_context._invocation_context
+        match = await asyncio.to_thread(similarity_index.find, invocation.app_name, invocation.user_id,
+                                        code, config.similarity_threshold)
+    except Exception as e:
+        logger.warning(f"Tool: Similarity lookup failed: {e}")
+        return {"status": "error", "mode": "none", "message": str(e)}
+
+    if not match:
+        return {"status": "success", "mode": "none"}
+
+    symbols = set(function_fingerprints(code))
+    suite_fits = bool(match.get('test_suite')) and set(match.get('tested_functions', [])) <= symbols
+    if suite_fits and match['exact'] and match.get('test_summary'):
+        mode = 'results'
+    elif suite_fits:
+        mode = 'suite'
+    else:
+        mode = 'feedback'
+
+    tool_context.state[StateKeys.TEMP_SIMILAR_REVIEW] = {
+        'id': match['id'], 'similarity': match['similarity'], 'mode': mode
+    }
+    tool_context.state[StateKeys.TEMP_PRIOR_FEEDBACK] = match.get('feedback', '')
+    if mode == 'suite':
+        tool_context.state[StateKeys.TEMP_REUSED_TEST_SUITE] = match['test_suite']
+    elif mode == 'results':
+        await save_test_suite([match['test_suite']], tool_context)
+        tool_context.state[StateKeys.TEST_EXECUTION_SUMMARY] = match['test_summary']
+
+    logger.info(f"Tool: Near-duplicate of review {match['id'][:12]} "
+                f"(similarity {match['similarity']}) - reusing {mode}")
+
+    return {
+        "status": "success",
+        "mode": mode,
+        "similarity": match['similarity'],
+        "test_summary": match.get('test_summary', '') if mode == 'results' else ''
+    }
+
+
+async def index_reviewed_submission(feedback_text: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Records a completed single-file review in the near-duplicate index.
+
+    Reviews are only indexed when the persisted test suite belongs to the
+    reviewed code, so project reviews and runs without tests are skipped.
+
+    Args:
+        feedback_text: Final feedback of the review
+        tool_context: ADK tool context for state management
+
+    Returns:
+        Dictionary with the index status and entry id
+    """
+    code = tool_context.state.get(StateKeys.CODE_TO_REVIEW, '')
+    suite = tool_context.state.get(StateKeys.TEST_SUITE_CODE, '')
+    tested = tool_context.state.get(StateKeys.TESTED_FUNCTIONS, [])
+    if not config.similarity_index_enabled or not code or not suite:
+        return {"status": "success", "indexed": False}
+    if set(tested) != set(_collect_function_names(code)):
+        # Suite left over from an earlier submission in this session
+        return {"status": "success", "indexed": False}
+
+    test_summary = parse_json_output(tool_context.state.get(StateKeys.TEST_EXECUTION_SUMMARY, {}))
+    record = {
+        'test_suite': suite,
+        'tested_functions': sorted(function_fingerprints(code)),
+        'test_summary': json.dumps(test_summary) if test_summary else '',
+        'feedback': feedback_text[:config.similarity_max_feedback_chars]
+    }
+    try:
+        invocation = tool_context._invocation_context
+        entry_id = await asyncio.to_thread(similarity_index.add, invocation.app_name, invocation.user_id,
+                                           code, record)
+    except Exception as e:
+        logger.warning(f"Tool: Could not index review: {e}")
+        return {"status": "error", "indexed": False, "message": str(e)}
+
+    return {"status": "success", "indexed": entry_id is not None, "id": entry_id}
+
+
+def parse_json_output(value: Any) -> Dict[str, Any]:
+    """Parses an agent's JSON output (optionally wrapped in a ```json fence) into a dict."""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return {}
+
+    text = value.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0]
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def not_run_test_summary(recommendation: str) -> str:
+    """Return a test_execution_summary JSON for a review whose tests were not run."""
+    return json.dumps({
+        'test_summary': {'total_tests_run': 0, 'tests_passed': 0, 'tests_failed': 0,
+                         'tests_with_errors': 0, 'critical_issues_found': 0},
+        'critical_issues': [],
+        'verdict': {'status': 'NOT_RUN', 'confidence': 'low', 'recommendation': recommendation}
+    })
+
+
+def prepare_fix_test_module(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Builds the module that re-runs the persisted test suite against the fixed code.
+
+    On later fix loop iterations only the tests impacted by functions that changed
+    since the previous run are kept; the full module is always prepared as well for
+    the final confirmation run.
+
+    Args:
+        tool_context: ADK tool context with the fixed code and persisted suite in state
+
+    Returns:
+        Dictionary with the assembled module, the test selection and any
+        functions not covered by the suite
+    """
+    suite = tool_context.state.get(StateKeys.TEST_SUITE_CODE, '')
+    code_fixes = extract_fixed_code(tool_context.state.get(StateKeys.CODE_FIXES, ''))
+
+    if not suite or not code_fixes:
+        tool_context.state[StateKeys.TEMP_FIX_TEST_MODULE] = ''
+        tool_context.state[StateKeys.TEMP_FIX_FULL_TEST_MODULE] = ''
+        tool_context.state[StateKeys.TEMP_NEW_FUNCTIONS] = []
+        tool_context.state[StateKeys.TEMP_FIX_TEST_SELECTION] = {'mode': 'generated'}
+        return {
+            "status": "error",
+            "message": "No persisted test suite or fixed code available"
+        }
+
+    tested = set(tool_context.state.get(StateKeys.TESTED_FUNCTIONS, []))
+    new_functions = [name for name in _collect_function_names(code_fixes) if name not in tested]
+
+    # Work out which tests the changes since the previous run can affect
+    impact_map = tool_context.state.get(StateKeys.TEST_IMPACT_MAP, {})
+    previous_fingerprints = tool_context.state.get(StateKeys.TEMP_FIX_FUNCTION_FINGERPRINTS)
+    current_fingerprints = function_fingerprints(code_fixes)
+    tool_context.state[StateKeys.TEMP_FIX_FUNCTION_FINGERPRINTS] = current_fingerprints
+
+    selection = {'mode': 'full', 'selected': list(impact_map), 'skipped': [], 'changed': []}
+    selected_suite = suite
+    changed = (changed_symbols(previous_fingerprints, current_fingerprints)
+               if previous_fingerprints is not None else set())
+    if MODULE_LEVEL in changed:
+        # Imports, constants or globals changed - every test may be affected
+        selection['changed'] = sorted(changed)
+    elif impact_map and previous_fingerprints is not None:
+        changed = expand_to_dependents(code_fixes, changed)
+        selected = select_tests(impact_map, changed)
+        skipped = [name for name in impact_map if name not in selected]
+        filtered = filter_suite(suite, selected) if skipped else None
+        if filtered is not None:
+            selected_suite = filtered
+            previous_results = parse_json_output(
+                tool_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, {})
+            )
+            selection = {'mode': 'selected', 'selected': selected,
+                         'skipped': skipped, 'changed': sorted(changed),
+                         'previous_failing': previous_results.get('still_failing_tests', [])}
+
+    full_module = f"{code_fixes}\n\n\n# --- Persisted test suite ---\n{suite}\n"
+    module = f"{code_fixes}\n\n\n# --- Persisted test suite ---\n{selected_suite}\n"
+    tool_context.state[StateKeys.TEMP_FIX_TEST_MODULE] = module
+    tool_context.state[StateKeys.TEMP_FIX_FULL_TEST_MODULE] = full_module
+    tool_context.state[StateKeys.TEMP_NEW_FUNCTIONS] = new_functions
+    tool_context.state[StateKeys.TEMP_FIX_TEST_SELECTION] = selection
+
+    logger.info(f"Tool: Fix test module prepared - suite "
+                f"{tool_context.state.get(StateKeys.TEST_SUITE_HASH, '')[:12]}, "
+                f"{selection['mode']} run of {len(selection['selected']) or 'all'} tests, "
+                f"{len(new_functions)} new functions")
+
+    return {
+        "status": "success",
+        "module": module,
+        "selection": selection,
+        "new_functions": new_functions
+    }
+
+
+def merge_selective_test_results(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Completes a selective fix test run with the carried-over results of skipped tests.
+
+    Args:
+        tool_context: ADK tool context with the fix test summary and selection in state
+
+    Returns:
+        Dictionary with the merged summary, or a skipped status for full runs
+    """
+    selection = tool_context.state.get(StateKeys.TEMP_FIX_TEST_SELECTION, {})
+    if selection.get('mode') != 'selected':
+        return {"status": "skipped", "message": "Full run - nothing to merge"}
+
+    summary = parse_json_output(tool_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, {}))
+    if not summary:
+        return {"status": "error", "message": "Could not parse fix test results"}
+
+    previous = selection.get('previous_failing', [])
+    merged = merge_carried_results(summary, selection['skipped'], previous)
+    tool_context.state[StateKeys.FIX_TEST_EXECUTION_SUMMARY] = merged
+
+    logger.info(f"Tool: Merged {len(selection['skipped'])} carried-over tests - "
+                f"{merged['passed']}/{merged['total']} passing")
+
+    return {"status": "success", "summary": merged}
+
+
 async def validate_fixed_style(tool_context: ToolContext) -> Dict[str, Any]:
     """
     Validates style compliance of the fixed code.
@@ -686,15 +1307,8 @@ async def validate_fixed_style(tool_context: ToolContext) -> Dict[str, Any]:
     logger.info("Tool: Validating style of fixed code...")
 
     try:
-        # Get the fixed code from state
-        code_fixes = tool_context.state.get(StateKeys.CODE_FIXES, '')
-       
-        # Try to extract from markdown if present
-        if '```python' in code_fixes:
-            start = code_fixes.rfind('```python') + 9
-            end = code_fixes.rfind('```')
-            if start < end:
-                code_fixes = code_fixes[start:end].strip()
+        # Get the fixed code from state, extracting from markdown if present
+        code_fixes = extract_fixed_code(tool_context.state.get(StateKeys.CODE_FIXES, ''))
 
         if not code_fixes:
             return {
@@ -706,11 +1320,7 @@ async def validate_fixed_style(tool_context: ToolContext) -> Dict[str, Any]:
         tool_context.state[StateKeys.CODE_FIXES] = code_fixes
 
         # Run style check on fixed code
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            style_result = await loop.run_in_executor(
-                executor, _perform_style_check, code_fixes
-            )
+        style_result = await asyncio.to_thread(_perform_style_check, code_fixes)
 
         # Compare with original
         original_score = tool_context.state.get(StateKeys.STYLE_SCORE, 0)
@@ -768,11 +1378,7 @@ async def compile_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
             except:
                 original_tests = {}
 
-        if isinstance(fixed_tests, str):
-            try:
-                fixed_tests = json.loads(fixed_tests)
-            except:
-                fixed_tests = {}
+        fixed_tests = parse_json_output(fixed_tests)
 
         # Extract pass rates
         original_pass_rate = 0
@@ -842,6 +1448,7 @@ async def compile_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
                 'tests': test_improvement,
                 'style': style_improvement
             },
+            'autofix': tool_context.state.get(StateKeys.TEMP_AUTOFIX_SUMMARY, {}),
             'summary': f"{status_emoji} Fix Status: {fix_status}\n"
                       f"Tests: {original_pass_rate:.1f}% → {fixed_pass_rate:.1f}%\n"
                       f"Style: {original_style}/100 → {fixed_style}/100"
@@ -912,6 +1519,8 @@ async def save_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
                 "message": "No fix report found in state"
             }
 
+        fix_report = {**fix_report, 'token_usage': tool_context.state.get(StateKeys.TEMP_TOKEN_USAGE) or {}}
+
         # Convert to JSON
         report_json = json.dumps(fix_report, indent=2)
         report_part = types.Part.from_text(text=report_json)
@@ -956,11 +1565,23 @@ async def save_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
 
 # Module exports
 __all__ = [
+    'tool_context_from_callback',
+    'extract_code_from_message',
     'analyze_code_structure',
     'check_code_style',
+    'autofix_code_style',
     'search_past_feedback',
     'update_grading_progress',
     'save_grading_report',
+    'save_test_suite',
+    'clear_persisted_test_suite',
+    'find_similar_review',
+    'index_reviewed_submission',
+    'prepare_fix_test_module',
+    'merge_selective_test_results',
+    'parse_json_output',
+    'not_run_test_summary',
+    'extract_fixed_code',
     'validate_fixed_style',
     'compile_fix_report',
     'save_fix_report',
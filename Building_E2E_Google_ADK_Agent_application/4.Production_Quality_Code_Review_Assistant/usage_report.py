@@ -0,0 +1,118 @@
+"""
+Token usage report for the Code Review Assistant.
+
+Lists the most expensive pipeline stages over a time window, read from the
+daily usage counters that token_usage.py keeps in the session database
+(in-memory counters live only inside the server process):
+
+    python -m code_review_assistant.usage_report --days 7 --top 10
+    python -m code_review_assistant.usage_report --since 2025-06-01 --until 2025-06-30 --user alice
+"""
+
+import argparse
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+from .counters import DatabaseCounterStore
+from .token_usage import COUNTER_PREFIX, USAGE_METRICS, USER_USAGE_METRICS
+
+DEFAULT_APP_NAME = "code_review_assistant"
+
+
+def aggregate_stage_usage(values: Dict[str, Any], since: str, until: str) -> Dict[str, Dict[str, float]]:
+    """Sum the app-scoped usage counters of each stage for days in [since, until]."""
+    stages = {}
+    for key, value in values.items():
+        parts = key.split(':')
+        if len(parts) != 4 or parts[0] != COUNTER_PREFIX:
+            continue
+        _, day, stage, metric = parts
+        if since <= day <= until and metric in USAGE_METRICS:
+            stats = stages.setdefault(stage, dict.fromkeys(USAGE_METRICS, 0))
+            stats[metric] += value or 0
+    return stages
+
+
+def aggregate_user_usage(values: Dict[str, Any], since: str, until: str) -> Dict[str, float]:
+    """Sum a user's daily usage counters for days in [since, until]."""
+    totals = dict.fromkeys(USER_USAGE_METRICS, 0)
+    for key, value in values.items():
+        parts = key.split(':')
+        if len(parts) == 3 and parts[0] == COUNTER_PREFIX and since <= parts[1] <= until and parts[2] in totals:
+            totals[parts[2]] += value or 0
+    return totals
+
+
+def format_stage_report(stages: Dict[str, Dict[str, float]], top: int) -> str:
+    """Render the most expensive stages as a text table, by cost then total tokens."""
+    ranked = sorted(stages.items(), key=lambda item: (item[1]['cost_usd'], item[1]['total_tokens']), reverse=True)
+    rows: List[List[str]] = [["Stage", "Calls", "Prompt", "Output", "Cached", "Total", "Tokens/call", "Cost USD"]]
+    for stage, stats in ranked[:top]:
+        calls = stats['calls'] or 1
+        rows.append([
+            stage, f"{stats['calls']:.0f}", f"{stats['prompt_tokens']:.0f}", f"{stats['output_tokens']:.0f}",
+            f"{stats['cached_tokens']:.0f}", f"{stats['total_tokens']:.0f}",
+            f"{stats['total_tokens'] / calls:.0f}", f"{stats['cost_usd']:.4f}"
+        ])
+
+    total_cost = sum(stats['cost_usd'] for stats in stages.values())
+    total_tokens = sum(stats['total_tokens'] for stats in stages.values())
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                       for column, (cell, width) in enumerate(zip(row, widths)))
+             for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    lines.append("")
+    lines.append(f"All stages: {total_tokens:.0f} tokens, ${total_cost:.4f}")
+    return "\n".join(lines)
+
+
+def _window(args: argparse.Namespace) -> tuple:
+    until = date.fromisoformat(args.until) if args.until else datetime.now(timezone.utc).date()
+    since = date.fromisoformat(args.since) if args.since else until - timedelta(days=args.days - 1)
+    return since.isoformat(), until.isoformat()
+
+
+async def _report(args: argparse.Namespace) -> str:
+    store = DatabaseCounterStore(db_url=args.db_url)
+    since, until = _window(args)
+
+    stages = aggregate_stage_usage(await store.get_all(args.app_name, None), since, until)
+    if not stages:
+        return f"No model usage recorded for {args.app_name} between {since} and {until}."
+
+    lines = [f"Token usage for {args.app_name}, {since} to {until} (top {args.top} stages by cost)", "",
+             format_stage_report(stages, args.top)]
+    if args.user:
+        user = aggregate_user_usage(await store.get_all(args.app_name, args.user), since, until)
+        lines.append(f"User {args.user}: {user['calls']:.0f} calls, {user['total_tokens']:.0f} tokens, "
+                     f"${user['cost_usd']:.4f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report token usage and cost per pipeline stage.")
+    parser.add_argument('--days', type=int, default=7, help="Number of days up to --until (default 7)")
+    parser.add_argument('--since', help="First day (YYYY-MM-DD, UTC); overrides --days")
+    parser.add_argument('--until', help="Last day (YYYY-MM-DD, UTC); defaults to today")
+    parser.add_argument('--top', type=int, default=10, help="Number of stages to list (default 10)")
+    parser.add_argument('--app-name', default=DEFAULT_APP_NAME, help="ADK app name")
+    parser.add_argument('--user', help="Also show the totals of this user id")
+    parser.add_argument('--db-url', default=os.environ.get('SESSION_SERVICE_URI', ''),
+                        help="Session database URL (defaults to SESSION_SERVICE_URI)")
+    args = parser.parse_args(argv)
+
+    if 'postgresql' not in args.db_url and 'sqlite' not in args.db_url:
+        parser.error("usage counters are kept in the session database - set SESSION_SERVICE_URI or pass --db-url")
+    if args.days < 1:
+        parser.error("--days must be at least 1")
+
+    print(asyncio.run(_report(args)))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())